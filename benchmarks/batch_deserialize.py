@@ -0,0 +1,87 @@
+"""
+Compares the time of deserializing a batch of small NDJSON responses with
+polars one response at a time and in one call of a batch input function that
+joins the responses and tags each record with the position of its response.
+
+Usage:
+    python benchmarks/batch_deserialize.py --responses 500 --repeat 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from io import BytesIO
+from itertools import chain, repeat
+from time import perf_counter
+
+import polars as pl
+
+from byteflows.contentio import RESPONSE_COL, create_datatype, deserialize_many
+
+
+def read_ndjson(content: bytes) -> pl.DataFrame:
+    return pl.read_ndjson(content)
+
+
+def read_ndjson_many(contents: list[bytes]) -> pl.DataFrame:
+    lines: list[bytes] = [content.rstrip(b"\n") for content in contents]
+    counts: list[int] = [
+        line.count(b"\n") + 1 if line else 0 for line in lines
+    ]
+    frame: pl.DataFrame = pl.read_ndjson(b"\n".join(filter(None, lines)))
+    tags: list[int] = list(
+        chain.from_iterable(
+            repeat(idx, count) for idx, count in enumerate(counts)
+        )
+    )
+    return frame.with_columns(pl.Series(RESPONSE_COL, tags, pl.UInt32))
+
+
+def write_ndjson(data: pl.DataFrame, file: BytesIO) -> None:
+    data.write_ndjson(file)
+
+
+def make_response(rows: int, seed: int) -> bytes:
+    return "\n".join(
+        json.dumps(
+            {"id": seed * rows + row, "price": row * 1.5, "symbol": f"S{seed}"}
+        )
+        for row in range(rows)
+    ).encode()
+
+
+def measure(contents: list[bytes], repeat_count: int) -> float:
+    start: float = perf_counter()
+    for _ in range(repeat_count):
+        deserialize_many(contents, "ndjson")
+    return (perf_counter() - start) / repeat_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--responses", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    contents: list[bytes] = [
+        make_response(args.rows, seed) for seed in range(args.responses)
+    ]
+    create_datatype(
+        format_name="ndjson", input_func=read_ndjson, output_func=write_ndjson
+    )
+    single: float = measure(contents, args.repeat)
+    create_datatype(
+        format_name="ndjson",
+        input_func=read_ndjson,
+        output_func=write_ndjson,
+        batch_input_func=read_ndjson_many,
+        replace=True,
+    )
+    batched: float = measure(contents, args.repeat)
+    print(f"one call per response: {single * 1000:.2f} ms per batch")
+    print(f"one call per batch   : {batched * 1000:.2f} ms per batch")
+
+
+if __name__ == "__main__":
+    main()
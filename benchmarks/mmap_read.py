@@ -0,0 +1,70 @@
+"""
+Compares peak RSS and time of blob.read for a large local object with and
+without memory mapping. Each mode is run in a separate process, so the peak RSS
+of one mode does not affect the other.
+
+Usage:
+    python benchmarks/mmap_read.py --size-mb 512
+"""
+
+from __future__ import annotations
+
+import argparse
+import resource
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import gettempdir
+from time import perf_counter
+
+import orjson
+from morefs.asyn_local import AsyncLocalFileSystem
+
+from byteflows.contentio import reg_input
+from byteflows.storages import blob
+
+TARGET = Path(gettempdir()) / "byteflows_bench" / "large.json"
+
+
+def load_json(content: bytes) -> list:
+    return orjson.loads(content)
+
+
+def prepare(size_mb: int) -> None:
+    TARGET.parent.mkdir(parents=True, exist_ok=True)
+    record: bytes = orjson.dumps({"symbol": "AAPL", "value": 1.5, "n": 1})
+    count: int = size_mb * 1024**2 // (len(record) + 1)
+    with TARGET.open("wb") as file:
+        file.write(b"[")
+        file.write(b",".join([record] * count))
+        file.write(b"]")
+
+
+def run_mode(mode: str) -> None:
+    reg_input("json", load_json, accept_buffer=mode == "mmap")
+    engine = AsyncLocalFileSystem()
+    start: float = perf_counter()
+    dataobj = blob.read(engine, str(TARGET), mmap_threshold=1)
+    elapsed: float = perf_counter() - start
+    peak_mb: float = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{mode:>5}: {elapsed:.2f} s, peak RSS {peak_mb:.0f} MB, "
+        f"{len(dataobj)} records"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=512)
+    parser.add_argument("--mode", choices=["copy", "mmap"])
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode)
+        return
+    prepare(args.size_mb)
+    for mode in ("copy", "mmap"):
+        subprocess.run([sys.executable, __file__, "--mode", mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
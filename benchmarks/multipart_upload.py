@@ -0,0 +1,73 @@
+"""
+Compares the time of uploading a large serialized object to an S3-compatible
+storage in one request and in parallel parts with different part sizes and
+concurrency. The connection parameters are taken from the environment variables
+S3_ENDPOINT, S3_KEY, S3_SECRET and S3_REGION (as in the examples), the target
+bucket is specified by the --bucket argument.
+
+Usage:
+    python benchmarks/multipart_upload.py --bucket test --size-mb 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+from time import perf_counter
+
+from byteflows.storages.blob import FsBlobStorage
+
+
+async def measure(
+    storage: FsBlobStorage, path: str, content: bytes, multipart: bool
+) -> float:
+    start: float = perf_counter()
+    if multipart:
+        await storage._multipart_upload(storage.engine, path, content)
+    else:
+        await storage._pipe_with_retry(storage.engine, path, content)
+    elapsed: float = perf_counter() - start
+    await storage.engine._rm(path)
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bucket", required=True)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument(
+        "--part-sizes", type=int, nargs="+", default=[8, 16, 64]
+    )
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 4, 8]
+    )
+    args = parser.parse_args()
+    storage = FsBlobStorage().configure(
+        engine_proto="s3",
+        engine_params={
+            "endpoint_url": os.environ["S3_ENDPOINT"],
+            "key": os.environ["S3_KEY"],
+            "secret": os.environ["S3_SECRET"],
+            "client_kwargs": {"region_name": os.getenv("S3_REGION")},
+        },
+    )
+    await storage.launch_session()
+    content: bytes = os.urandom(args.size_mb * 1024**2)
+    path: str = f"{args.bucket}/byteflows_bench/multipart.bin"
+    elapsed: float = await measure(storage, path, content, multipart=False)
+    print(f"single request: {elapsed:.2f} s")
+    for part_size in args.part_sizes:
+        for concurrency in args.concurrency:
+            storage.part_size = part_size
+            storage.part_concurrency = concurrency
+            elapsed = await measure(storage, path, content, multipart=True)
+            speed: float = args.size_mb / elapsed
+            print(
+                f"parts {part_size:>3} MB x {concurrency:>2}: {elapsed:.2f} s "
+                f"({speed:.1f} MB/s)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
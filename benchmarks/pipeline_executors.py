@@ -0,0 +1,80 @@
+"""
+Compares the time of processing a batch by a pipeline with a CPU-bound pure
+Python step on the thread pool of the event loop and on pools of processes with
+different numbers of workers.
+
+Usage:
+    python benchmarks/pipeline_executors.py --objects 32 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from io import BytesIO
+from time import perf_counter
+
+from byteflows.contentio import (
+    IOBoundPipeline,
+    IOContext,
+    create_datatype,
+    create_io_context,
+)
+from byteflows.storages.blob import FsBlobStorage
+
+
+def read_json(content: bytes) -> list:
+    return json.loads(content)
+
+
+def write_json(data: list, file: BytesIO) -> None:
+    file.write(json.dumps(data).encode())
+
+
+def burn(data: list, work: int = 200_000) -> list:
+    total: int = 0
+    for i in range(work):
+        total += i * i % 7
+    return data + [total]
+
+
+create_datatype(
+    format_name="json", input_func=read_json, output_func=write_json
+)
+
+
+async def measure(
+    pipeline: IOBoundPipeline, batch: list[list], repeat: int
+) -> float:
+    start: float = perf_counter()
+    for _ in range(repeat):
+        async with pipeline.run_transform(batch) as result:
+            await result
+    return (perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=32)
+    parser.add_argument("--work", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    ctx: IOContext = create_io_context(
+        in_format="json", out_format="json", storage=FsBlobStorage()
+    )
+    pipeline: IOBoundPipeline = ctx.attache_pipeline()  # type: ignore
+    pipeline.step(1, extra_kwargs={"work": args.work})(burn)
+    batch: list[list] = [[i] for i in range(args.objects)]
+    elapsed: float = asyncio.run(measure(pipeline, batch, args.repeat))
+    print(f"threads          : {elapsed:.2f} s per batch")
+    for workers in args.workers:
+        pipeline.use_executor("process", workers)
+        elapsed = asyncio.run(measure(pipeline, batch, args.repeat))
+        print(f"processes x {workers:>3}: {elapsed:.2f} s per batch")
+    pipeline.shutdown_executor()
+
+
+if __name__ == "__main__":
+    main()
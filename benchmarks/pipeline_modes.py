@@ -0,0 +1,93 @@
+"""
+Compares the time of processing a batch of small polars frames by a pipeline in
+different execution modes: a worker thread call per object, one worker thread
+call per batch and a batch step over the merged frame.
+
+Usage:
+    python benchmarks/pipeline_modes.py --frames 500 --rows 100 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from io import BytesIO
+from time import perf_counter
+
+import polars as pl
+
+from byteflows.contentio import (
+    IOBoundPipeline,
+    IOContext,
+    create_datatype,
+    create_io_context,
+)
+from byteflows.storages.blob import FsBlobStorage
+
+
+def read_parquet(content: bytes) -> pl.DataFrame:
+    return pl.read_parquet(content)
+
+
+def write_parquet(data: pl.DataFrame, file: BytesIO) -> None:
+    data.write_parquet(file)
+
+
+def add_ratio(data: pl.DataFrame) -> pl.DataFrame:
+    return data.with_columns((pl.col("a") / pl.col("b")).alias("ratio"))
+
+
+def drop_small(data: pl.DataFrame) -> pl.DataFrame:
+    return data.filter(pl.col("ratio") > 0.5)
+
+
+def build(ctx: IOContext, mode: str, merged: bool) -> IOBoundPipeline:
+    pipeline: IOBoundPipeline = ctx.attache_pipeline(mode)  # type: ignore
+    pipeline.step(1, batch=merged, merge=merged)(add_ratio)
+    pipeline.step(2, batch=merged, merge=merged)(drop_small)
+    return pipeline
+
+
+async def measure(
+    pipeline: IOBoundPipeline, frames: list[pl.DataFrame], repeat: int
+) -> float:
+    start: float = perf_counter()
+    for _ in range(repeat):
+        async with pipeline.run_transform(frames) as result:
+            await result
+    return (perf_counter() - start) / repeat
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    create_datatype(
+        format_name="parquet",
+        input_func=read_parquet,
+        output_func=write_parquet,
+        merge_func=pl.concat,
+    )
+    ctx: IOContext = create_io_context(
+        in_format="parquet", out_format="parquet", storage=FsBlobStorage()
+    )
+    frames: list[pl.DataFrame] = [
+        pl.DataFrame({"a": range(args.rows), "b": range(1, args.rows + 1)})
+        for _ in range(args.frames)
+    ]
+    cases: dict[str, tuple[str, bool]] = {
+        "per object": ("per_object", False),
+        "fused": ("fused", False),
+        "batch over merged frame": ("fused", True),
+    }
+    for name, (mode, merged) in cases.items():
+        elapsed: float = await measure(
+            build(ctx, mode, merged), frames, args.repeat
+        )
+        print(f"{name:<24}: {elapsed * 1000:.2f} ms per batch")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
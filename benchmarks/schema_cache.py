@@ -0,0 +1,68 @@
+"""
+Compares the time of reading wide json responses with schema inference on every
+response and with the schema learned by the schema learner of the I/O context.
+
+Usage:
+    python benchmarks/schema_cache.py --responses 200 --rows 50 --columns 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from io import BytesIO
+from time import perf_counter
+
+import polars as pl
+
+from byteflows.contentio import SchemaLearner, create_datatype, deserialize
+
+
+def read_json(content: bytes, schema: dict | None = None) -> pl.DataFrame:
+    return pl.read_json(content, schema=schema)
+
+
+def write_json(data: pl.DataFrame, file: BytesIO) -> None:
+    data.write_json(file)
+
+
+def make_response(rows: int, columns: int, seed: int) -> bytes:
+    records: list[dict] = [
+        {
+            f"col_{col}": (row + seed) * col if col % 3 else f"v{row + col}"
+            for col in range(columns)
+        }
+        for row in range(rows)
+    ]
+    return json.dumps(records).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--responses", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--columns", type=int, default=300)
+    args = parser.parse_args()
+    create_datatype(
+        format_name="json", input_func=read_json, output_func=write_json
+    )
+    responses: list[bytes] = [
+        make_response(args.rows, args.columns, seed)
+        for seed in range(args.responses)
+    ]
+    start: float = perf_counter()
+    for content in responses:
+        deserialize(content, "json")
+    inferred: float = (perf_counter() - start) / len(responses)
+    learner = SchemaLearner()
+    start = perf_counter()
+    for content in responses:
+        learner.decode("bench", content, "json")
+    learned: float = (perf_counter() - start) / len(responses)
+    print(f"inference per response: {inferred * 1000:.3f} ms")
+    print(f"learned schema        : {learned * 1000:.3f} ms")
+    print(f"learner stats         : {learner.stats['bench']}")
+
+
+if __name__ == "__main__":
+    main()
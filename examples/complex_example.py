@@ -84,6 +84,7 @@ contentio.create_datatype(
     format_name="csv",
     input_func=pl.read_csv,
     output_func=pl.DataFrame.write_csv,
+    merge_func=pl.concat,
 )
 
 income_context: contentio.IOContext = contentio.create_io_context(
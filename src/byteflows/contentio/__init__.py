@@ -1,2 +1,10 @@
+from .cdc import *
 from .common import *
+from .compression import *
 from .contentio import *
+from .dedup import *
+from .executors import *
+from .memo import *
+from .profiling import *
+from .records import *
+from .schema import *
@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from hashlib import blake2b
+from importlib import import_module
+from pathlib import Path
+from threading import Lock as ThreadLock
+from typing import Any
+
+from byteflows.contentio.common import CHANGE_HOOKS_MAP
+from byteflows.contentio.records import type_key
+
+__all__ = [
+    "ChangeCapture",
+    "ChangeHooks",
+    "PendingChanges",
+    "reg_change_hooks",
+]
+
+"""
+This module provides change data capture: instead of the full data set, only
+the records that were inserted, updated or deleted since the previous run of
+the request are written to the storage. Hashes of the records are kept in a
+local SQLite index keyed by the hash of the key columns.
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    query TEXT NOT NULL,
+    key_hash INTEGER NOT NULL,
+    row_hash INTEGER NOT NULL,
+    key_values TEXT,
+    run INTEGER NOT NULL,
+    PRIMARY KEY (query, key_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS records_run ON records (query, run);
+CREATE TABLE IF NOT EXISTS runs (
+    query TEXT PRIMARY KEY,
+    run INTEGER NOT NULL,
+    type_name TEXT
+);
+"""
+
+
+@dataclass(frozen=True)
+class ChangeHooks:
+    """
+    Functions through which change data capture works with data objects of a
+    certain type.
+
+    Attributes:
+        hashes (Callable[[Any, list[str]], tuple[list[int], list[int]]]):
+            returns signed 64-bit hashes of the key columns and of whole
+            records. The hashes are kept in the index between runs, so they
+            must not depend on the version of the library that handles the
+            data objects.
+        select (Callable[[Any, list[str | None], str], Any]): adds the
+            operation column to the object and leaves only the records for
+            which the operation is not None.
+        keys (Callable[[Any, list[str], list[bool]], list[list[Any]]]): returns
+            the values of the key columns of the marked records.
+        deletes (Callable[[list[list[Any]], list[str], str], Any]): creates a
+            data object of deleted records from their key values.
+    """
+
+    hashes: Callable[[Any, list[str]], tuple[list[int], list[int]]]
+    select: Callable[[Any, list[str | None], str], Any]
+    keys: Callable[[Any, list[str], list[bool]], list[list[Any]]]
+    deletes: Callable[[list[list[Any]], list[str], str], Any]
+
+
+@dataclass(frozen=True, slots=True)
+class PendingChanges:
+    """
+    Index entries of the records of one data object compared with the index.
+    They are written to the index by ChangeCapture.commit once the changes
+    have been uploaded to the storage.
+
+    Attributes:
+        query (str): name of the request.
+        run (int): run of the request in which the records were received.
+        records (list[tuple[int, int, str | None]]): hash of the key columns,
+            hash of the record and, for inserted records, the values of the key
+            columns in json.
+    """
+
+    query: str
+    run: int
+    records: list[tuple[int, int, str | None]]
+
+
+def reg_change_hooks(type_name: str, hooks: ChangeHooks) -> None:
+    """
+    Registers change data capture functions for data objects of the given type.
+
+    Args:
+        type_name (str): type key of the data objects (see type_key).
+        hooks (ChangeHooks): change data capture functions.
+    """
+    CHANGE_HOOKS_MAP[type_name] = hooks
+
+
+class ChangeCapture:
+    """
+    Index of the records written for each request. Compares each new data
+    object with the index and leaves in it only inserted and updated records,
+    marking them in the operation column. The index is updated only when the
+    changes are committed after they have been uploaded, so changes lost on a
+    failed upload are reported again. At the end of a run of the request, the
+    records that were not received during the run are returned as deleted.
+    The class is thread-safe.
+
+    Attributes:
+        db_path (str): path to the database file with the index.
+        op_column (str): name of the operation column ("insert", "update" or
+            "delete").
+        stats (dict[str, dict[str, int]]): number of inserted, updated and
+            unchanged records for each request in the current run.
+        last_runs (dict[str, dict[str, int]]): number of inserted, updated,
+            unchanged and deleted records for each request in its last
+            completed run.
+    """
+
+    def __init__(
+        self,
+        *,
+        db_path: str | Path = "byteflows_cdc.db",
+        op_column: str = "op",
+    ):
+        """
+        Args:
+            db_path (str | Path, optional): path to the database file with the
+                index. Defaults to "byteflows_cdc.db".
+            op_column (str, optional): name of the operation column. Defaults
+                to "op".
+        """
+        self.db_path: str = str(db_path)
+        self.op_column: str = op_column
+        self.stats: dict[str, dict[str, int]] = dict()
+        self.last_runs: dict[str, dict[str, int]] = dict()
+        self._lock: ThreadLock = ThreadLock()
+        self._conn: sqlite3.Connection = sqlite3.connect(
+            self.db_path, check_same_thread=False
+        )
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def _current_run(self, query: str, type_name: str) -> int:
+        row = self._conn.execute(
+            "SELECT run FROM runs WHERE query = ?", (query,)
+        ).fetchone()
+        if row is None:
+            self._conn.execute(
+                "INSERT INTO runs VALUES (?, 1, ?)", (query, type_name)
+            )
+            return 1
+        self._conn.execute(
+            "UPDATE runs SET type_name = ? WHERE query = ?", (type_name, query)
+        )
+        return row[0]
+
+    def diff(
+        self, query: str, dataobj: Any, key_columns: list[str]
+    ) -> tuple[Any, PendingChanges]:
+        """
+        Compares the data object with the index of the request. The index is
+        not changed until the returned entries are committed (see commit).
+
+        Args:
+            query (str): name of the request.
+            dataobj (Any): data object.
+            key_columns (list[str]): columns whose values identify a record.
+
+        Raises:
+            KeyError: thrown if no change data capture functions are registered
+                for the type of the object.
+
+        Returns:
+            tuple[Any, PendingChanges]: data object with inserted and updated
+                records and the operation column, and the index entries of the
+                records.
+        """
+        type_name: str = type_key(dataobj)
+        hooks: ChangeHooks = CHANGE_HOOKS_MAP[type_name]
+        key_hashes, row_hashes = hooks.hashes(dataobj, key_columns)
+        with self._lock, self._conn:
+            run: int = self._current_run(query, type_name)
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS incoming "
+                "(key_hash INTEGER PRIMARY KEY, row_hash INTEGER)"
+            )
+            self._conn.execute("DELETE FROM incoming")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO incoming VALUES (?, ?)",
+                zip(key_hashes, row_hashes),
+            )
+            previous: dict[int, int] = dict(
+                self._conn.execute(
+                    "SELECT r.key_hash, r.row_hash FROM incoming AS i "
+                    "JOIN records AS r ON r.query = ? AND r.key_hash = "
+                    "i.key_hash",
+                    (query,),
+                ).fetchall()
+            )
+        ops: list[str | None] = [
+            "insert"
+            if (old := previous.get(key)) is None
+            else ("update" if old != row else None)
+            for key, row in zip(key_hashes, row_hashes)
+        ]
+        inserted: list[bool] = [op == "insert" for op in ops]
+        key_values: Iterator[list[Any]] = iter(
+            hooks.keys(dataobj, key_columns, inserted) if any(inserted) else []
+        )
+        pending = PendingChanges(
+            query,
+            run,
+            [
+                (
+                    key,
+                    row,
+                    json.dumps(next(key_values), default=str) if ins else None,
+                )
+                for key, row, ins in zip(key_hashes, row_hashes, inserted)
+            ],
+        )
+        stats: dict[str, int] = self.stats.setdefault(
+            query, {"insert": 0, "update": 0, "unchanged": 0, "delete": 0}
+        )
+        stats["insert"] += ops.count("insert")
+        stats["update"] += ops.count("update")
+        stats["unchanged"] += ops.count(None)
+        return hooks.select(dataobj, ops, self.op_column), pending
+
+    def commit(self, pending: Sequence[PendingChanges]) -> None:
+        """
+        Writes the index entries of uploaded changes to the index.
+
+        Args:
+            pending (Sequence[PendingChanges]): index entries returned by diff.
+        """
+        with self._lock, self._conn:
+            for changes in pending:
+                self._conn.executemany(
+                    "INSERT INTO records VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (query, key_hash) DO UPDATE "
+                    "SET row_hash = excluded.row_hash, run = excluded.run, "
+                    "key_values = COALESCE(excluded.key_values, key_values)",
+                    [
+                        (changes.query, key, row, values, changes.run)
+                        for key, row, values in changes.records
+                    ],
+                )
+
+    def finish_run(
+        self, query: str, key_columns: list[str], *, deletes: bool = True
+    ) -> Any | None:
+        """
+        Completes the run of the request: records not received during the run
+        are removed from the index and returned as deleted, and the next run
+        begins. Deletes can only be detected if every record of the data set
+        reaches diff in each run; when parts of the data are skipped before
+        that (for example, by content deduplication), detection must be
+        disabled.
+
+        Args:
+            query (str): name of the request.
+            key_columns (list[str]): columns whose values identify a record.
+            deletes (bool, optional): whether to detect deleted records.
+                Defaults to True.
+
+        Returns:
+            Any | None: data object with the key columns of the deleted records
+                and the operation column, or None if no records were deleted.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT run, type_name FROM runs WHERE query = ?", (query,)
+            ).fetchone()
+            if row is None:
+                return None
+            run, type_name = row
+            deleted: list[list[Any]] = []
+            if deletes:
+                deleted = [
+                    json.loads(values)
+                    for (values,) in self._conn.execute(
+                        "SELECT key_values FROM records "
+                        "WHERE query = ? AND run < ?",
+                        (query, run),
+                    )
+                ]
+                self._conn.execute(
+                    "DELETE FROM records WHERE query = ? AND run < ?",
+                    (query, run),
+                )
+            self._conn.execute(
+                "UPDATE runs SET run = run + 1 WHERE query = ?", (query,)
+            )
+        stats: dict[str, int] = self.stats.pop(
+            query, {"insert": 0, "update": 0, "unchanged": 0, "delete": 0}
+        )
+        stats["delete"] = len(deleted)
+        self.last_runs[query] = stats
+        if not deleted:
+            return None
+        return CHANGE_HOOKS_MAP[type_name].deletes(
+            deleted, key_columns, self.op_column
+        )
+
+    def close(self) -> None:
+        """
+        Closes the connection to the database.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def _record_hash(values: Sequence[Any]) -> int:
+    """
+    Returns a signed 64-bit hash of the values of a record encoded as JSON.
+    Values that JSON does not support are encoded by their string
+    representation.
+    """
+    encoded: bytes = json.dumps(
+        values, default=str, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+    return int.from_bytes(
+        blake2b(encoded, digest_size=8).digest(), "little", signed=True
+    )
+
+
+def _polars_hashes(
+    frame: Any, key_columns: list[str]
+) -> tuple[list[int], list[int]]:
+    # hash_rows не гарантирует одинаковых хешей в разных версиях polars,
+    # поэтому записи хешируются по их значениям
+    keys: list[int] = [
+        _record_hash(row) for row in frame.select(key_columns).iter_rows()
+    ]
+    rows: list[int] = [_record_hash(row) for row in frame.iter_rows()]
+    return keys, rows
+
+
+def _polars_select(frame: Any, ops: list[str | None], op_column: str) -> Any:
+    pl = import_module("polars")
+    marked = frame.with_columns(pl.Series(op_column, ops, dtype=pl.Utf8))
+    return marked.filter(pl.col(op_column).is_not_null())
+
+
+def _polars_keys(
+    frame: Any, key_columns: list[str], mask: list[bool]
+) -> list[list[Any]]:
+    pl = import_module("polars")
+    return [
+        list(row)
+        for row in frame.select(key_columns).filter(pl.Series(mask)).rows()
+    ]
+
+
+def _polars_deletes(
+    key_rows: list[list[Any]], key_columns: list[str], op_column: str
+) -> Any:
+    pl = import_module("polars")
+    deleted = pl.DataFrame(key_rows, schema=key_columns, orient="row")
+    return deleted.with_columns(pl.lit("delete").alias(op_column))
+
+
+def _pandas_hashes(
+    frame: Any, key_columns: list[str]
+) -> tuple[list[int], list[int]]:
+    pd = import_module("pandas")
+    hash_object: Callable = pd.util.hash_pandas_object
+    keys = hash_object(frame[key_columns], index=False).to_numpy()
+    rows = hash_object(frame, index=False).to_numpy()
+    return keys.view("int64").tolist(), rows.view("int64").tolist()
+
+
+def _pandas_select(frame: Any, ops: list[str | None], op_column: str) -> Any:
+    selected = frame.assign(**{op_column: ops})
+    return selected[selected[op_column].notna()].reset_index(drop=True)
+
+
+def _pandas_keys(
+    frame: Any, key_columns: list[str], mask: Sequence[bool]
+) -> list[list[Any]]:
+    return frame.loc[list(mask), key_columns].to_numpy().tolist()
+
+
+def _pandas_deletes(
+    key_rows: list[list[Any]], key_columns: list[str], op_column: str
+) -> Any:
+    pd = import_module("pandas")
+    return pd.DataFrame(key_rows, columns=key_columns).assign(
+        **{op_column: "delete"}
+    )
+
+
+reg_change_hooks(
+    "polars.DataFrame",
+    ChangeHooks(_polars_hashes, _polars_select, _polars_keys, _polars_deletes),
+)
+reg_change_hooks(
+    "pandas.DataFrame",
+    ChangeHooks(_pandas_hashes, _pandas_select, _pandas_keys, _pandas_deletes),
+)
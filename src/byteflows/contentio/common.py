@@ -5,10 +5,23 @@ These containers are mainly represented by dictionary-like singleton objects.
 
 from collections import defaultdict
 from collections.abc import Callable
+from typing import Any
 
 from byteflows.core import SingletonMixin
 
-__all__ = ["INPUT_MAP", "OUTPUT_MAP"]
+__all__ = [
+    "BATCH_INPUT_MAP",
+    "BUFFER_INPUTS",
+    "CHANGE_HOOKS_MAP",
+    "DIGEST_MAP",
+    "INPUT_MAP",
+    "MERGE_MAP",
+    "OUTPUT_MAP",
+    "RECORD_DEDUP_MAP",
+    "SCHEMA_HOOKS_MAP",
+    "TAG_SPLIT_MAP",
+    "TRANSPORT_MAP",
+]
 
 
 class _InputMap(SingletonMixin, dict[str, Callable]):
@@ -19,6 +32,14 @@ class _InputMap(SingletonMixin, dict[str, Callable]):
     """
 
 
+class _BatchInputMap(SingletonMixin, dict[str, Callable]):
+    """
+    Dict-like repository of batch data input (deserialization) functions. The
+    key is the name of the data type in the form of a string, the value is
+    callable, which deserializes a list of payloads of this type in one call.
+    """
+
+
 class _OutputMap(SingletonMixin, dict[str, Callable]):
     """
     Dict-like repository of data output (serialization) functions.
@@ -27,6 +48,75 @@ class _OutputMap(SingletonMixin, dict[str, Callable]):
     """
 
 
+class _MergeMap(SingletonMixin, dict[str, Callable]):
+    """
+    Dict-like repository of data merging functions. The key is the name of the
+    data type in the form of a string, the value is callable, which combines a
+    sequence of data objects of this type into one object.
+    """
+
+
+class _RecordDedupMap(SingletonMixin, dict[str, Callable]):
+    """
+    Dict-like repository of record deduplication functions. The key is the type
+    key of data objects (see records.type_key), the value is callable, which
+    removes records with repeated keys from a sequence of data objects of this
+    type.
+    """
+
+
+class _ChangeHooksMap(SingletonMixin, dict[str, Any]):
+    """
+    Dict-like repository of change data capture functions. The key is the type
+    key of data objects (see records.type_key), the value is a set of functions
+    (ChangeHooks) through which changes in data objects of this type are
+    detected.
+    """
+
+
+class _SchemaHooksMap(SingletonMixin, dict[str, Any]):
+    """
+    Dict-like repository of schema learning functions. The key is the type key
+    of data objects (see records.type_key), the value is a set of functions
+    (SchemaHooks) through which the schemas of data objects of this type are
+    learned.
+    """
+
+
+class _TagSplitMap(SingletonMixin, dict[str, Callable]):
+    """
+    Dict-like repository of functions for splitting tagged data objects. The
+    key is the type key of data objects (see records.type_key), the value is
+    callable, which splits a data object of this type by the response tag
+    column into per-response objects.
+    """
+
+
+class _TransportMap(SingletonMixin, dict[str, tuple[Callable, Callable]]):
+    """
+    Dict-like repository of functions for transferring data objects between
+    processes. The key is the type key of data objects (see records.type_key),
+    the value is a pair of callables, which encode a data object of this type
+    into bytes and decode it back.
+    """
+
+
+class _DigestMap(SingletonMixin, dict[str, Callable]):
+    """
+    Dict-like repository of content hashing functions. The key is the type key
+    of data objects (see records.type_key), the value is callable, which
+    returns a byte representation of the content of a data object of this type
+    for hashing.
+    """
+
+
+class _BufferInputs(SingletonMixin, set[str]):
+    """
+    Set of data types whose input (deserialization) functions accept any object
+    supporting the buffer protocol (memoryview, mmap), and not only bytes.
+    """
+
+
 class _IOContextMap(SingletonMixin, defaultdict):
     """
     Dict-like repository of registered IO contexts. Any object can be used as a key (usually an instance of the resource request class).
@@ -42,9 +132,74 @@ The key is the name of the data type in the form of a string, the value is calla
 assigned as a handler for the corresponding data type.
 """
 
+BATCH_INPUT_MAP = _BatchInputMap()
+"""
+Dict-like repository of batch data input (deserialization) functions. The key
+is the name of the data type in the form of a string, the value is callable,
+which deserializes a list of payloads of this type in one call.
+"""
+
 OUTPUT_MAP = _OutputMap()
 """
 Dict-like repository of data output (serialization) functions.
 The key is the name of the data type in the form of a string, the value is callable,
 assigned as a handler for the corresponding data type.
 """
+
+MERGE_MAP = _MergeMap()
+"""
+Dict-like repository of data merging functions. The key is the name of the data
+type in the form of a string, the value is callable, which combines a sequence
+of data objects of this type into one object.
+"""
+
+RECORD_DEDUP_MAP = _RecordDedupMap()
+"""
+Dict-like repository of record deduplication functions. The key is the type key
+of data objects (see records.type_key), the value is callable, which removes
+records with repeated keys from a sequence of data objects of this type.
+"""
+
+CHANGE_HOOKS_MAP = _ChangeHooksMap()
+"""
+Dict-like repository of change data capture functions. The key is the type key
+of data objects (see records.type_key), the value is a set of functions
+(ChangeHooks) through which changes in data objects of this type are detected.
+"""
+
+SCHEMA_HOOKS_MAP = _SchemaHooksMap()
+"""
+Dict-like repository of schema learning functions. The key is the type key of
+data objects (see records.type_key), the value is a set of functions
+(SchemaHooks) through which the schemas of data objects of this type are
+learned.
+"""
+
+TAG_SPLIT_MAP = _TagSplitMap()
+"""
+Dict-like repository of functions for splitting tagged data objects. The key is
+the type key of data objects (see records.type_key), the value is callable,
+which splits a data object of this type by the response tag column into
+per-response objects.
+"""
+
+TRANSPORT_MAP = _TransportMap()
+"""
+Dict-like repository of functions for transferring data objects between
+processes. The key is the type key of data objects (see records.type_key), the
+value is a pair of callables, which encode a data object of this type into
+bytes and decode it back.
+"""
+
+DIGEST_MAP = _DigestMap()
+"""
+Dict-like repository of content hashing functions. The key is the type key of
+data objects (see records.type_key), the value is callable, which returns a
+byte representation of the content of a data object of this type for hashing.
+"""
+
+BUFFER_INPUTS = _BufferInputs()
+"""
+Set of data types whose input (deserialization) functions accept any object
+supporting the buffer protocol (memoryview, mmap), and not only bytes.
+"""
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from importlib import import_module
+from typing import Any
+
+from byteflows.contentio.contentio import deserialize, serialize
+from byteflows.utils import count_rows
+
+__all__ = [
+    "CompressedPayload",
+    "available_codecs",
+    "compress_object",
+    "reg_codec",
+]
+
+"""
+This module provides in-memory compression of buffered content. The zstd and
+lz4 codecs are available if the zstandard and lz4 packages are installed (extra
+"compression"), the zlib codec is always available.
+"""
+
+
+def _zlib_compress(data: bytes) -> bytes:
+    return zlib.compress(data, 1)
+
+
+_CODECS: dict[
+    str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]
+] = {"zlib": (_zlib_compress, zlib.decompress)}
+
+
+def reg_codec(
+    name: str,
+    compress: Callable[[bytes], bytes],
+    decompress: Callable[[bytes], bytes],
+) -> None:
+    """
+    Registers a compression codec. The functions must be thread-safe, since
+    they are called in worker threads.
+
+    Args:
+        name (str): name of the codec.
+        compress (Callable[[bytes], bytes]): compression function.
+        decompress (Callable[[bytes], bytes]): decompression function.
+    """
+    _CODECS[name] = (compress, decompress)
+
+
+def available_codecs() -> list[str]:
+    """
+    Returns the names of the registered compression codecs.
+
+    Returns:
+        list[str]: names of the codecs.
+    """
+    return list(_CODECS)
+
+
+try:
+    _zstd = import_module("zstandard")
+    reg_codec("zstd", _zstd.compress, _zstd.decompress)
+except ImportError:
+    pass
+
+try:
+    _lz4 = import_module("lz4.frame")
+    reg_codec("lz4", _lz4.compress, _lz4.decompress)
+except ImportError:
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class CompressedPayload:
+    """
+    A data object serialized into the output format and compressed. Buffers
+    store such payloads instead of data objects when compression is enabled for
+    the storage.
+
+    Attributes:
+        data (bytes): compressed content.
+        codec (str): name of the codec.
+        format (str): the format into which the object is serialized.
+        raw_size (int): size of the serialized content in bytes.
+        rows (int | None): number of rows in the data object, if it can be
+            determined.
+    """
+
+    data: bytes
+    codec: str
+    format: str
+    raw_size: int
+    rows: int | None
+
+    def decompress(self) -> bytes:
+        """
+        Returns the serialized content.
+
+        Returns:
+            bytes: content in the output format.
+        """
+        return _CODECS[self.codec][1](self.data)
+
+    def decode(self) -> Any:
+        """
+        Returns the data object. The input function of the output format must
+        be registered.
+
+        Returns:
+            Any: data object.
+        """
+        return deserialize(self.decompress(), self.format)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+
+def compress_object(
+    dataobj: Any, format: str, codec: str
+) -> CompressedPayload:
+    """
+    Serializes the data object into the given format and compresses it. The
+    function is blocking and is intended to be executed in a worker thread.
+
+    Args:
+        dataobj (Any): data object.
+        format (str): the output format.
+        codec (str): name of the codec.
+
+    Raises:
+        KeyError: thrown if the codec is not registered (for example, the
+            package implementing it is not installed).
+
+    Returns:
+        CompressedPayload: compressed content.
+    """
+    if codec not in _CODECS:
+        msg = (
+            f"Кодек {codec} недоступен. Доступные кодеки: "
+            f"{available_codecs()}."
+        )
+        raise KeyError(msg)
+    content: bytes = serialize(dataobj, format)
+    return CompressedPayload(
+        _CODECS[codec][0](content),
+        codec,
+        format,
+        len(content),
+        count_rows(dataobj),
+    )
@@ -1,23 +1,60 @@
 from __future__ import annotations
 
 import os
-from asyncio import Future, gather, to_thread
-from collections.abc import AsyncIterator, Callable, Coroutine, Iterable
+from asyncio import (
+    Future,
+    Semaphore,
+    as_completed,
+    ensure_future,
+    gather,
+    get_running_loop,
+    to_thread,
+)
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Mapping,
+    Sequence,
+)
+from concurrent.futures import Executor
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field, replace
-from functools import reduce
-from inspect import signature
+from functools import partial
+from inspect import (
+    isasyncgenfunction,
+    iscoroutinefunction,
+    isgeneratorfunction,
+    signature,
+)
 from io import BytesIO
-from itertools import chain
+from itertools import chain, groupby
+from pathlib import Path
 from pprint import pprint
 from sys import platform
-from typing import IO, TYPE_CHECKING, Any, Self, cast
+from typing import IO, TYPE_CHECKING, Any, Literal, Self, cast
+from zlib import crc32
 
 if TYPE_CHECKING:
     from byteflows.storages import BaseBufferableStorage
+    from byteflows.storages.base import Mb
 
+from byteflows.contentio.cdc import ChangeCapture
 from byteflows.contentio.common import *
+from byteflows.contentio.dedup import ContentDeduplicator
+from byteflows.contentio.executors import (
+    ExecutorKind,
+    call_remote,
+    create_executor,
+    from_wire,
+    to_wire,
+    warm_up,
+)
 from byteflows.contentio.helpers import *
+from byteflows.contentio.memo import StepCache, object_digest, step_identity
+from byteflows.contentio.profiling import StepProfiler, profile_step
+from byteflows.contentio.records import split_tagged, type_key
+from byteflows.contentio.schema import SchemaLearner
 from byteflows.core import SfnUndefined, Undefined
 
 __all__ = [
@@ -25,13 +62,19 @@ __all__ = [
     "IOContext",
     "PathSegment",
     "PathTemplate",
+    "PipelineStep",
+    "ShardSegment",
     "allowed_datatypes",
     "create_datatype",
     "create_io_context",
     "deserialize",
+    "deserialize_many",
+    "merge",
     "reg_input",
+    "reg_merge",
     "reg_output",
     "serialize",
+    "serialize_into",
 ]
 
 """
@@ -40,7 +83,12 @@ This module provides functions and classes responsible for input/output and seri
 
 
 def reg_input(
-    extension: str, func: Callable, extra_args: dict[str, Any] = {}
+    extension: str,
+    func: Callable,
+    extra_args: dict[str, Any] = {},
+    *,
+    accept_buffer: bool = False,
+    batch: bool = False,
 ) -> None:
     """
     Registers a data deserialization function.
@@ -49,10 +97,31 @@ def reg_input(
         extension (str): the data format for which the function is intended (for example, json, csv, etc.).
         func (Callable): function for deserializing data.
         extra_args (dict[str, Any], optional): values of function arguments that need to be bound instead of the default ones. Defaults to {}.
+        accept_buffer (bool, optional): if True, the function can also accept a
+            memoryview over a memory-mapped file instead of bytes (for example,
+            orjson.loads or readers based on pyarrow.BufferReader). This allows
+            large local objects to be read without copying them into memory.
+            Defaults to False.
+        batch (bool, optional): if True, the function is registered as the
+            batch input function of the format in addition to the ordinary one.
+            It takes a list of payloads and returns either a list of data
+            objects, one per payload, or one data object whose records are
+            tagged with the position of their payload in the RESPONSE_COL
+            column. See deserialize_many for details. Defaults to False.
 
     Raises:
         RuntimeError: thrown if the function fails validation. The error message indicates which part of the function is invalid.
     """
+    if batch:
+        if not check_batch_input_sig(func):
+            raise RuntimeError(
+                "Первым аргументом пакетной функции ввода должен быть список "
+                "объектов типа bytes"
+            ) from None
+        BATCH_INPUT_MAP[extension] = (
+            update_sign(func, extra_args) if extra_args else func
+        )
+        return
     if check_input_sig(func):
         func = update_sign(func, extra_args) if extra_args else func
     else:
@@ -60,6 +129,10 @@ def reg_input(
             "Первым аргументом функции ввода должен быть объект типа bytes"
         ) from None
     INPUT_MAP[extension] = func
+    if accept_buffer:
+        BUFFER_INPUTS.add(extension)
+    else:
+        BUFFER_INPUTS.discard(extension)
 
 
 def reg_output(
@@ -85,14 +158,37 @@ def reg_output(
     OUTPUT_MAP[extension] = func
 
 
+def reg_merge(extension: str, func: Callable) -> None:
+    """
+    Registers a data merging function. Such a function takes a sequence of data
+    objects of the same type (for example, a list of polars dataframes) and
+    returns one combined object. Merging functions are used when compacting
+    small objects in storage.
+
+    Args:
+        extension (str): the data format for which the function is intended
+            (for example, json, csv, etc.).
+        func (Callable): function for merging data objects.
+
+    Raises:
+        RuntimeError: thrown if the function is not callable.
+    """
+    if not callable(func):
+        msg = "Функция слияния должна быть вызываемым объектом."
+        raise RuntimeError(msg) from None
+    MERGE_MAP[extension] = func
+
+
 def deserialize(
-    content: bytes, format: str, extra_args: dict[str, Any] = {}
+    content: bytes | memoryview, format: str, extra_args: dict[str, Any] = {}
 ) -> Any:
     """
     Deserializes byte content into an object of the specified format.
 
     Args:
-        content (bytes): content received in byte representation.
+        content (bytes | memoryview): content received in byte representation.
+            A memoryview is only allowed for formats whose input function
+            accepts buffers (see reg_input).
         format (str): the format of the data that the resource provides.
         extra_args (dict[str, Any], optional): values of function arguments that need to be bound instead of the default ones. Defaults to {}.
 
@@ -107,6 +203,61 @@ def deserialize(
     return dataobj
 
 
+def deserialize_many(
+    contents: Sequence[bytes | memoryview],
+    format: str,
+    extra_args: dict[str, Any] = {},
+) -> list[Any]:
+    """
+    Deserializes a batch of payloads into data objects of the specified format,
+    one per payload. If a batch input function is registered for the format,
+    the whole batch is parsed in one call (for example, payloads joined into
+    one NDJSON document are read by one call of polars.read_ndjson), otherwise
+    each payload is deserialized separately. A tagged data object returned by
+    the batch function is split into per-response objects (see split_tagged).
+
+    Args:
+        contents (Sequence[bytes | memoryview]): payloads received in byte
+            representation.
+        format (str): the format of the data that the resource provides.
+        extra_args (dict[str, Any], optional): values of function arguments
+            that need to be bound instead of the default ones. Defaults to {}.
+
+    Raises:
+        KeyError: thrown if there is no registered function of the given
+            format.
+        ValueError: thrown if the batch function returned a list of the wrong
+            length.
+        TypeError: thrown if the batch function returned a tagged object of a
+            type that cannot be split.
+
+    Returns:
+        list[Any]: data objects in the order of the payloads.
+    """
+    func: Callable | None = BATCH_INPUT_MAP.get(format)
+    if func is None or not contents:
+        return [
+            deserialize(content, format, extra_args) for content in contents
+        ]
+    result: Any = func(list(contents), **extra_args)
+    if isinstance(result, list):
+        if len(result) != len(contents):
+            msg = (
+                f"Пакетная функция ввода вернула {len(result)} объектов "
+                f"вместо {len(contents)}."
+            )
+            raise ValueError(msg)
+        return result
+    dataobjs: list[Any] | None = split_tagged(result, len(contents))
+    if dataobjs is None:
+        msg = (
+            "Не зарегистрирована функция разделения для объектов типа "
+            f"{type_key(result)}."
+        )
+        raise TypeError(msg)
+    return dataobjs
+
+
 def serialize(
     dataobj: object, format: str, extra_args: dict[str, Any] = {}
 ) -> bytes:
@@ -130,6 +281,54 @@ def serialize(
     return byte_buf.getvalue()
 
 
+def merge(dataobjs: Sequence[Any], format: str) -> Any:
+    """
+    Merges a sequence of data objects of the given format into one object.
+
+    Args:
+        dataobjs (Sequence[Any]): data objects of the same type (for example,
+            polars df).
+        format (str): the data format for which the merging function is
+            registered.
+
+    Raises:
+        KeyError: thrown if there is no registered function of the given
+            format.
+
+    Returns:
+        Any: combined data object.
+    """
+    func: Callable[[Sequence[Any]], Any] = MERGE_MAP[format]
+    return func(dataobjs)
+
+
+def serialize_into(
+    dataobj: object,
+    format: str,
+    fileobj: IO[bytes],
+    extra_args: dict[str, Any] = {},
+) -> None:
+    """
+    Serializes the data object directly into a file-like object (for example, a
+    file opened for writing in the storage) without materializing the whole
+    byte representation in memory.
+
+    Args:
+        dataobj (object): data object of any type.
+        format (str): the target data format in which the object should be
+            written.
+        fileobj (IO[bytes]): writable byte stream.
+        extra_args (dict[str, Any], optional): values of function arguments
+            that need to be bound instead of the default ones. Defaults to {}.
+
+    Raises:
+        KeyError: thrown if there is no registered function of the given
+            format.
+    """
+    func: Callable[[Any, IO, dict], Any] = OUTPUT_MAP[format]
+    func(dataobj, fileobj, **extra_args)
+
+
 def create_datatype(
     *,
     format_name: str,
@@ -137,6 +336,9 @@ def create_datatype(
     extra_args_in: dict = {},
     output_func: Callable,
     extra_args_out: dict = {},
+    merge_func: Callable | None = None,
+    buffer_input: bool = False,
+    batch_input_func: Callable | None = None,
     replace: bool = False,
 ) -> None:
     """
@@ -148,6 +350,16 @@ def create_datatype(
         output_func (Callable): function for serializing data.
         extra_args_in (dict, optional): values of deserializing function arguments that need to be bound instead of the default ones. Defaults to {}.
         extra_args_out (dict, optional): the same for the serialization function.. Defaults to {}.
+        merge_func (Callable | None, optional): function for merging several
+            data objects into one (for example, pl.concat). Required to compact
+            objects of this format in storage. Defaults to None.
+        buffer_input (bool, optional): the deserializing function accepts
+            objects supporting the buffer protocol. See reg_input for details.
+            Defaults to False.
+        batch_input_func (Callable | None, optional): function for
+            deserializing a batch of payloads in one call. It is bound with the
+            same arguments as input_func. See reg_input for details. Defaults
+            to None.
 
     Raises:
         RuntimeError: thrown if the data format is already registered.
@@ -157,8 +369,14 @@ def create_datatype(
         or not format_name in OUTPUT_MAP
         or replace
     ):
-        reg_input(format_name, input_func, extra_args_in)
+        reg_input(
+            format_name, input_func, extra_args_in, accept_buffer=buffer_input
+        )
         reg_output(format_name, output_func, extra_args_out)
+        if merge_func is not None:
+            reg_merge(format_name, merge_func)
+        if batch_input_func is not None:
+            reg_input(format_name, batch_input_func, extra_args_in, batch=True)
     else:
         msg = "Данный тип данных уже зарегистрирован"
         raise RuntimeError(msg)
@@ -202,6 +420,8 @@ def _datatype_info(datatype: str) -> _DataTypeInfo:
             datatype: {
                 "output func": OUTPUT_MAP.get(datatype),
                 "input func": INPUT_MAP.get(datatype),
+                "merge func": MERGE_MAP.get(datatype),
+                "batch input func": BATCH_INPUT_MAP.get(datatype),
                 "data container": signature(
                     INPUT_MAP.get(datatype)  # type: ignore
                 ).return_annotation,
@@ -266,6 +486,62 @@ class PathSegment:
         return self.concatenator.join(str_represent)
 
 
+@dataclass
+class ShardSegment(PathSegment):
+    """
+    A special path segment that spreads objects across a fixed number of
+    key-space partitions (shards). The segment value is a hash bucket of the
+    rest of the rendered path, so writes under the same logical prefix land
+    under different physical prefixes. This is useful for object storages that
+    limit the request rate per prefix (for example, S3).
+
+    Args:
+        concatenator (str): not used, kept for compatibility with PathSegment.
+        segment_order (int): the position that the segment will occupy along
+            the path.
+        segment_parts (list[str | Callable]): not used, kept for compatibility
+            with PathSegment. Defaults to [].
+        shards (int): number of shards. Defaults to 16.
+        prefix (str): string placed before the shard number. Defaults to "".
+    """
+
+    shards: int = 16
+    prefix: str = ""
+
+    def shard_for(self, key: str) -> str:
+        """
+        Returns the segment value for the given key.
+
+        Args:
+            key (str): the rendered path without shard segments.
+
+        Returns:
+            str: shard prefix and the hexadecimal shard number.
+        """
+        bucket: int = crc32(key.encode()) % self.shards
+        return f"{self.prefix}{bucket:0{self._width}x}"
+
+    def all_shards(self) -> list[str]:
+        """
+        Returns all possible segment values. Can be used to list objects shard
+        by shard.
+
+        Returns:
+            list[str]: values of all shards.
+        """
+        return [
+            f"{self.prefix}{bucket:0{self._width}x}"
+            for bucket in range(self.shards)
+        ]
+
+    @property
+    def _width(self) -> int:
+        return len(f"{self.shards - 1:x}")
+
+    def __str__(self) -> str:
+        return ""
+
+
 class PathTemplate:
     """
     The class manages a collection of segments and is responsible for generating the full path to the data as a string.
@@ -300,6 +576,22 @@ class PathTemplate:
             PathSegment(concatenator, segment_order, segment_parts)
         )
 
+    def add_shard_segment(
+        self, segment_order: int, *, shards: int = 16, prefix: str = ""
+    ) -> ShardSegment:
+        """
+        A factory method that adds a hash-bucketed shard segment to the path.
+        For a description of the arguments, see ShardSegment. Since the shard
+        depends on the rest of the path, objects of one request are evenly
+        spread across shards.
+
+        Returns:
+            ShardSegment: created segment.
+        """
+        segment = ShardSegment("", segment_order, shards=shards, prefix=prefix)
+        self.segments.append(segment)
+        return segment
+
     def render_path(self, ext: str = "") -> str:
         """
         Generates and returns the data path. The optional ext parameter is used to add an extension to the path.
@@ -311,11 +603,21 @@ class PathTemplate:
             str: path to data with or without extension.
         """
         self.segments.sort(key=lambda x: x.segment_order)
-        nonull_segments = map(
-            lambda x: str(x),
-            filter(lambda x: x.__str__() != "", self.segments),
+        rendered: dict[int, str] = {
+            id(x): str(x)
+            for x in self.segments
+            if not isinstance(x, ShardSegment)
+        }
+        shard_key: str = "/".join(rendered.values())
+        nonull_segments: Iterable[str] = filter(
+            None,
+            (
+                x.shard_for(shard_key)
+                if isinstance(x, ShardSegment)
+                else rendered[id(x)]
+                for x in self.segments
+            ),
         )
-        nonull_segments: Iterable[str] = cast(Iterable[str], nonull_segments)
         if self.is_local or (platform == "linux" and not self.is_local):
             sep: str = os.sep
         elif platform == "win32" and not self.is_local:
@@ -327,6 +629,112 @@ class PathTemplate:
         )
 
 
+@dataclass(frozen=True, slots=True)
+class PipelineStep:
+    """
+    A handler function registered in a pipeline. Steps are callable objects, so
+    they can be applied to data directly.
+
+    Attributes:
+        func (Callable): handler function with bound additional arguments.
+        batch (bool): if True, the function is called once per batch. It
+            receives a list of data objects and returns a list of data objects,
+            the length of which may differ from the length of the batch.
+        merge (bool): used with batch. If True, the objects of the batch are
+            merged into one with the merging function of the input format (see
+            reg_merge), the function receives this object and returns one data
+            object.
+        kwargs (dict[str, Any]): additional arguments bound to the function.
+            They are passed explicitly when the step is transferred to a worker
+            process, where the function is imported without them.
+        asynchronous (bool): the function is a coroutine function or an
+            asynchronous generator function. Such steps are run on the event
+            loop.
+        generator (bool): the function is a generator function. Each data
+            object passed to it can produce zero or more data objects, each of
+            which is processed further and stored separately.
+        cacheable (bool): the function is deterministic, and its results are
+            memoized by the hash of the input data object (of the whole batch
+            for batch steps) in the cache of the pipeline. A data object that
+            has already passed through the step is not processed again.
+    """
+
+    func: Callable
+    batch: bool = False
+    merge: bool = False
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    asynchronous: bool = False
+    generator: bool = False
+    cacheable: bool = False
+
+    @property
+    def __name__(self) -> str:
+        return getattr(self.func, "__name__", repr(self.func))
+
+    def __call__(self, data: Any) -> Any:
+        return self.func(data)
+
+    def __reduce__(self) -> tuple[type, tuple[Any, ...]]:
+        func: Callable = (
+            partial(self.func, **self.kwargs) if self.kwargs else self.func
+        )
+        return PipelineStep, (
+            func,
+            self.batch,
+            self.merge,
+            {},
+            self.asynchronous,
+            self.generator,
+            self.cacheable,
+        )
+
+
+_SegmentKind = Literal["object", "batch", "async", "cached"]
+_Segment = tuple[_SegmentKind, Callable[[Any], Any]]
+
+
+def _apply_chain(steps: Sequence[PipelineStep], data: Any) -> list[Any]:
+    """
+    Applies consecutive per-object steps to one data object in the order given.
+    Generator steps can turn one object into several or none, so the result is
+    always a list.
+    """
+    content: list[Any] = [data]
+    for step in steps:
+        if step.generator:
+            content = [out for item in content for out in step.func(item)]
+        else:
+            content = [step.func(item) for item in content]
+    return content
+
+
+def _apply_batch(
+    step: PipelineStep, in_format: str, content: list[Any]
+) -> list[Any]:
+    """
+    Applies the batch step to the batch, merging it beforehand if the step
+    requires it.
+    """
+    if step.merge:
+        return [step.func(merge(content, in_format))] if content else []
+    return list(step.func(content))
+
+
+def _run_segments(
+    segments: Sequence[_Segment], content: list[Any]
+) -> list[Any]:
+    """
+    Applies synchronous segments of the compiled chain of the pipeline to the
+    batch in the current thread.
+    """
+    for kind, func in segments:
+        if kind == "batch":
+            content = func(content)
+        else:
+            content = [out for data in content for out in func(data)]
+    return content
+
+
 @dataclass
 class IOBoundPipeline:
     """
@@ -335,50 +743,147 @@ class IOBoundPipeline:
     The data is processed in batches, the size of which depends on the settings of the resource involved
     and the current load on the resource. Each pipeline is inextricably linked to an I/O context, and
     for any such context there can only be one pipeline.
+    Before the first run, the chain of functions is compiled: consecutive
+    per-object steps are composed into one function, batch steps are applied to
+    the whole batch. The chain is compiled again if the list of functions
+    changes. In the per_object mode, each data object is processed in a
+    separate worker thread call, batch steps are called once per batch. In the
+    fused mode, the whole chain is applied to the batch in one worker thread
+    call, which avoids thread handoffs when the batch consists of many small
+    objects. By default, steps are run in the thread pool of the event loop.
+    CPU-bound steps that hold the GIL can be moved to a pool of processes or
+    subinterpreters with the use_executor method. In this case, steps must be
+    defined at module level, and data objects are transferred to workers as
+    described in the executors module. Asynchronous steps (for example,
+    enrichment with data from another service) are run on the event loop, no
+    more than concurrency of them at a time. Generator steps can produce any
+    number of data objects from one object. Results of deterministic steps
+    registered with cache=True are memoized in the cache of the pipeline (see
+    attache_cache), so unchanged data objects skip such steps on repeated runs.
+    Each cached step is run separately from the other steps and is not combined
+    with them in the fused mode. Profiling is enabled with the enable_profiling
+    method. Only then are the steps wrapped to measure their calls, so a
+    pipeline without a profiler runs exactly as before.
 
     Attributes:
         io_context (IOContext): an I/O context object to which the pipeline will be associated.
-        functions (list[Callable]): list of registered functions. The order of the functions in the list directly indicates the order in which they are tried on.
+        functions (list[PipelineStep]): list of registered steps. The order of
+            the steps in the list directly indicates the order in which they
+            are tried on.
         on_error (Callable): exception catching function. Can be used for specific exception handling. By default, it is a lambda function that returns
                             any object passed to it unchanged.
         data_filter (Callable): a function for filtering content for invalid blocks. Registered via the appropriate method. By default, it is a lambda function
                             that returns any object passed to it unchanged.
+        mode (Literal["per_object", "fused"]): execution mode of the pipeline.
+        concurrency (int): maximum number of simultaneously running calls of
+            asynchronous steps within one batch.
+        executor (ExecutorKind): kind of the executor on which the steps are
+            run.
+        cache (StepCache | None): cache of the results of cacheable steps. None
+            if no step is cacheable and no cache is attached.
+        profiler (StepProfiler | None): profiler collecting measurements of the
+            calls of the steps. None if profiling is disabled.
 
     Args:
         io_context (IOContext): an I/O context object to which the pipeline will be associated.
-        functions (list[Callable]): list of registered functions. The order of the functions in the list directly indicates the order in which they are tried on.
+        functions (list[PipelineStep]): list of registered steps. The order of
+            the steps in the list directly indicates the order in which they
+            are tried on.
         on_error (Callable): exception catching function. Can be used for specific exception handling. By default, it is a lambda function that returns
                             any object passed to it unchanged.
         data_filter (Callable): a function for filtering content for invalid blocks. Registered via the appropriate method. By default, it is a lambda function
                             that returns any object passed to it unchanged.
+        mode (Literal["per_object", "fused"]): execution mode of the pipeline.
+            Defaults to "per_object".
+        concurrency (int): maximum number of simultaneously running calls of
+            asynchronous steps within one batch. Defaults to 16.
     """
 
     io_context: IOContext
-    functions: list[Callable] = field(default_factory=list)
+    functions: list[PipelineStep] = field(default_factory=list)
     on_error: Callable = lambda x: x
     data_filter: Callable = lambda x: True
+    mode: Literal["per_object", "fused"] = "per_object"
+    concurrency: int = 16
+    executor: ExecutorKind = field(default="thread", init=False)
+    cache: StepCache | None = field(default=None, init=False, repr=False)
+    profiler: StepProfiler | None = field(default=None, init=False, repr=False)
+    _pool: Executor | None = field(default=None, init=False, repr=False)
+    _compiled_for: tuple[Any, ...] | None = field(
+        default=None, init=False, repr=False
+    )
+    _segments: list[_Segment] = field(
+        default_factory=list, init=False, repr=False
+    )
 
     def step(
-        self, order: int, *, extra_kwargs: dict[str, Any] = {}
+        self,
+        order: int,
+        *,
+        extra_kwargs: dict[str, Any] = {},
+        batch: bool = False,
+        merge: bool = False,
+        cache: bool = False,
     ) -> Callable:
         """
-        Method for registering a handler function.
+        Method for registering a handler function. The function can be an
+        ordinary function, a generator function, a coroutine function or an
+        asynchronous generator function. See PipelineStep for details.
 
         Args:
             order (int): position of the function in the pipeline. This argument ultimately determines the order in
                         which handlers are applied to the data.
             extra_kwargs (dict[str, Any], optional): additional handler function arguments. Under the hood, _update_sign is applied. Defaults to {}.
+            batch (bool, optional): the function processes the whole batch at
+                once. See PipelineStep for details. Defaults to False.
+            merge (bool, optional): the batch is merged into one data object
+                before being passed to the batch function. See PipelineStep for
+                details. Defaults to False.
+            cache (bool, optional): memoize the results of the function by the
+                hash of the input data. If no cache is attached to the
+                pipeline, a cache with default settings is attached. See
+                PipelineStep for details. Defaults to False.
+
+        Raises:
+            ValueError: thrown if an asynchronous function is registered as a
+                batch step.
 
         Returns:
             Callable: function registered as a data handler without modification.
         """
 
         def wrapper(func):
-            self._check_sig(func)
+            asynchronous: bool = iscoroutinefunction(
+                func
+            ) or isasyncgenfunction(func)
+            generator: bool = isgeneratorfunction(func) or isasyncgenfunction(
+                func
+            )
+            if batch and asynchronous:
+                msg = (
+                    "Асинхронная функция не может быть зарегистрирована как "
+                    "пакетный шаг."
+                )
+                raise ValueError(msg)
+            if not generator and (not batch or merge):
+                self._check_sig(func)
             updated_func: Callable = update_sign(
                 func, extra_kwargs=extra_kwargs
             )
-            self.functions.insert(order - 1, updated_func)
+            if cache and self.cache is None:
+                self.attache_cache()
+            self.functions.insert(
+                order - 1,
+                PipelineStep(
+                    updated_func,
+                    batch,
+                    batch and merge,
+                    dict(extra_kwargs),
+                    asynchronous,
+                    generator,
+                    cache,
+                ),
+            )
             return func
 
         return wrapper
@@ -392,31 +897,407 @@ class IOBoundPipeline:
         """
         self.data_filter = func
 
+    def attache_cache(
+        self,
+        max_size: Mb = 64,
+        *,
+        db_path: str | Path | None = None,
+        disk_size: Mb = 1024,
+    ) -> StepCache:
+        """
+        The method creates and binds a cache of the results of cacheable steps.
+        Entries are keyed by the hash of the input data and the identity of the
+        step (see step_identity), so changing the code or the arguments of a
+        step invalidates its results. With the disk tier, results survive
+        restarts of the application.
+
+        Args:
+            max_size (Mb, optional): size limit of the memory tier in
+                megabytes. Defaults to 64.
+            db_path (str | Path | None, optional): path to the database file of
+                the disk tier. If None, only the memory tier is used. Defaults
+                to None.
+            disk_size (Mb, optional): size limit of the disk tier in megabytes.
+                Defaults to 1024.
+
+        Returns:
+            StepCache: cache instance.
+        """
+        if self.cache is not None:
+            self.cache.close()
+        self.cache = StepCache(max_size, db_path=db_path, disk_size=disk_size)
+        return self.cache
+
+    def enable_profiling(self, window: int = 10_000) -> StepProfiler:
+        """
+        The method enables profiling of the steps. Each call of a step records
+        its wall and CPU time, the number of rows and the size of the input and
+        output data and the raised exception, if any. The statistics are
+        available through the report method of the profiler and are shown by
+        show_pipeline. Calls of cacheable steps answered from the cache are not
+        measured.
+
+        Args:
+            window (int, optional): number of the last calls of each step over
+                which percentiles are calculated. Defaults to 10_000.
+
+        Returns:
+            StepProfiler: profiler instance.
+        """
+        self.profiler = StepProfiler(window)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        """
+        The method disables profiling of the steps. The collected statistics
+        are kept in the detached profiler.
+        """
+        self.profiler = None
+
+    def _compile(self) -> list[_Segment]:
+        """
+        Compiles the chain of registered steps into segments. Each segment is
+        the kind of the segment and its function: consecutive synchronous
+        per-object steps form one "object" segment, each batch step forms a
+        "batch" segment, each asynchronous step forms an "async" segment, each
+        cacheable step forms a "cached" segment. In the fused mode, consecutive
+        synchronous segments are combined into one "batch" segment. The result
+        is cached until the list of steps or the mode changes.
+
+        Returns:
+            list[_Segment]: compiled chain.
+        """
+        key: tuple[Any, ...] = (self.mode, self.profiler, *self.functions)
+        if key == self._compiled_for:
+            return self._segments
+        in_format: str = self.io_context.in_format
+        steps: list[PipelineStep] = [
+            step if isinstance(step, PipelineStep) else PipelineStep(step)
+            for step in self.functions
+        ]
+        if self.profiler is not None:
+            steps = [profile_step(step, self.profiler) for step in steps]
+        segments: list[_Segment] = []
+        for kind, group in groupby(
+            steps,
+            key=lambda step: "cached"
+            if step.cacheable
+            else "async"
+            if step.asynchronous
+            else ("batch" if step.batch else "object"),
+        ):
+            if kind == "object":
+                segments.append(
+                    ("object", partial(_apply_chain, tuple(group)))
+                )
+            elif kind == "batch":
+                segments.extend(
+                    ("batch", partial(_apply_batch, step, in_format))
+                    for step in group
+                )
+            else:
+                segments.extend((kind, step) for step in group)  # type: ignore
+        if self.mode == "fused":
+            fused: list[_Segment] = []
+            for separate, run in groupby(
+                segments, key=lambda s: s[0] in ("async", "cached")
+            ):
+                if separate:
+                    fused.extend(run)
+                else:
+                    fused.append(("batch", partial(_run_segments, tuple(run))))
+            segments = fused
+        self._compiled_for, self._segments = key, segments
+        return segments
+
+    def use_executor(
+        self,
+        kind: ExecutorKind,
+        workers: int | None = None,
+        *,
+        warm: bool = True,
+    ) -> Self:
+        """
+        The method sets the executor on which the synchronous steps of the
+        pipeline are run. The previous executor, if any, is shut down.
+
+        Args:
+            kind (ExecutorKind): "thread", "process" or "interpreter". See
+                create_executor for details.
+            workers (int | None, optional): number of workers. Defaults to the
+                number of processors.
+            warm (bool, optional): start the workers immediately and pass the
+                compiled steps to them. In this way, the modules of the steps
+                are imported in advance, and steps that cannot be transferred
+                to workers cause an error now rather than during data
+                collection. Defaults to True.
+
+        Returns:
+            Self: the pipeline itself.
+        """
+        self.shutdown_executor()
+        workers = workers or os.cpu_count() or 1
+        self._pool = create_executor(kind, workers)
+        self.executor = kind
+        if warm:
+            probe: list[_Segment] = [
+                segment for segment in self._compile() if segment[0] != "async"
+            ]
+            warm_up(self._pool, workers, probe)
+        return self
+
+    def shutdown_executor(self) -> None:
+        """
+        The method shuts down the executor set by use_executor and returns the
+        pipeline to the thread pool of the event loop.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool, self.executor = None, "thread"
+
+    async def _submit(
+        self, func: Callable, data: Any, batch: bool
+    ) -> list[Any]:
+        """
+        Runs the function of a synchronous segment on the executor of the
+        pipeline. For process and subinterpreter executors, data objects are
+        encoded for transfer and decoded after it.
+
+        Args:
+            func (Callable): function of a compiled segment.
+            data (Any): data object or, if batch is True, a list of them.
+            batch (bool): the function takes a list of data objects.
+
+        Returns:
+            list[Any]: data objects produced by the function.
+        """
+        if self._pool is None:
+            return await to_thread(func, data)
+        loop = get_running_loop()
+        if self.executor == "thread":
+            return await loop.run_in_executor(self._pool, func, data)
+        payload: Any = (
+            [to_wire(item) for item in data] if batch else to_wire(data)
+        )
+        profiler: StepProfiler | None = self.profiler
+        result: Any = await loop.run_in_executor(
+            self._pool, call_remote, func, payload, batch, profiler is not None
+        )
+        if profiler is not None:
+            result, samples, exc = result
+            profiler.extend(samples)
+            if exc is not None:
+                raise exc
+        return [from_wire(item) for item in result]
+
+    @staticmethod
+    async def _call_async(
+        step: PipelineStep, data: Any, limiter: Semaphore
+    ) -> list[Any]:
+        """
+        Runs the asynchronous step on the event loop, waiting for a free slot
+        of the limiter.
+
+        Args:
+            step (PipelineStep): asynchronous step.
+            data (Any): data object.
+            limiter (Semaphore): semaphore limiting the number of simultaneous
+                calls.
+
+        Returns:
+            list[Any]: data objects produced by the step.
+        """
+        async with limiter:
+            if step.generator:
+                return [out async for out in step.func(data)]
+            return [await step.func(data)]
+
+    async def _run_cached(
+        self, step: PipelineStep, content: list[Any], limiter: Semaphore
+    ) -> list[Any]:
+        """
+        Runs the cacheable step: the results for data objects found in the
+        cache are taken from it, the step is applied only to the rest of them
+        (once for identical objects), and its results are stored in the cache.
+        A batch step is looked up by the whole batch.
+
+        Args:
+            step (PipelineStep): cacheable step.
+            content (list[Any]): data objects.
+            limiter (Semaphore): semaphore limiting the number of simultaneous
+                calls of asynchronous steps.
+
+        Returns:
+            list[Any]: data objects produced by the step.
+        """
+        cache: StepCache = self.cache or self.attache_cache()
+        units: list[Any] = [content] if step.batch else content
+        identity: str = step_identity(step)
+        digests: list[str] = await to_thread(
+            lambda: [object_digest(unit) for unit in units]
+        )
+        found: list[tuple[bool, Any]] = await to_thread(
+            cache.lookup, identity, step.__name__, digests
+        )
+        missed: dict[str, int] = {}
+        for idx, (hit, _) in enumerate(found):
+            if not hit:
+                missed.setdefault(digests[idx], idx)
+        if step.asynchronous:
+            computed = await gather(
+                *[
+                    self._call_async(step, units[idx], limiter)
+                    for idx in missed.values()
+                ]
+            )
+        else:
+            func: Callable = (
+                partial(_apply_batch, step, self.io_context.in_format)
+                if step.batch
+                else partial(_apply_chain, (step,))
+            )
+            computed = await gather(
+                *[
+                    self._submit(func, units[idx], step.batch)
+                    for idx in missed.values()
+                ]
+            )
+        fresh: dict[str, list[Any]] = dict(zip(missed, computed))
+        results: list[list[Any]] = [
+            value if hit else fresh[digest]
+            for (hit, value), digest in zip(found, digests)
+        ]
+        if fresh:
+            await to_thread(cache.store, identity, list(fresh.items()))
+        return list(chain.from_iterable(results))
+
+    async def _run_chain(
+        self,
+        segments: Sequence[_Segment],
+        content: list[Any],
+        limiter: Semaphore,
+    ) -> list[Any]:
+        """
+        Applies the compiled chain to the data objects: synchronous segments
+        are run on the executor, asynchronous ones on the event loop.
+
+        Args:
+            segments (Sequence[_Segment]): compiled chain.
+            content (list[Any]): data objects.
+            limiter (Semaphore): semaphore limiting the number of simultaneous
+                calls of asynchronous steps.
+
+        Returns:
+            list[Any]: processed data objects.
+        """
+        for kind, func in segments:
+            if kind == "batch":
+                content = await self._submit(func, content, True)
+                continue
+            if kind == "cached":
+                content = await self._run_cached(
+                    func,  # type: ignore
+                    content,
+                    limiter,
+                )
+                continue
+            if kind == "object":
+                results = await gather(
+                    *[self._submit(func, data, False) for data in content]
+                )
+            else:
+                results = await gather(
+                    *[
+                        self._call_async(func, data, limiter)
+                        for data in content
+                    ]  # type: ignore
+                )
+            content = list(chain.from_iterable(results))
+        return content
+
+    async def _execute(self, content: list[Any]) -> list[Any]:
+        """
+        Applies the compiled chain to the batch according to the execution
+        mode.
+
+        Args:
+            content (list[Any]): batch with data objects.
+
+        Returns:
+            list[Any]: processed data objects in the order of the batch.
+        """
+        return await self._run_chain(
+            self._compile(), content, Semaphore(self.concurrency)
+        )
+
     @asynccontextmanager
     async def run_transform(
         self, dataobj: Iterable[Any]
     ) -> AsyncIterator[Future]:
         """
         The method starts the data processing process. At this stage, content is validated and filtered,
-        as well as its transformation in a separate thread.
+        as well as its transformation in worker threads.
 
         Args:
             dataobj (Iterable[Any]): batch with data objects of any type.
 
         Yields:
-            AsyncIterator[Future]: asyncio futures (in the form of an asynchronous iterator) to wait for the processing of a data batch to complete.
+            AsyncIterator[Future]: asyncio future (in the form of an
+                asynchronous iterator) to wait for the processing of a data
+                batch to complete.
         """
         valid_content: list[Any] = [
             data for data in dataobj if self.data_filter(data)
         ]
         try:
-            coros = []
-            for data in valid_content:
-                coro: Coroutine[Any, None, Any] = to_thread(
-                    reduce, lambda arg, func: func(arg), self.functions, data
-                )
-                coros.append(coro)
-            yield gather(*coros)
+            yield ensure_future(self._execute(valid_content))
+        except Exception as exc:
+            res: Any = self.on_error(exc)
+            if isinstance(res, Exception):
+                raise res
+
+    async def stream_transform(
+        self, dataobj: Iterable[Any]
+    ) -> AsyncIterator[list[Any]]:
+        """
+        The method processes the batch like run_transform, but produces the
+        results as they become ready: each data object of the batch passes
+        through the chain independently, and the objects produced from it are
+        yielded as soon as it is done. If the chain contains batch steps
+        (including the fused mode and cacheable batch steps), the whole batch
+        is yielded at once after processing.
+
+        Args:
+            dataobj (Iterable[Any]): batch with data objects of any type.
+
+        Yields:
+            AsyncIterator[list[Any]]: processed data objects produced from one
+                data object of the batch or from the whole batch.
+        """
+        valid_content: list[Any] = [
+            data for data in dataobj if self.data_filter(data)
+        ]
+        segments: list[_Segment] = self._compile()
+        limiter = Semaphore(self.concurrency)
+        try:
+            if not segments or any(
+                kind == "batch"
+                or (kind == "cached" and getattr(func, "batch", False))
+                for kind, func in segments
+            ):
+                yield await self._run_chain(segments, valid_content, limiter)
+                return
+            tasks: list[Future] = [
+                ensure_future(self._run_chain(segments, [data], limiter))
+                for data in valid_content
+            ]
+            try:
+                for done in as_completed(tasks):
+                    if outputs := await done:
+                        yield outputs
+            finally:
+                for task in tasks:
+                    task.cancel()
         except Exception as exc:
             res: Any = self.on_error(exc)
             if isinstance(res, Exception):
@@ -471,7 +1352,7 @@ class IOBoundPipeline:
             old_idx (int): old position.
             new_idx (int): new position.
         """
-        func: Callable = self.functions.pop(old_idx)
+        func: PipelineStep = self.functions.pop(old_idx)
         self.functions.insert(new_idx, func)
 
     def show_pipeline(self) -> str:
@@ -484,9 +1365,58 @@ class IOBoundPipeline:
         ctx: IOContext = self.io_context
         pipe: list[str] = [
             f"{order}: {func.__name__}"
+            + "".join(
+                f" [{tag}]"
+                for tag in ("batch", "asynchronous", "generator", "cacheable")
+                if getattr(func, tag, False)
+            )
+            + self._cache_summary(func)
+            + self._profile_summary(func)
             for order, func in enumerate(self.functions)
         ]
-        return " -> ".join(pipe) + f" for {ctx.in_format}."
+        return (
+            " -> ".join(pipe)
+            + f" for {ctx.in_format} ({self.mode}, {self.executor})."
+        )
+
+    def _cache_summary(self, step: PipelineStep) -> str:
+        """
+        Returns the cache statistics of the step for show_pipeline, or an empty
+        string if the step has no statistics yet.
+        """
+        if self.cache is None or not getattr(step, "cacheable", False):
+            return ""
+        stats: dict[str, int | float] | None = self.cache.report().get(
+            step.__name__
+        )
+        if stats is None:
+            return ""
+        return (
+            f" (hits: {stats['hits']}, disk hits: {stats['disk_hits']},"
+            f" misses: {stats['misses']})"
+        )
+
+    def _profile_summary(self, step: PipelineStep) -> str:
+        """
+        Returns the profiling statistics of the step for show_pipeline, or an
+        empty string if profiling is disabled or the step has not been called
+        yet.
+        """
+        if self.profiler is None:
+            return ""
+        stats: dict[str, Any] | None = self.profiler.report().get(
+            step.__name__
+        )
+        if stats is None:
+            return ""
+        wall: dict[str, float] = stats["wall"]
+        return (
+            f" (calls: {stats['calls']}, errors: {stats['errors']},"
+            " wall p50/p99: "
+            f"{wall['p50'] * 1000:.2f}/{wall['p99'] * 1000:.2f} ms,"
+            f" cpu p50: {stats['cpu']['p50'] * 1000:.2f} ms,"
+            f" rows: {stats['rows_in']} -> {stats['rows_out']})"
+        )
 
 
 class IOContext:
@@ -502,6 +1432,18 @@ class IOContext:
         storage (BaseBufferableStorage): storage in which the data will be stored.
         path_temp (PathTemplate): path generator for storing data in storage. See PathTemplate for details.
         pipeline (IOBoundPipeline): a pipeline object initiated within the current I/O context. See IOBoundPipeline for details.
+        dedup (ContentDeduplicator): deduplicator of the received content. See
+            ContentDeduplicator for details.
+        key_columns (list[str] | None): columns whose values identify a record.
+            If specified, records with repeated keys are removed from all
+            buffered objects of the request before they are uploaded.
+        keep (Literal["first", "last"]): which of the records with repeated
+            keys is kept.
+        cdc (ChangeCapture): change data capture index. If attached, only
+            changed records are written. See ChangeCapture for details.
+        schema (SchemaLearner): schema learner of the incoming data. If
+            attached, the schema is passed to the input function instead of
+            being inferred for every response. See SchemaLearner for details.
     """
 
     def __init__(
@@ -510,19 +1452,30 @@ class IOContext:
         in_format: str,
         out_format: str,
         storage: BaseBufferableStorage,
+        key_columns: list[str] | None = None,
+        keep: Literal["first", "last"] = "last",
     ) -> None:
         """
         Args:
             in_format (str): format of incoming data.
             out_format (str): the format in which the data should be saved.
             storage (BaseBufferableStorage): storage in which the data will be stored.
+            key_columns (list[str] | None, optional): columns whose values
+                identify a record. Defaults to None.
+            keep (Literal["first", "last"], optional): which of the records
+                with repeated keys is kept. Defaults to "last".
         """
         self.in_format: str = in_format
         self.out_format: str = out_format
         self._check_io()
         self.storage: BaseBufferableStorage = storage
+        self.key_columns: list[str] | None = key_columns
+        self.keep: Literal["first", "last"] = keep
         self.path_temp: PathTemplate | Undefined = SfnUndefined
         self.pipeline: IOBoundPipeline | Undefined = SfnUndefined
+        self.dedup: ContentDeduplicator | Undefined = SfnUndefined
+        self.cdc: ChangeCapture | Undefined = SfnUndefined
+        self.schema: SchemaLearner | Undefined = SfnUndefined
 
     @property
     def out_path(self) -> str:
@@ -534,16 +1487,131 @@ class IOContext:
         """
         return self.path_temp.render_path(self.out_format)
 
-    def attache_pipeline(self) -> IOBoundPipeline:
+    def attache_pipeline(
+        self,
+        mode: Literal["per_object", "fused"] = "per_object",
+        *,
+        concurrency: int = 16,
+    ) -> IOBoundPipeline:
         """
         Method creates and links a data processing pipeline.
 
+        Args:
+            mode (Literal["per_object", "fused"], optional): execution mode of
+                the pipeline. See IOBoundPipeline for details. Defaults to
+                "per_object".
+            concurrency (int, optional): maximum number of simultaneously
+                running calls of asynchronous steps within one batch. Defaults
+                to 16.
+
         Returns:
             IOBoundPipeline: pipeline instance.
         """
-        self.pipeline = IOBoundPipeline(self)
+        self.pipeline = IOBoundPipeline(
+            self, mode=mode, concurrency=concurrency
+        )
         return self.pipeline
 
+    def attache_dedup(
+        self,
+        *,
+        scope: Literal["raw", "output"] = "raw",
+        db_path: str | Path = "byteflows_seen.db",
+    ) -> ContentDeduplicator:
+        """
+        The method creates and binds a deduplicator, after which payloads
+        already received for the request are dropped before they enter the
+        buffer. One deduplicator can be shared by several contexts: the seen
+        set is kept separately for each request.
+
+        Args:
+            scope (Literal["raw", "output"], optional): compare raw responses
+                or objects serialized into the output format. Defaults to
+                "raw".
+            db_path (str | Path, optional): path to the database file with the
+                seen set. Defaults to "byteflows_seen.db".
+
+        Returns:
+            ContentDeduplicator: deduplicator instance.
+        """
+        self.dedup = ContentDeduplicator(scope=scope, db_path=db_path)
+        return self.dedup
+
+    def attache_cdc(
+        self,
+        *,
+        db_path: str | Path = "byteflows_cdc.db",
+        op_column: str = "op",
+    ) -> ChangeCapture:
+        """
+        The method creates and binds a change data capture index. After that,
+        only the records inserted or updated since the previous run of the
+        request are written to the storage, with the operation in the op_column
+        column, and at the end of each run the deleted records are written.
+        Deletes are not detected if a deduplicator is also attached (see
+        attache_dedup), since the records of dropped payloads are not received
+        in the run. Requires key columns and is incompatible with buffer
+        compression of the storage.
+
+        Args:
+            db_path (str | Path, optional): path to the database file with the
+                index. Defaults to "byteflows_cdc.db".
+            op_column (str, optional): name of the operation column. Defaults
+                to "op".
+
+        Raises:
+            ValueError: thrown if key columns are not specified for the
+                context.
+
+        Returns:
+            ChangeCapture: change data capture index instance.
+        """
+        if not self.key_columns:
+            msg = (
+                "Для отслеживания изменений необходимо указать ключевые "
+                "столбцы (key_columns)."
+            )
+            raise ValueError(msg)
+        self.cdc = ChangeCapture(db_path=db_path, op_column=op_column)
+        return self.cdc
+
+    def attache_schema(
+        self,
+        *,
+        schema: Mapping[str, Any] | None = None,
+        sample: int = 3,
+        param: str = "schema",
+        verify_every: int = 100,
+    ) -> SchemaLearner:
+        """
+        The method creates and binds a schema learner of the incoming data. The
+        schema of each request is learned from its first responses (or given
+        explicitly) and passed to the input function of the format as the param
+        argument, for example to the schema argument of polars.read_json and
+        polars.read_csv. The input function must accept this argument.
+
+        Args:
+            schema (Mapping[str, Any] | None, optional): explicitly given
+                schema. Defaults to None.
+            sample (int, optional): number of responses from which the schema
+                is learned. Defaults to 3.
+            param (str, optional): name of the argument of the input function
+                that receives the schema. Defaults to "schema".
+            verify_every (int, optional): every verify_every-th response read
+                with a schema is also read without it to detect drift. 0
+                disables the check. Defaults to 100.
+
+        Returns:
+            SchemaLearner: schema learner instance.
+        """
+        self.schema = SchemaLearner(
+            schema=schema,
+            sample=sample,
+            param=param,
+            verify_every=verify_every,
+        )
+        return self.schema
+
     def attache_pathgenerator(self, is_local: bool = False) -> PathTemplate:
         """
         The method creates and binds an instance of the data path template.
@@ -596,7 +1664,12 @@ class IOContext:
 
 
 def create_io_context(
-    *, in_format: str, out_format: str, storage: BaseBufferableStorage
+    *,
+    in_format: str,
+    out_format: str,
+    storage: BaseBufferableStorage,
+    key_columns: list[str] | None = None,
+    keep: Literal["first", "last"] = "last",
 ) -> IOContext:
     """
     Module level function for creating IO context instances. Accepts the arguments necessary to initialize objects of this type.
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import sqlite3
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+from hashlib import blake2b
+from importlib import import_module
+from pathlib import Path
+from threading import Lock as ThreadLock
+from time import time
+from typing import Literal
+
+__all__ = ["ContentDeduplicator", "fast_digest"]
+
+"""
+This module provides content deduplication: payloads that have already been
+received for a request are recognized by their hash and are not passed on to
+processing and storage.
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    query TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (query, digest)
+) WITHOUT ROWID;
+"""
+
+
+def _resolve_hasher() -> Callable[[bytes], str]:
+    """
+    Selects the hash function: xxh3 from the xxhash package if it is installed,
+    otherwise blake2b from the standard library.
+    """
+    try:
+        xxhash = import_module("xxhash")
+        return xxhash.xxh3_128_hexdigest
+    except ImportError:
+        return lambda content: blake2b(content, digest_size=16).hexdigest()
+
+
+fast_digest: Callable[[bytes], str] = _resolve_hasher()
+"""
+Returns a non-cryptographic 128-bit hash of the content as a hexadecimal
+string.
+"""
+
+
+class ContentDeduplicator:
+    """
+    Filters out payloads whose content has already been received for the same
+    request. Hashes of the received payloads are kept in a SQLite database, so
+    the set of seen payloads survives restarts of the application. The hashes
+    of new payloads are first only staged: they are written to the database
+    by commit once the data obtained from the payloads has been uploaded, and
+    discarded by rollback if it could not be, so a failed upload does not make
+    the payloads look already received. Staged hashes are also recognized as
+    duplicates. The deduplicator can compare either raw responses of the
+    resource (scope "raw") or objects serialized into the output format after
+    the pipeline (scope "output"). The first is cheaper, the second also
+    catches responses that differ only in parts removed by the pipeline, but
+    costs one more serialization of every object, since objects are
+    serialized again when they are uploaded. The class is thread-safe.
+
+    Attributes:
+        scope (Literal["raw", "output"]): what content is compared.
+        db_path (str): path to the database file. The special value ":memory:"
+            keeps the seen set only for the lifetime of the process.
+        stats (defaultdict[str, dict[str, int]]): number of received and
+            duplicate payloads for each request.
+    """
+
+    def __init__(
+        self,
+        *,
+        scope: Literal["raw", "output"] = "raw",
+        db_path: str | Path = "byteflows_seen.db",
+    ):
+        """
+        Args:
+            scope (Literal["raw", "output"], optional): what content is
+                compared. Defaults to "raw".
+            db_path (str | Path, optional): path to the database file. Defaults
+                to "byteflows_seen.db".
+        """
+        self.scope: Literal["raw", "output"] = scope
+        self.db_path: str = str(db_path)
+        self.stats: defaultdict[str, dict[str, int]] = defaultdict(
+            lambda: {"received": 0, "duplicates": 0}
+        )
+        self._pending: defaultdict[str, set[str]] = defaultdict(set)
+        self._lock: ThreadLock = ThreadLock()
+        self._conn: sqlite3.Connection = sqlite3.connect(
+            self.db_path, check_same_thread=False
+        )
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def filter_new(
+        self, query: str, contents: Sequence[bytes]
+    ) -> tuple[list[bool], list[str]]:
+        """
+        Marks the payloads that have not been received for the request before
+        and stages their hashes. Identical payloads within one batch are also
+        recognized as duplicates. The staged hashes must be passed to commit
+        or rollback.
+
+        Args:
+            query (str): name of the request.
+            contents (Sequence[bytes]): payloads in byte representation.
+
+        Returns:
+            tuple[list[bool], list[str]]: True for new payloads, in the order
+                of the passed contents, and the staged hashes of new payloads.
+        """
+        digests: list[str] = [fast_digest(content) for content in contents]
+        mask: list[bool] = []
+        with self._lock:
+            pending: set[str] = self._pending[query]
+            for digest in digests:
+                new: bool = digest not in pending and (
+                    self._conn.execute(
+                        "SELECT 1 FROM seen WHERE query = ? AND digest = ?",
+                        (query, digest),
+                    ).fetchone()
+                    is None
+                )
+                if new:
+                    pending.add(digest)
+                mask.append(new)
+            stats: dict[str, int] = self.stats[query]
+            stats["received"] += len(mask)
+            stats["duplicates"] += mask.count(False)
+        return mask, [digest for digest, new in zip(digests, mask) if new]
+
+    def commit(self, query: str, digests: Sequence[str]) -> None:
+        """
+        Remembers the staged hashes of the payloads whose data has been
+        uploaded.
+
+        Args:
+            query (str): name of the request.
+            digests (Sequence[str]): hashes returned by filter_new.
+        """
+        now: float = time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen VALUES (?, ?, ?)",
+                [(query, digest, now) for digest in digests],
+            )
+            self._pending[query].difference_update(digests)
+
+    def rollback(self, query: str, digests: Sequence[str]) -> None:
+        """
+        Discards the staged hashes of the payloads whose data could not be
+        processed, so that the payloads are accepted when received again.
+
+        Args:
+            query (str): name of the request.
+            digests (Sequence[str]): hashes returned by filter_new.
+        """
+        with self._lock:
+            self._pending[query].difference_update(digests)
+
+    def forget(self, query: str | None = None) -> None:
+        """
+        Clears the seen set of the request or of all requests.
+
+        Args:
+            query (str | None, optional): name of the request. Defaults to
+                None.
+        """
+        with self._lock, self._conn:
+            if query is None:
+                self._pending.clear()
+                self._conn.execute("DELETE FROM seen")
+            else:
+                self._pending.pop(query, None)
+                self._conn.execute(
+                    "DELETE FROM seen WHERE query = ?", (query,)
+                )
+
+    def report(self) -> dict[str, dict[str, int | float]]:
+        """
+        Returns deduplication statistics.
+
+        Returns:
+            dict[str, dict[str, int | float]]: for each request - the number of
+                received and duplicate payloads and the share of duplicates.
+        """
+        with self._lock:
+            return {
+                query: {
+                    **stats,
+                    "ratio": stats["duplicates"] / stats["received"]
+                    if stats["received"]
+                    else 0,
+                }
+                for query, stats in self.stats.items()
+            }
+
+    def close(self) -> None:
+        """
+        Closes the connection to the database.
+        """
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Callable
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from concurrent.futures import wait as wait_futures
+from dataclasses import dataclass
+from importlib import import_module
+from io import BytesIO
+from multiprocessing import get_context
+from typing import Any, Literal
+
+from byteflows.contentio.common import TRANSPORT_MAP
+from byteflows.contentio.profiling import drain_samples
+from byteflows.contentio.records import type_key
+
+__all__ = [
+    "ExecutorKind",
+    "call_remote",
+    "create_executor",
+    "from_wire",
+    "reg_transport",
+    "to_wire",
+    "warm_up",
+]
+
+"""
+This module provides executors on which pipeline steps are run and the transfer
+of data objects to them. Process and subinterpreter executors do not share the
+GIL with the event loop, so CPU-bound steps can use several cores. Data objects
+of types with registered transport functions cross the process boundary in a
+compact binary form (Arrow IPC for polars frames and pyarrow tables), other
+objects are pickled.
+"""
+
+ExecutorKind = Literal["thread", "process", "interpreter"]
+
+
+@dataclass(frozen=True, slots=True)
+class _Wire:
+    """
+    A data object encoded for transfer to another process.
+    """
+
+    type_name: str
+    data: bytes
+
+
+def reg_transport(
+    type_name: str,
+    encode: Callable[[Any], bytes],
+    decode: Callable[[bytes], Any],
+) -> None:
+    """
+    Registers functions for transferring data objects of the given type between
+    processes. Both functions must be defined at module level, since they are
+    also called in worker processes.
+
+    Args:
+        type_name (str): type key of the data objects (see type_key).
+        encode (Callable[[Any], bytes]): function that encodes a data object
+            into bytes.
+        decode (Callable[[bytes], Any]): function that decodes a data object
+            from bytes.
+    """
+    TRANSPORT_MAP[type_name] = (encode, decode)
+
+
+def to_wire(dataobj: Any) -> Any:
+    """
+    Encodes the data object for transfer to another process if transport
+    functions are registered for its type.
+
+    Args:
+        dataobj (Any): data object.
+
+    Returns:
+        Any: encoded object or the data object itself.
+    """
+    type_name: str = type_key(dataobj)
+    hooks: tuple[Callable, Callable] | None = TRANSPORT_MAP.get(type_name)
+    if hooks is None:
+        return dataobj
+    return _Wire(type_name, hooks[0](dataobj))
+
+
+def from_wire(payload: Any) -> Any:
+    """
+    Decodes the data object received from another process.
+
+    Args:
+        payload (Any): encoded object or data object.
+
+    Returns:
+        Any: data object.
+    """
+    if isinstance(payload, _Wire):
+        return TRANSPORT_MAP[payload.type_name][1](payload.data)
+    return payload
+
+
+def call_remote(
+    func: Callable[[Any], list[Any]],
+    payload: Any,
+    batch: bool,
+    profile: bool = False,
+) -> Any:
+    """
+    Decodes the payload, applies the function to it and encodes the data
+    objects it returns. Executed in a worker process.
+
+    Args:
+        func (Callable[[Any], list[Any]]): function applied to the data.
+            Returns a list of data objects.
+        payload (Any): encoded data object or, if batch is True, a list of
+            them.
+        batch (bool): the payload is a list of data objects.
+        profile (bool, optional): the function contains profiled steps; their
+            measurements recorded in the worker process are returned together
+            with the data objects. Defaults to False.
+
+    Returns:
+        Any: encoded data objects returned by the function or, if profile is
+            True, a triple of them (None if the function failed), the
+            measurements and the exception raised by the function (None if it
+            succeeded).
+    """
+    data: Any = (
+        [from_wire(item) for item in payload] if batch else from_wire(payload)
+    )
+    if not profile:
+        return [to_wire(item) for item in func(data)]
+    try:
+        return [to_wire(item) for item in func(data)], drain_samples(), None
+    except Exception as exc:
+        return None, drain_samples(), exc
+
+
+def create_executor(
+    kind: ExecutorKind, workers: int | None = None
+) -> Executor:
+    """
+    Creates an executor of the given kind. Worker processes are started with
+    the spawn method, so the functions run in them and the data formats they
+    use must be defined and registered at module level.
+
+    Args:
+        kind (ExecutorKind): "thread", "process" or "interpreter"
+            (subinterpreters, Python 3.14 and later).
+        workers (int | None, optional): number of workers. Defaults to the
+            number of processors.
+
+    Raises:
+        RuntimeError: thrown if subinterpreters are not supported by the
+            current Python.
+        ValueError: thrown if the kind of executor is unknown.
+
+    Returns:
+        Executor: new executor.
+    """
+    workers = workers or os.cpu_count() or 1
+    if kind == "thread":
+        return ThreadPoolExecutor(
+            workers, thread_name_prefix="byteflows_pipeline"
+        )
+    if kind == "process":
+        return ProcessPoolExecutor(workers, mp_context=get_context("spawn"))
+    if kind == "interpreter":
+        pool_cls: type[Executor] | None = getattr(
+            import_module("concurrent.futures"),
+            "InterpreterPoolExecutor",
+            None,
+        )
+        if pool_cls is None:
+            msg = "Пул субинтерпретаторов доступен начиная с Python 3.14."
+            raise RuntimeError(msg)
+        return pool_cls(workers)
+    msg = f"Неизвестный тип исполнителя: {kind}."
+    raise ValueError(msg)
+
+
+def _warm(probe: Any) -> int:
+    """
+    Does nothing with the probe: receiving it is enough to import the modules
+    of the functions it contains.
+    """
+    return os.getpid()
+
+
+def warm_up(executor: Executor, workers: int, probe: Any = None) -> int:
+    """
+    Starts all workers of the executor in advance and passes the probe to each
+    of them. Passing the compiled steps of a pipeline as the probe imports
+    their modules in the workers and reveals steps that cannot be transferred
+    to them.
+
+    Args:
+        executor (Executor): executor to warm up.
+        workers (int): number of workers of the executor.
+        probe (Any, optional): object passed to each worker. Defaults to None.
+
+    Returns:
+        int: number of distinct workers that responded.
+    """
+    futures = [executor.submit(_warm, probe) for _ in range(workers)]
+    wait_futures(futures)
+    return len({future.result() for future in futures})
+
+
+def _polars_encode(frame: Any) -> bytes:
+    return frame.write_ipc(None, compression="uncompressed").getvalue()
+
+
+def _polars_decode(data: bytes) -> Any:
+    return import_module("polars").read_ipc(BytesIO(data), memory_map=False)
+
+
+def _arrow_encode(table: Any) -> bytes:
+    pa = import_module("pyarrow")
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _arrow_decode(data: bytes) -> Any:
+    return import_module("pyarrow").ipc.open_stream(data).read_all()
+
+
+reg_transport("polars.DataFrame", _polars_encode, _polars_decode)
+reg_transport("pyarrow.Table", _arrow_encode, _arrow_decode)
@@ -7,6 +7,7 @@ from io import BytesIO
 from typing import Any, get_args, get_origin, get_overloads, get_type_hints
 
 __all__ = [
+    "check_batch_input_sig",
     "check_input_sig",
     "check_output_sig",
     "handle_generic",
@@ -175,6 +176,34 @@ def check_input_sig(func: Callable) -> bool:
     return False
 
 
+def check_batch_input_sig(func: Callable) -> bool:
+    """
+    Validates the signature of the function used to deserialize a batch of
+    data. Such a function must take a list (or another sequence) of bytes
+    objects as its first parameter.
+
+    Args:
+        func (Callable): function for deserializing a batch of data.
+
+    Returns:
+        bool: boolean result of the test performed.
+    """
+    overloads: Sequence[Callable] = get_overloads(func) or [func]
+    for overload_sign in overloads:
+        sig: Signature = signature(overload_sign)
+        param: Parameter = list(sig.parameters.values())[0]
+        try:
+            annot: Any = get_type_hints(overload_sign)[param.name]
+        except Exception:
+            continue
+        origin: Any = get_origin(annot)
+        if not isinstance(origin, type) or not issubclass(origin, Sequence):
+            continue
+        if handle_generic(param, get_args(annot), bytes):
+            return True
+    return False
+
+
 def check_output_sig(func: Callable) -> bool:
     """
     Validates a function for data serialization. Such a function must take a byte buffer object (BytesIO) as its second argument.
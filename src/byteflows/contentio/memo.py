@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import json
+import pickle
+import sqlite3
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+from functools import partial
+from importlib import import_module
+from pathlib import Path
+from threading import Lock as ThreadLock
+from time import time
+from typing import TYPE_CHECKING, Any
+
+from byteflows.contentio.common import DIGEST_MAP
+from byteflows.contentio.dedup import fast_digest
+from byteflows.contentio.records import type_key
+from byteflows.utils import LRUCache, estimate_size
+
+if TYPE_CHECKING:
+    from byteflows.contentio.contentio import PipelineStep
+    from byteflows.storages.base import Mb
+
+__all__ = ["StepCache", "object_digest", "reg_digest", "step_identity"]
+
+"""
+This module provides memoization of deterministic pipeline steps. The results
+of a step are stored under the hash of the input data object and the identity
+of the step, so a data object that has already passed through the step is not
+processed again. Results are kept in memory and, optionally, in a local SQLite
+database that survives restarts of the application.
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    step TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (step, digest)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+"""
+
+
+def reg_digest(type_name: str, func: Callable[[Any], bytes]) -> None:
+    """
+    Registers a function that returns a byte representation of the content of
+    data objects of the given type. Two objects with equal content must have
+    equal representations. The representation is only hashed, so it does not
+    have to be decodable.
+
+    Args:
+        type_name (str): type key of the data objects (see type_key).
+        func (Callable[[Any], bytes]): function returning the byte
+            representation of the content.
+    """
+    DIGEST_MAP[type_name] = func
+
+
+def object_digest(dataobj: Any) -> str:
+    """
+    Returns the hash of the content of the data object. Bytes are hashed as is,
+    lists and tuples by the hashes of their elements, objects of types with
+    registered functions (see reg_digest) by their representation, other
+    objects by their pickled form.
+
+    Args:
+        dataobj (Any): data object.
+
+    Returns:
+        str: 128-bit hash of the content as a hexadecimal string.
+    """
+    if isinstance(dataobj, (bytes, bytearray, memoryview)):
+        return fast_digest(dataobj)  # type: ignore
+    if isinstance(dataobj, (list, tuple)):
+        return fast_digest(
+            "".join(object_digest(item) for item in dataobj).encode()
+        )
+    func: Callable[[Any], bytes] | None = DIGEST_MAP.get(type_key(dataobj))
+    if func is not None:
+        return fast_digest(func(dataobj))
+    return fast_digest(pickle.dumps(dataobj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def step_identity(step: PipelineStep) -> str:
+    """
+    Returns the identity of the pipeline step: the name of its function, the
+    hash of the function code and the values of the bound arguments. Changing
+    the code of the function or its arguments changes the identity, so results
+    computed by the previous version of the step are not used.
+
+    Args:
+        step (PipelineStep): pipeline step.
+
+    Returns:
+        str: identity of the step.
+    """
+    func: Any = step.func
+    bound: list[Any] = [sorted(step.kwargs.items(), key=lambda x: x[0])]
+    while isinstance(func, partial) or hasattr(func, "__wrapped__"):
+        if isinstance(func, partial):
+            bound.append((func.args, sorted(func.keywords.items())))
+            func = func.func
+        else:
+            func = func.__wrapped__
+    code: Any = getattr(func, "__code__", None)
+    code_digest: str = (
+        fast_digest(code.co_code + repr(code.co_consts).encode())
+        if code is not None
+        else ""
+    )
+    module: str = getattr(func, "__module__", "")
+    name: str = f"{module}.{getattr(func, '__qualname__', repr(func))}"
+    flags: str = f"{int(step.batch)}{int(step.merge)}{int(step.generator)}"
+    return f"{name}:{flags}:{code_digest}:{fast_digest(repr(bound).encode())}"
+
+
+class StepCache:
+    """
+    Cache of the results of pipeline steps. The memory tier is limited by the
+    estimated size of the stored results and evicts the least recently used of
+    them. The optional disk tier is a SQLite database limited by the size of
+    the pickled results; results found in it are moved to the memory tier. The
+    class is thread-safe.
+
+    Attributes:
+        memory (LRUCache): memory tier.
+        db_path (str | None): path to the database file of the disk tier. None
+            if the disk tier is not used.
+        disk_bytes (int): size limit of the disk tier in bytes.
+        stats (defaultdict[str, dict[str, int]]): number of hits in memory,
+            hits on disk and misses for each step.
+    """
+
+    def __init__(
+        self,
+        max_size: Mb = 64,
+        *,
+        db_path: str | Path | None = None,
+        disk_size: Mb = 1024,
+    ):
+        """
+        Args:
+            max_size (Mb, optional): size limit of the memory tier in
+                megabytes. Defaults to 64.
+            db_path (str | Path | None, optional): path to the database file of
+                the disk tier. Defaults to None.
+            disk_size (Mb, optional): size limit of the disk tier in megabytes.
+                Defaults to 1024.
+        """
+        self.memory: LRUCache = LRUCache(int(max_size * 1024**2))
+        self.db_path: str | None = None if db_path is None else str(db_path)
+        self.disk_bytes: int = int(disk_size * 1024**2)
+        self.stats: defaultdict[str, dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "disk_hits": 0, "misses": 0}
+        )
+        self._lock: ThreadLock = ThreadLock()
+        self._conn: sqlite3.Connection | None = None
+        self._disk_used: int = 0
+        if self.db_path is not None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.executescript(_SCHEMA)
+                self._disk_used = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM results"
+                ).fetchone()[0]
+
+    def lookup(
+        self, step: str, name: str, digests: Sequence[str]
+    ) -> list[tuple[bool, Any]]:
+        """
+        Looks up the results of the step for the given input hashes, first in
+        memory, then on disk.
+
+        Args:
+            step (str): identity of the step (see step_identity).
+            name (str): name of the step under which statistics are collected.
+            digests (Sequence[str]): hashes of the input data objects.
+
+        Returns:
+            list[tuple[bool, Any]]: for each hash - whether the result was
+                found and the result itself.
+        """
+        found: list[tuple[bool, Any]] = []
+        counters: dict[str, int] = {"hits": 0, "disk_hits": 0, "misses": 0}
+        for digest in digests:
+            value: Any = self.memory.get((step, digest), self)
+            if value is not self:
+                counters["hits"] += 1
+                found.append((True, value))
+                continue
+            value = self._read_disk(step, digest)
+            if value is self:
+                counters["misses"] += 1
+                found.append((False, None))
+                continue
+            counters["disk_hits"] += 1
+            self.memory.put((step, digest), value, self._size_of(value))
+            found.append((True, value))
+        with self._lock:
+            stats: dict[str, int] = self.stats[name]
+            for counter, count in counters.items():
+                stats[counter] += count
+        return found
+
+    def store(self, step: str, results: Sequence[tuple[str, Any]]) -> None:
+        """
+        Stores the results of the step in memory and, if the disk tier is used,
+        on disk.
+
+        Args:
+            step (str): identity of the step (see step_identity).
+            results (Sequence[tuple[str, Any]]): pairs of the input hash and
+                the result.
+        """
+        for digest, value in results:
+            self.memory.put((step, digest), value, self._size_of(value))
+        if self._conn is None or not results:
+            return
+        now: float = time()
+        rows: list[tuple[str, str, bytes, int, float]] = []
+        for digest, value in results:
+            blob: bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if len(blob) <= self.disk_bytes:
+                rows.append((step, digest, blob, len(blob), now))
+        with self._lock, self._conn:
+            for row in rows:
+                previous = self._conn.execute(
+                    "SELECT size FROM results WHERE step = ? AND digest = ?",
+                    row[:2],
+                ).fetchone()
+                self._disk_used -= previous[0] if previous else 0
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                    row,
+                )
+                self._disk_used += row[3]
+            self._evict_disk()
+
+    def report(self) -> dict[str, dict[str, int | float]]:
+        """
+        Returns cache statistics.
+
+        Returns:
+            dict[str, dict[str, int | float]]: for each step - the number of
+                hits in memory, hits on disk and misses and the share of hits.
+        """
+        with self._lock:
+            return {
+                name: {
+                    **stats,
+                    "ratio": (stats["hits"] + stats["disk_hits"]) / total
+                    if (total := sum(stats.values()))
+                    else 0,
+                }
+                for name, stats in self.stats.items()
+            }
+
+    def clear(self) -> None:
+        """
+        Removes all results from both tiers. Statistics are not reset.
+        """
+        self.memory.clear()
+        if self._conn is not None:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM results")
+                self._disk_used = 0
+
+    def close(self) -> None:
+        """
+        Closes the connection to the database of the disk tier.
+        """
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+    def _read_disk(self, step: str, digest: str) -> Any:
+        """
+        Reads the result from the disk tier and marks it as recently used.
+        Returns the cache itself if there is no result.
+        """
+        if self._conn is None:
+            return self
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE step = ? AND digest = ?",
+                (step, digest),
+            ).fetchone()
+            if row is None:
+                return self
+            self._conn.execute(
+                "UPDATE results SET used = ? WHERE step = ? AND digest = ?",
+                (time(), step, digest),
+            )
+        return pickle.loads(row[0])
+
+    def _evict_disk(self) -> None:
+        """
+        Deletes the least recently used results from the disk tier until its
+        size falls within the limit. Must be called under the lock.
+        """
+        while self._disk_used > self.disk_bytes:
+            row = self._conn.execute(  # type: ignore
+                "SELECT step, digest, size FROM results ORDER BY used LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._disk_used = 0
+                return
+            self._conn.execute(  # type: ignore
+                "DELETE FROM results WHERE step = ? AND digest = ?", row[:2]
+            )
+            self._disk_used -= row[2]
+
+    @staticmethod
+    def _size_of(value: list[Any]) -> int:
+        return sum(estimate_size(item) for item in value)
+
+
+def _polars_digest(frame: Any) -> bytes:
+    # hash_rows не гарантирует одинаковых хешей в разных версиях polars, а
+    # результаты шагов хранятся на диске между запусками, поэтому хешируются
+    # имена столбцов и значения записей
+    return json.dumps(
+        [frame.columns, *frame.iter_rows()],
+        default=str,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def _pandas_digest(frame: Any) -> bytes:
+    pd = import_module("pandas")
+    return (
+        repr(list(frame.columns)).encode()
+        + pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes()
+    )
+
+
+reg_digest("polars.DataFrame", _polars_digest)
+reg_digest("pandas.DataFrame", _pandas_digest)
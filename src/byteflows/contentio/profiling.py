@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, replace
+from threading import Lock as ThreadLock
+from time import perf_counter, thread_time
+from typing import TYPE_CHECKING, Any, Literal
+
+from byteflows.utils import count_rows, estimate_size
+
+if TYPE_CHECKING:
+    from byteflows.contentio.contentio import PipelineStep
+
+__all__ = ["StepProfiler", "StepSample", "drain_samples", "profile_step"]
+
+"""
+This module provides opt-in profiling of pipeline steps. While profiling is
+enabled, each call of a step is timed and the sizes of the data passed to it
+and returned by it are measured. Steps of pipelines without a profiler are not
+wrapped, so disabled profiling costs nothing.
+"""
+
+_StepKind = Literal["sync", "generator", "async", "async_generator"]
+
+_worker_samples: deque[StepSample] = deque()
+"""
+Samples recorded in a worker process. They are collected by call_remote after
+each call and returned to the pipeline.
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class StepSample:
+    """
+    Measurements of one call of a pipeline step.
+
+    Attributes:
+        step (str): name of the step.
+        wall (float): wall time of the call in seconds.
+        cpu (float | None): CPU time of the calling thread in seconds. None for
+            asynchronous steps, whose CPU time cannot be separated from other
+            tasks of the event loop.
+        rows_in (int): number of rows (records) in the input data.
+        bytes_in (int): estimated size of the input data in bytes.
+        rows_out (int): number of rows (records) in the output data.
+        bytes_out (int): estimated size of the output data in bytes.
+        error (str | None): representation of the exception raised by the step,
+            if any.
+    """
+
+    step: str
+    wall: float
+    cpu: float | None
+    rows_in: int
+    bytes_in: int
+    rows_out: int
+    bytes_out: int
+    error: str | None = None
+
+
+def _measure(dataobj: Any) -> tuple[int, int]:
+    """
+    Returns the number of rows and the estimated size of the data. Lists of
+    data objects are measured element by element.
+    """
+    if isinstance(dataobj, list):
+        sizes: list[tuple[int, int]] = [_measure(item) for item in dataobj]
+        return sum(x[0] for x in sizes), sum(x[1] for x in sizes)
+    return count_rows(dataobj) or 1, estimate_size(dataobj)
+
+
+class _TimedStep:
+    """
+    Wrapper of the function of a step that measures each of its calls.
+    Measurements are passed to the sink or, in worker processes where the sink
+    is not transferred, kept until drain_samples is called.
+    """
+
+    __slots__ = ("__wrapped__", "__name__", "kind", "sink")
+
+    def __init__(
+        self,
+        func: Callable,
+        name: str,
+        kind: _StepKind,
+        sink: StepProfiler | None = None,
+    ):
+        self.__wrapped__: Callable = func
+        self.__name__: str = name
+        self.kind: _StepKind = kind
+        self.sink: StepProfiler | None = sink
+
+    def __reduce__(self) -> tuple[type, tuple[Any, ...]]:
+        return _TimedStep, (self.__wrapped__, self.__name__, self.kind)
+
+    def __call__(self, data: Any, **kwargs: Any) -> Any:
+        if self.kind == "async":
+            return self._call_async(data, kwargs)
+        if self.kind == "async_generator":
+            return self._iter_async(data, kwargs)
+        wall: float = perf_counter()
+        cpu: float = thread_time()
+        try:
+            result: Any = self.__wrapped__(data, **kwargs)
+            if self.kind == "generator":
+                result = list(result)
+        except Exception as exc:
+            self._record(data, [], wall, cpu, exc)
+            raise
+        self._record(
+            data, result if self.kind == "generator" else [result], wall, cpu
+        )
+        return result
+
+    async def _call_async(self, data: Any, kwargs: dict[str, Any]) -> Any:
+        wall: float = perf_counter()
+        try:
+            result: Any = await self.__wrapped__(data, **kwargs)
+        except Exception as exc:
+            self._record(data, [], wall, None, exc)
+            raise
+        self._record(data, [result], wall, None)
+        return result
+
+    async def _iter_async(self, data: Any, kwargs: dict[str, Any]) -> Any:
+        wall: float = perf_counter()
+        outputs: list[Any] = []
+        try:
+            async for out in self.__wrapped__(data, **kwargs):
+                outputs.append(out)
+                yield out
+        except Exception as exc:
+            self._record(data, outputs, wall, None, exc)
+            raise
+        self._record(data, outputs, wall, None)
+
+    def _record(
+        self,
+        data: Any,
+        outputs: list[Any],
+        wall: float,
+        cpu: float | None,
+        exc: Exception | None = None,
+    ) -> None:
+        wall = perf_counter() - wall
+        cpu = None if cpu is None else thread_time() - cpu
+        rows_in, bytes_in = _measure(data)
+        rows_out, bytes_out = _measure(outputs)
+        sample = StepSample(
+            self.__name__,
+            wall,
+            cpu,
+            rows_in,
+            bytes_in,
+            rows_out,
+            bytes_out,
+            None if exc is None else repr(exc),
+        )
+        if self.sink is None:
+            _worker_samples.append(sample)
+        else:
+            self.sink.record(sample)
+
+
+def profile_step(step: PipelineStep, sink: StepProfiler) -> PipelineStep:
+    """
+    Returns a copy of the step whose function records its measurements in the
+    profiler.
+
+    Args:
+        step (PipelineStep): pipeline step.
+        sink (StepProfiler): profiler in which the measurements are recorded.
+
+    Returns:
+        PipelineStep: profiled step.
+    """
+    kind: _StepKind = (
+        ("async_generator" if step.generator else "async")
+        if step.asynchronous
+        else ("generator" if step.generator else "sync")
+    )
+    return replace(step, func=_TimedStep(step.func, step.__name__, kind, sink))
+
+
+def drain_samples() -> list[StepSample]:
+    """
+    Returns and forgets the samples recorded in the current worker process.
+
+    Returns:
+        list[StepSample]: recorded samples.
+    """
+    samples: list[StepSample] = []
+    while _worker_samples:
+        samples.append(_worker_samples.popleft())
+    return samples
+
+
+def _percentiles(values: Sequence[float]) -> dict[str, float]:
+    """
+    Returns the median, the 90th and the 99th percentiles and the maximum of
+    the values (nearest rank).
+    """
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    ordered: list[float] = sorted(values)
+    last: int = len(ordered) - 1
+    return {
+        "p50": ordered[round(last * 0.5)],
+        "p90": ordered[round(last * 0.9)],
+        "p99": ordered[round(last * 0.99)],
+        "max": ordered[last],
+    }
+
+
+class StepProfiler:
+    """
+    Collects measurements of the calls of pipeline steps. Totals are kept for
+    all calls, percentiles of wall and CPU time are calculated over the last
+    window calls of each step. The class is thread-safe.
+
+    Attributes:
+        window (int): number of the last calls of each step over which
+            percentiles are calculated.
+        totals (defaultdict[str, dict[str, Any]]): number of calls and errors,
+            total time and sizes of the data for each step.
+    """
+
+    def __init__(self, window: int = 10_000):
+        """
+        Args:
+            window (int, optional): number of the last calls of each step over
+                which percentiles are calculated. Defaults to 10_000.
+        """
+        self.window: int = window
+        self.totals: defaultdict[str, dict[str, Any]] = defaultdict(
+            lambda: {
+                "calls": 0,
+                "errors": 0,
+                "wall_total": 0.0,
+                "cpu_total": 0.0,
+                "rows_in": 0,
+                "bytes_in": 0,
+                "rows_out": 0,
+                "bytes_out": 0,
+                "last_error": None,
+            }
+        )
+        self._samples: defaultdict[str, deque[StepSample]] = defaultdict(
+            lambda: deque(maxlen=self.window)
+        )
+        self._lock: ThreadLock = ThreadLock()
+
+    def record(self, sample: StepSample) -> None:
+        """
+        Records the measurements of one call of a step.
+
+        Args:
+            sample (StepSample): measurements of the call.
+        """
+        with self._lock:
+            self._samples[sample.step].append(sample)
+            totals: dict[str, Any] = self.totals[sample.step]
+            totals["calls"] += 1
+            totals["wall_total"] += sample.wall
+            totals["cpu_total"] += sample.cpu or 0.0
+            totals["rows_in"] += sample.rows_in
+            totals["bytes_in"] += sample.bytes_in
+            totals["rows_out"] += sample.rows_out
+            totals["bytes_out"] += sample.bytes_out
+            if sample.error is not None:
+                totals["errors"] += 1
+                totals["last_error"] = sample.error
+
+    def extend(self, samples: Sequence[StepSample]) -> None:
+        """
+        Records the measurements of several calls, for example those returned
+        from a worker process.
+
+        Args:
+            samples (Sequence[StepSample]): measurements of the calls.
+        """
+        for sample in samples:
+            self.record(sample)
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns profiling statistics.
+
+        Returns:
+            dict[str, dict[str, Any]]: for each step - the totals (see the
+                totals attribute), the percentiles of wall time ("wall") and
+                CPU time ("cpu") in seconds and the throughput in rows per
+                second of wall time.
+        """
+        with self._lock:
+            report: dict[str, dict[str, Any]] = {}
+            for name, totals in self.totals.items():
+                samples: deque[StepSample] = self._samples[name]
+                report[name] = {
+                    **totals,
+                    "wall": _percentiles([x.wall for x in samples]),
+                    "cpu": _percentiles(
+                        [x.cpu for x in samples if x.cpu is not None]
+                    ),
+                    "rows_per_sec": totals["rows_in"] / totals["wall_total"]
+                    if totals["wall_total"]
+                    else 0.0,
+                }
+            return report
+
+    def reset(self) -> None:
+        """
+        Forgets all measurements.
+        """
+        with self._lock:
+            self.totals.clear()
+            self._samples.clear()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from importlib import import_module
+from typing import Any, Literal
+
+from byteflows.contentio.common import RECORD_DEDUP_MAP, TAG_SPLIT_MAP
+
+__all__ = [
+    "RESPONSE_COL",
+    "dedup_records",
+    "reg_record_dedup",
+    "reg_tag_split",
+    "split_tagged",
+    "type_key",
+]
+
+"""
+This module provides deduplication of records across several data objects by
+key columns. Deduplication functions receive all data objects of one type from
+a buffer at once and return the same number of objects in the same order, from
+which records with repeated keys have been removed. This keeps the link between
+each object and the path at which it will be stored.
+"""
+
+_FRAME_COL = "__byteflows_frame"
+
+RESPONSE_COL = "__byteflows_response"
+"""
+Name of the column in which batch input functions tag each record with the
+position of the response it was read from.
+"""
+
+Keep = Literal["first", "last"]
+
+
+def type_key(dataobj: Any) -> str:
+    """
+    Returns the type key of the data object: the name of the top-level package
+    of its class and the name of the class, for example "polars.DataFrame" or
+    "pandas.DataFrame". Functions that handle data objects of a certain type
+    (record deduplication, change data capture, schema learning, hashing and
+    transfer between processes) are registered and looked up by this key.
+
+    Args:
+        dataobj (Any): data object.
+
+    Returns:
+        str: type key of the data object.
+    """
+    cls: type = type(dataobj)
+    return f"{cls.__module__.partition('.')[0]}.{cls.__name__}"
+
+
+def reg_record_dedup(
+    type_name: str, func: Callable[[Sequence[Any], list[str], Keep], list[Any]]
+) -> None:
+    """
+    Registers a record deduplication function for data objects of the given
+    type. The function takes a sequence of data objects, the list of key
+    columns and which of the repeated records to keep ("first" or "last"), and
+    returns the same number of data objects in the same order.
+
+    Args:
+        type_name (str): type key of the data objects (see type_key).
+        func (Callable[[Sequence[Any], list[str], Keep], list[Any]]):
+            deduplication function.
+
+    Raises:
+        RuntimeError: thrown if the function is not callable.
+    """
+    if not callable(func):
+        msg = "Функция дедупликации должна быть вызываемым объектом."
+        raise RuntimeError(msg) from None
+    RECORD_DEDUP_MAP[type_name] = func
+
+
+def dedup_records(
+    dataobjs: Sequence[Any], key_columns: list[str], keep: Keep = "last"
+) -> list[Any] | None:
+    """
+    Removes records with repeated keys across a sequence of data objects of the
+    same type.
+
+    Args:
+        dataobjs (Sequence[Any]): data objects in the order in which they were
+            received.
+        key_columns (list[str]): columns whose values identify a record.
+        keep (Keep, optional): which of the repeated records to keep. Defaults
+            to "last".
+
+    Returns:
+        list[Any] | None: data objects without repeated records or None if no
+            function is registered for the type of objects.
+    """
+    if not dataobjs:
+        return []
+    func: Callable | None = RECORD_DEDUP_MAP.get(type_key(dataobjs[0]))
+    if func is None:
+        return None
+    return func(dataobjs, key_columns, keep)
+
+
+def reg_tag_split(
+    type_name: str, func: Callable[[Any, int], list[Any]]
+) -> None:
+    """
+    Registers a function that splits a data object of the given type, whose
+    records are tagged in the RESPONSE_COL column, into per-response objects.
+    The function takes the data object and the number of responses and returns
+    that many data objects without the tag column, in the order of the
+    responses.
+
+    Args:
+        type_name (str): type key of the data objects (see type_key).
+        func (Callable[[Any, int], list[Any]]): splitting function.
+
+    Raises:
+        RuntimeError: thrown if the function is not callable.
+    """
+    if not callable(func):
+        msg = "Функция разделения должна быть вызываемым объектом."
+        raise RuntimeError(msg) from None
+    TAG_SPLIT_MAP[type_name] = func
+
+
+def split_tagged(dataobj: Any, count: int) -> list[Any] | None:
+    """
+    Splits a data object with records tagged in the RESPONSE_COL column into
+    per-response objects. Responses without records get empty objects.
+
+    Args:
+        dataobj (Any): tagged data object.
+        count (int): number of responses.
+
+    Returns:
+        list[Any] | None: data objects in the order of the responses or None if
+            no function is registered for the type of the object.
+    """
+    func: Callable | None = TAG_SPLIT_MAP.get(type_key(dataobj))
+    if func is None:
+        return None
+    return func(dataobj, count)
+
+
+def _polars_dedup(
+    frames: Sequence[Any], key_columns: list[str], keep: Keep
+) -> list[Any]:
+    pl = import_module("polars")
+    combined = pl.concat(
+        [
+            frame.with_columns(pl.lit(idx).alias(_FRAME_COL))
+            for idx, frame in enumerate(frames)
+        ],
+        how="diagonal",
+    ).unique(subset=key_columns, keep=keep, maintain_order=True)
+    result: list[Any] = [frame.head(0) for frame in frames]
+    for part in combined.partition_by(_FRAME_COL, maintain_order=True):
+        idx: int = part[_FRAME_COL][0]
+        result[idx] = part.select(frames[idx].columns)
+    return result
+
+
+def _pandas_dedup(
+    frames: Sequence[Any], key_columns: list[str], keep: Keep
+) -> list[Any]:
+    pd = import_module("pandas")
+    combined = pd.concat(
+        [
+            frame.assign(**{_FRAME_COL: idx})
+            for idx, frame in enumerate(frames)
+        ],
+        ignore_index=True,
+    ).drop_duplicates(subset=key_columns, keep=keep)
+    result: list[Any] = [frame.iloc[0:0] for frame in frames]
+    for idx, part in combined.groupby(_FRAME_COL, sort=False):
+        result[idx] = part[frames[idx].columns].reset_index(drop=True)
+    return result
+
+
+def _polars_split(frame: Any, count: int) -> list[Any]:
+    result: list[Any] = [frame.head(0).drop(RESPONSE_COL)] * count
+    parts: dict[Any, Any] = frame.partition_by(
+        [RESPONSE_COL], maintain_order=True, include_key=False, as_dict=True
+    )
+    for key, part in parts.items():
+        # старые версии polars возвращают скалярные ключи для одного столбца
+        result[key[0] if isinstance(key, tuple) else key] = part
+    return result
+
+
+def _pandas_split(frame: Any, count: int) -> list[Any]:
+    result: list[Any] = [frame.iloc[0:0].drop(columns=RESPONSE_COL)] * count
+    for idx, part in frame.groupby(RESPONSE_COL, sort=False):
+        result[idx] = part.drop(columns=RESPONSE_COL).reset_index(drop=True)
+    return result
+
+
+reg_record_dedup("polars.DataFrame", _polars_dedup)
+reg_record_dedup("pandas.DataFrame", _pandas_dedup)
+reg_tag_split("polars.DataFrame", _polars_split)
+reg_tag_split("pandas.DataFrame", _pandas_split)
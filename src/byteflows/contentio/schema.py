@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from threading import Lock as ThreadLock
+from typing import Any
+
+from byteflows.contentio.common import INPUT_MAP, SCHEMA_HOOKS_MAP
+from byteflows.contentio.records import type_key
+from byteflows.utils import count_rows
+
+__all__ = [
+    "FieldProbe",
+    "SchemaHooks",
+    "SchemaLearner",
+    "count_json_fields",
+    "reg_schema_hooks",
+]
+
+"""
+This module provides schema caching for deserialization. Readers of
+schema-dependent formats (json, csv) infer the schema of every response, which
+is a large share of the parse time for wide payloads. The schema learner infers
+it from the first responses of a request and passes it to the input function on
+later calls, re-learning it when the data drifts.
+"""
+
+FieldProbe = Callable[[bytes | memoryview], int | None]
+"""
+Function that cheaply counts the fields in a response without deserializing it
+(for example, the keys of all its records), or returns None if it cannot tell.
+"""
+
+
+@dataclass(frozen=True)
+class SchemaHooks:
+    """
+    Functions through which the schema learner works with data objects of a
+    certain type.
+
+    Attributes:
+        extract (Callable[[Any], dict[str, Any]]): returns the schema of a data
+            object as a mapping of column names to types.
+        unify (Callable[[Sequence[dict[str, Any]]], dict[str, Any] | None]):
+            combines the schemas of several data objects into one. Returns None
+            if they cannot be combined unambiguously.
+    """
+
+    extract: Callable[[Any], dict[str, Any]]
+    unify: Callable[[Sequence[dict[str, Any]]], dict[str, Any] | None]
+
+
+def reg_schema_hooks(type_name: str, hooks: SchemaHooks) -> None:
+    """
+    Registers schema learning functions for data objects of the given type.
+
+    Args:
+        type_name (str): type key of the data objects (see type_key).
+        hooks (SchemaHooks): schema learning functions.
+    """
+    SCHEMA_HOOKS_MAP[type_name] = hooks
+
+
+def count_json_fields(content: bytes | memoryview) -> int:
+    """
+    Counts the keys of a JSON or NDJSON response by the number of `":`
+    sequences in it. The response is not parsed, so the count is exact only
+    for flat records without such sequences inside string values; nested
+    objects and such strings only add to the count.
+
+    Args:
+        content (bytes | memoryview): content received in byte representation.
+
+    Returns:
+        int: number of keys in the response.
+    """
+    return bytes(content).count(b'":')
+
+
+@dataclass
+class _SchemaState:
+    """
+    Schema learned for one request and the schemas of the responses collected
+    to learn it.
+    """
+
+    schema: dict[str, Any] | None = None
+    samples: list[dict[str, Any]] = field(default_factory=list)
+    calls: int = 0
+    slack: float = 0.0
+
+
+class SchemaLearner:
+    """
+    Learns the schema of the data received for each request and passes it to
+    the input function, so that the reader does not infer it again for every
+    response. The schema is learned from the first sample responses of the
+    request (or given explicitly) and is passed to the input function as the
+    param argument. The schema is re-learned when the data drifts: when a
+    response cannot be read with the schema, or when a check (the schema is
+    inferred anyway and compared with the learned one) finds new columns or
+    changed types. Readers drop fields missing from the schema they are given,
+    so every response is probed: if it has more fields per row than the schema
+    has columns, it is checked. The check also runs every verify_every
+    responses to catch changed types. When a check finds no drift, the excess
+    of fields it was run for (nested objects, envelopes) is tolerated for the
+    request from then on. Schemas are learned only
+    for data objects of types with registered schema hooks (see
+    reg_schema_hooks). The class is thread-safe.
+
+    Attributes:
+        schema (dict[str, Any] | None): explicitly given schema. It is used for
+            all requests until drift is detected.
+        sample (int): number of responses from which the schema is learned.
+        param (str): name of the argument of the input function that receives
+            the schema.
+        verify_every (int): every verify_every-th response read with a schema
+            is also read without it to detect drift. 0 disables the check.
+        probe (FieldProbe | None): function counting the fields in a
+            response. None disables probing.
+        stats (dict[str, dict[str, int]]): number of responses read with
+            inference, read with the schema and drifts detected for each
+            request.
+    """
+
+    def __init__(
+        self,
+        *,
+        schema: Mapping[str, Any] | None = None,
+        sample: int = 3,
+        param: str = "schema",
+        verify_every: int = 100,
+        probe: FieldProbe | None = count_json_fields,
+    ):
+        """
+        Args:
+            schema (Mapping[str, Any] | None, optional): explicitly given
+                schema. Defaults to None.
+            sample (int, optional): number of responses from which the schema
+                is learned. Defaults to 3.
+            param (str, optional): name of the argument of the input function
+                that receives the schema. Defaults to "schema".
+            verify_every (int, optional): every verify_every-th response read
+                with a schema is also read without it to detect drift. 0
+                disables the check. Defaults to 100.
+            probe (FieldProbe | None, optional): function counting the fields
+                in a response. The default one counts the keys of JSON and
+                NDJSON records; for other formats pass a suitable function or
+                None. Defaults to count_json_fields.
+        """
+        self.schema: dict[str, Any] | None = (
+            None if schema is None else dict(schema)
+        )
+        self.sample: int = max(sample, 1)
+        self.param: str = param
+        self.verify_every: int = verify_every
+        self.probe: FieldProbe | None = probe
+        self.stats: dict[str, dict[str, int]] = dict()
+        self._states: dict[str, _SchemaState] = dict()
+        self._lock: ThreadLock = ThreadLock()
+
+    def decode(
+        self, query: str, content: bytes | memoryview, format: str
+    ) -> Any:
+        """
+        Deserializes the response of the request with the input function of the
+        format, passing it the learned schema if there is one, and learns the
+        schema from the response otherwise.
+
+        Args:
+            query (str): name of the request.
+            content (bytes | memoryview): content received in byte
+                representation.
+            format (str): the format of the data that the resource provides.
+
+        Returns:
+            Any: data object.
+        """
+        func: Callable = INPUT_MAP[format]
+        with self._lock:
+            state: _SchemaState = self._state(query)
+            schema: dict[str, Any] | None = state.schema
+            state.calls += 1
+            verify: bool = bool(self.verify_every) and (
+                state.calls % self.verify_every == 0
+            )
+            slack: float = state.slack
+        if schema is not None:
+            try:
+                dataobj: Any = func(content, **{self.param: schema})
+            except Exception:
+                self._drift(query)
+            else:
+                excess: float = self._excess(schema, content, dataobj)
+                if not verify and excess <= slack:
+                    self._count(query, "reused")
+                    return dataobj
+                inferred: Any = func(content)
+                if not self._drifted(schema, inferred):
+                    with self._lock:
+                        state.slack = max(state.slack, excess)
+                    self._count(query, "reused")
+                    return dataobj
+                self._drift(query)
+                self._learn(query, inferred)
+                return inferred
+        dataobj = func(content)
+        self._learn(query, dataobj)
+        return dataobj
+
+    def schema_for(self, query: str) -> dict[str, Any] | None:
+        """
+        Returns the schema currently used for the request.
+
+        Args:
+            query (str): name of the request.
+
+        Returns:
+            dict[str, Any] | None: schema or None if it has not been learned
+                yet.
+        """
+        with self._lock:
+            return self._state(query).schema
+
+    def forget(self, query: str | None = None) -> None:
+        """
+        Forgets the learned schema of the request or of all requests. The
+        explicitly given schema is used again.
+
+        Args:
+            query (str | None, optional): name of the request. Defaults to
+                None.
+        """
+        with self._lock:
+            if query is None:
+                self._states.clear()
+            else:
+                self._states.pop(query, None)
+
+    def _state(self, query: str) -> _SchemaState:
+        """
+        Returns the state of the request, creating it with the explicitly given
+        schema. Must be called under the lock.
+        """
+        if query not in self._states:
+            self._states[query] = _SchemaState(self.schema)
+            self.stats[query] = {"inferred": 0, "reused": 0, "drifts": 0}
+        return self._states[query]
+
+    def _count(self, query: str, counter: str) -> None:
+        with self._lock:
+            self.stats[query][counter] += 1
+
+    def _drift(self, query: str) -> None:
+        """
+        Discards the schema of the request after drift, so that it is learned
+        again from the next responses.
+        """
+        with self._lock:
+            state: _SchemaState = self._state(query)
+            state.schema, state.samples = None, []
+            self.stats[query]["drifts"] += 1
+
+    def _learn(self, query: str, dataobj: Any) -> None:
+        """
+        Adds the schema of the response to the samples of the request and, once
+        enough samples are collected, combines them into the schema of the
+        request. If the samples cannot be combined, the oldest one is dropped
+        and learning continues with the next responses.
+        """
+        hooks: SchemaHooks | None = SCHEMA_HOOKS_MAP.get(type_key(dataobj))
+        with self._lock:
+            self.stats[query]["inferred"] += 1
+            if hooks is None:
+                return
+            state: _SchemaState = self._state(query)
+            state.samples.append(hooks.extract(dataobj))
+            if len(state.samples) < self.sample:
+                return
+            state.schema = hooks.unify(state.samples)
+            if state.schema is None:
+                state.samples.pop(0)
+            else:
+                state.samples = []
+
+    def _excess(
+        self, schema: dict[str, Any], content: bytes | memoryview, dataobj: Any
+    ) -> float:
+        """
+        Returns how many more fields per row the probe counted in the response
+        than the schema has columns.
+        """
+        if self.probe is None:
+            return 0.0
+        fields: int | None = self.probe(content)
+        rows: int | None = count_rows(dataobj)
+        if fields is None or not rows:
+            return 0.0
+        return fields / rows - len(schema)
+
+    @staticmethod
+    def _drifted(schema: dict[str, Any], dataobj: Any) -> bool:
+        """
+        Checks whether the inferred schema of the response has columns missing
+        from the learned schema or columns of other types.
+        """
+        hooks: SchemaHooks | None = SCHEMA_HOOKS_MAP.get(type_key(dataobj))
+        if hooks is None:
+            return False
+        return hooks.unify([schema, hooks.extract(dataobj)]) != schema
+
+
+def _unify_schemas(
+    schemas: Sequence[dict[str, Any]], is_unknown: Callable[[Any], bool]
+) -> dict[str, Any] | None:
+    """
+    Combines schemas into one by the union of their columns in the order of
+    first appearance. Unknown types (for example, the type of a column that
+    contained only nulls) give way to known ones. Returns None if a column has
+    different known types or only unknown ones.
+    """
+    columns: dict[str, Any] = {}
+    for schema in schemas:
+        for name, dtype in schema.items():
+            known: Any = columns.get(name)
+            if known is None or is_unknown(known):
+                columns[name] = dtype
+            elif not is_unknown(dtype) and dtype != known:
+                return None
+    if any(is_unknown(dtype) for dtype in columns.values()):
+        return None
+    return columns
+
+
+def _polars_schema(frame: Any) -> dict[str, Any]:
+    return dict(frame.schema)
+
+
+def _polars_unify(schemas: Sequence[dict[str, Any]]) -> dict[str, Any] | None:
+    return _unify_schemas(schemas, lambda dtype: str(dtype) == "Null")
+
+
+def _pandas_schema(frame: Any) -> dict[str, Any]:
+    return dict(frame.dtypes)
+
+
+def _pandas_unify(schemas: Sequence[dict[str, Any]]) -> dict[str, Any] | None:
+    return _unify_schemas(schemas, lambda dtype: False)
+
+
+reg_schema_hooks(
+    "polars.DataFrame", SchemaHooks(_polars_schema, _polars_unify)
+)
+reg_schema_hooks(
+    "pandas.DataFrame", SchemaHooks(_pandas_schema, _pandas_unify)
+)
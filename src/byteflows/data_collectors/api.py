@@ -12,8 +12,7 @@ from aiohttp import ClientResponse, ClientSession
 from aioitertools.more_itertools import take
 from rich.pretty import pprint as rpp
 
-from byteflows.contentio import deserialize
-from byteflows.core import SfnUndefined, reg_type
+from byteflows.core import reg_type
 from byteflows.data_collectors.base import BaseDataCollector
 
 __all__ = ["ApiDataCollector", "EORTriggersResolver"]
@@ -150,41 +149,33 @@ class ApiDataCollector(BaseDataCollector):
                 parsing will begin again.
         """
         await self.collect_trigger.pending()
-        await self._write_channel.storage.launch_session()
+        await self.launch_sessions()
         self.current_bs: int = await self.batcher.acquire_batch()
         rpp(
             f"Текущий размер батча {self.current_bs}. Минимальный размер батча {self.batcher.min_batch}."
         )
         url_gen: AsyncGenerator[str] = self.url_series()
-        while True:
-            urls: list[str] = await take(self.current_bs, url_gen)
-            rpp(f"Количество полученных ссылок {len(urls)}")
-            print("Urls для обработки")
-            print(urls)
-            start = int(time())
-            raw_content: list[bytes] = await self.process_requests(urls)
-            if len(raw_content) > 0:
-                deser_content = tuple(
-                    [
-                        deserialize(raw_bytes, self.input_format)
-                        for raw_bytes in raw_content
-                    ]
+        while not self.stopping:
+            batch_size: int = self.current_bs
+            if self.memory_monitor is not None:
+                await self.memory_monitor.fetch_allowed.wait()
+                batch_size = self.memory_monitor.scale_batch(
+                    self.current_bs, min(self.batcher.min_batch)
                 )
-                if self.pipeline is not SfnUndefined:
-                    async with self.pipeline.run_transform(
-                        deser_content
-                    ) as pipeline:
-                        deser_content = await pipeline
-                if deser_content:
-                    prepared_content = tuple(
-                        (
-                            self.path_producer.render_path(self.output_format),
-                            dataset,
-                        )
-                        for dataset in deser_content
-                    )
-                async with self._write_channel.block_state() as buf:
-                    await buf.parse_content(prepared_content)
+            if self.stopping:
+                break
+            self.in_flight = True
+            try:
+                urls: list[str] = await take(batch_size, url_gen)
+                rpp(f"Количество полученных ссылок {len(urls)}")
+                print("Urls для обработки")
+                print(urls)
+                start = int(time())
+                raw_content: list[bytes] = await self.process_requests(urls)
+                if len(raw_content) > 0:
+                    await self.dispatch(raw_content)
+            finally:
+                self.in_flight = False
             rpp(f"Новый размер батча составил {self.current_bs}")
             end = int(time())
             print(f"Время обработки запросов составило {end - start} секунд")
@@ -198,6 +189,7 @@ class ApiDataCollector(BaseDataCollector):
                     await url_gen.asend(self.eor_status)  # type:ignore
                 except StopAsyncIteration:
                     rpp("Обход ресурса завершен.")
+                    await self.finish_changes()
                     self.eor_status = False
                     break
         self.batcher.release_batch(self.current_bs)
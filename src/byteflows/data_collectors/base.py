@@ -1,27 +1,300 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from asyncio import Task
-from collections.abc import AsyncGenerator, Callable
+from asyncio import Event, Task, gather, to_thread
+from collections.abc import AsyncGenerator, Callable, Iterator, Sequence
 from datetime import date
+from itertools import compress
 from time import time
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Literal
 from urllib.parse import urlparse
 
 from rich.pretty import pprint as rpp
 
-from byteflows.contentio import PathTemplate
-from byteflows.core import ByteflowCore
+from byteflows.contentio import (
+    PathTemplate,
+    deserialize,
+    deserialize_many,
+    serialize,
+)
+from byteflows.core import ByteflowCore, SfnUndefined, Undefined
 from byteflows.storages.base import BaseBufferableStorage
 
 if TYPE_CHECKING:
-    from byteflows.contentio import IOContext
+    from byteflows.contentio import (
+        ChangeCapture,
+        ContentDeduplicator,
+        IOContext,
+        SchemaLearner,
+    )
     from byteflows.contentio.contentio import IOBoundPipeline
     from byteflows.resources import BaseResource, BaseResourceRequest
+    from byteflows.scheduling import MemoryMonitor
     from byteflows.scheduling.base import ActionCondition
     from byteflows.storages import ContentQueue
 
-__all__ = ["BaseDataCollector"]
+__all__ = ["BaseDataCollector", "CollectorBranch"]
+
+
+class CollectorBranch:
+    """
+    The part of a data collector that serves one I/O context of the request.
+    The content received from the resource is decoded once and passed to all
+    branches of the data collector, each of which processes it with its own
+    pipeline and stores it in its own format, path and storage. Branches share
+    decoded data objects, so pipeline steps must not modify the objects passed
+    to them in place.
+
+    Attributes:
+        name (str): name of the branch. See BaseResourceRequest.branch_name for
+            details.
+        io_context (IOContext): the I/O context served by the branch.
+        _write_channel (ContentQueue): a buffer in memory in which data is
+            stored before uploading to the backend.
+        pipeline (IOBoundPipeline): an instance of the pipeline class
+            associated with the I/O context.
+        input_format (str): format of incoming data.
+        output_format (str): the format in which the data should be saved.
+        path_producer (PathTemplate): data path generator.
+        dedup (ContentDeduplicator): deduplicator of the received content, if
+            attached to the I/O context.
+        cdc (ChangeCapture): change data capture index, if attached to the I/O
+            context.
+        schema (SchemaLearner): schema learner of the incoming data, if
+            attached to the I/O context.
+        key_columns (list[str] | None): columns whose values identify a record.
+    """
+
+    def __init__(
+        self,
+        resource: BaseResource,
+        query: BaseResourceRequest,
+        io_context: IOContext,
+    ):
+        """
+        Args:
+            resource (BaseResource): a resource from which additional
+                information is retrieved to initialize the branch.
+            query (BaseResourceRequest): the request processed by the data
+                collector.
+            io_context (IOContext): one of the I/O contexts of the request.
+        """
+        self.name: str = query.branch_name(io_context)
+        self.io_context: IOContext = io_context
+        storage: BaseBufferableStorage = io_context.storage
+        self._write_channel: ContentQueue = storage.create_buffer(
+            query, io_context
+        )
+        self.pipeline: IOBoundPipeline = io_context.pipeline
+        self.input_format: str = io_context.in_format
+        self.output_format: str = io_context.out_format
+        self.dedup: ContentDeduplicator | Undefined = io_context.dedup
+        self.cdc: ChangeCapture | Undefined = io_context.cdc
+        self.schema: SchemaLearner | Undefined = io_context.schema
+        self.key_columns: list[str] | None = io_context.key_columns
+        if io_context.path_temp is not SfnUndefined:
+            self.path_producer: PathTemplate = io_context.path_temp
+        else:
+            self.path_producer = io_context.attache_pathgenerator()
+            self.path_producer.add_segment("", 1, [urlparse(resource.url)[1]])
+            self.path_producer.add_segment("", 2, [self.name])
+            self.path_producer.add_segment(
+                "_", 3, [date.today, self.name, time]
+            )
+            rpp(
+                "Пример сформированного дефолтного пути: "
+                f"{self.path_producer.render_path(self.output_format)}"
+            )
+
+    @property
+    def storage(self) -> BaseBufferableStorage:
+        """
+        The property returns the storage in which the branch stores data.
+        """
+        return self._write_channel.storage
+
+    async def seen_mask(
+        self, contents: Sequence[Any], scope: Literal["raw", "output"]
+    ) -> tuple[list[bool], list[str]]:
+        """
+        The method marks payloads that have not been received for the branch
+        before, if a deduplicator with the given scope is attached to the I/O
+        context. The hashes of new payloads are only staged: they must be
+        passed to the buffer (see stage_digests) once their data is placed in
+        it, or rolled back (see rollback_digests). For the "output" scope,
+        objects are serialized in the output format to be compared, so each of
+        them is serialized once more than without deduplication.
+
+        Args:
+            contents (Sequence[Any]): raw content or data objects after the
+                pipeline.
+            scope (Literal["raw", "output"]): the stage of processing at which
+                the method is called.
+
+        Returns:
+            tuple[list[bool], list[str]]: True for new payloads, in the
+                original order, and the staged hashes of new payloads.
+        """
+        if self.dedup is SfnUndefined or self.dedup.scope != scope:
+            return [True] * len(contents), []
+        payloads: Sequence[bytes] = contents
+        if scope == "output":
+            payloads = await gather(
+                *[
+                    to_thread(serialize, dataobj, self.output_format)
+                    for dataobj in contents
+                ]
+            )
+        mask, digests = await to_thread(
+            self.dedup.filter_new, self.name, payloads
+        )
+        if not all(mask):
+            rpp(
+                f"Отброшено повторяющихся объектов: {mask.count(False)} из "
+                f"{len(mask)}."
+            )
+        return mask, digests
+
+    def stage_digests(self, buf: ContentQueue, digests: Sequence[str]) -> None:
+        """
+        The method passes the staged hashes of payloads to the buffer, which
+        commits them to the deduplicator after the upload. Must be called
+        while the state of the buffer is locked.
+
+        Args:
+            buf (ContentQueue): the buffer of the branch.
+            digests (Sequence[str]): hashes returned by seen_mask.
+        """
+        buf.pending_digests.extend(digests)
+
+    async def rollback_digests(self, digests: Sequence[str]) -> None:
+        """
+        The method discards the staged hashes of payloads whose data could not
+        be placed in the buffer, so that the payloads are accepted when they
+        are received again.
+
+        Args:
+            digests (Sequence[str]): hashes returned by seen_mask.
+        """
+        if digests and self.dedup is not SfnUndefined:
+            await to_thread(self.dedup.rollback, self.name, digests)
+
+    def decode(self, raw_bytes: bytes) -> Any:
+        """
+        The method deserializes a payload in the input format of the branch,
+        using the schema learned for the branch if a schema learner is attached
+        to the I/O context.
+
+        Args:
+            raw_bytes (bytes): payload in byte representation.
+
+        Returns:
+            Any: data object.
+        """
+        if self.schema is SfnUndefined:
+            return deserialize(raw_bytes, self.input_format)
+        return self.schema.decode(self.name, raw_bytes, self.input_format)
+
+    def decode_many(self, raw_content: Sequence[bytes]) -> list[Any]:
+        """
+        The method deserializes a batch of payloads in the input format of the
+        branch. Without a schema learner, the batch is parsed in one call if a
+        batch input function is registered for the format (see
+        deserialize_many).
+
+        Args:
+            raw_content (Sequence[bytes]): payloads in byte representation.
+
+        Returns:
+            list[Any]: data objects in the order of the payloads.
+        """
+        if self.schema is SfnUndefined:
+            return deserialize_many(raw_content, self.input_format)
+        return [self.decode(raw_bytes) for raw_bytes in raw_content]
+
+    async def process(
+        self, dataobjs: Sequence[Any], digests: Sequence[str] = ()
+    ) -> None:
+        """
+        The method passes decoded data objects through the pipeline of the
+        branch, if any, and places the results in the buffer as they become
+        ready. The staged hashes of the payloads are passed to the buffer once
+        all results are placed in it, or rolled back if processing fails.
+
+        Args:
+            dataobjs (Sequence[Any]): decoded data objects.
+            digests (Sequence[str], optional): hashes of the payloads staged by
+                raw deduplication. Defaults to ().
+        """
+        if not dataobjs:
+            return
+        try:
+            if self.pipeline is SfnUndefined:
+                await self.write_content(dataobjs)
+            else:
+                async for outputs in self.pipeline.stream_transform(dataobjs):
+                    await self.write_content(outputs)
+        except BaseException:
+            await self.rollback_digests(digests)
+            raise
+        if digests:
+            async with self._write_channel.block_state() as buf:
+                self.stage_digests(buf, digests)
+
+    async def write_content(self, contents: Sequence[Any]) -> None:
+        """
+        The method places data objects in the buffer, rendering a separate path
+        for each of them. Objects already received for the branch are dropped
+        beforehand if output deduplication is enabled.
+
+        Args:
+            contents (Sequence[Any]): data objects after the pipeline.
+        """
+        mask, digests = await self.seen_mask(contents, "output")
+        contents = list(compress(contents, mask))
+        if not contents:
+            return
+        prepared_content = tuple(
+            (self.path_producer.render_path(self.output_format), dataset)
+            for dataset in contents
+        )
+        try:
+            async with self._write_channel.block_state() as buf:
+                await buf.parse_content(prepared_content)
+                self.stage_digests(buf, digests)
+        except BaseException:
+            await self.rollback_digests(digests)
+            raise
+
+    async def finish_changes(self) -> None:
+        """
+        The method completes a run of the request for change data capture: the
+        buffer is uploaded so that all received records are reflected in the
+        index, after which the records that were not received during the run
+        are placed in the buffer as deleted. Deletes are not detected if
+        content deduplication is enabled for the branch: records of the
+        payloads dropped as duplicates are not received in the run, but they
+        have not been deleted.
+        """
+        if self.cdc is SfnUndefined or not self.key_columns:
+            return
+        await self.storage.merge_to_backend(self._write_channel)
+        deleted: Any | None = await to_thread(
+            self.cdc.finish_run,
+            self.name,
+            self.key_columns,
+            deletes=self.dedup is SfnUndefined,
+        )
+        rpp(
+            f"Изменения за прогон {self.name}: "
+            f"{self.cdc.last_runs.get(self.name)}"
+        )
+        if deleted is None:
+            return
+        path: str = self.path_producer.render_path(self.output_format)
+        async with self._write_channel.block_state() as buf:
+            buf.change_paths.add(path)
+            await buf.parse_content([(path, deleted)])
 
 
 class BaseDataCollector(ByteflowCore):
@@ -30,7 +303,9 @@ class BaseDataCollector(ByteflowCore):
     call the data handler pipeline, and send data to the store. Data collectors take into account the
     restrictions associated with the resource, such as the rate limit, the interval for processing the
     resource, and the data format received when accessing the resource. For each instance of a request
-    to a resource, a data collector is created.
+    to a resource, a data collector is created. For each I/O context of the
+    request, the data collector creates a branch (see CollectorBranch), and the
+    received content is processed in all branches concurrently.
     At the moment, only work with API resources is available.
 
     Attributes:
@@ -38,12 +313,24 @@ class BaseDataCollector(ByteflowCore):
         timeout (int | float): waiting time for a response from the data source.
         collect_trigger (ActionCondition): a trigger, the firing of which allows you to begin processing the data source.
         eor_status (bool): the status of no payload in the data source.
-        _write_channel (ContentQueue): a buffer in memory in which data is stored before uploading to the backend.
+        branches (list[CollectorBranch]): branches of the data collector, one
+            for each I/O context of the request. The first branch serves the
+            primary context.
+        _write_channel (ContentQueue): a buffer in memory of the primary
+            branch.
         url_series (AsyncGenerator): a link generator created by a Request instance.
-        pipeline (IOBoundPipeline): an instance of the pipeline class associated with a request that is processed by the data collector.
-        input_format (str): format of incoming data.
-        output_format (str): the format in which the data should be saved.
-        path_producer (PathTemplate): data path generator.
+        pipeline (IOBoundPipeline): the pipeline of the primary branch.
+        input_format (str): format of incoming data of the primary branch.
+        output_format (str): the format in which the primary branch saves data.
+        path_producer (PathTemplate): data path generator of the primary
+            branch.
+        memory_monitor (MemoryMonitor | None): memory monitor that pauses
+            fetching and reduces the number of simultaneous requests under
+            memory pressure.
+        shutdown (Event | None): event set when the application shuts down.
+            After it is set, the data collector does not start new batches.
+        in_flight (bool): indicates that the data collector is processing a
+            batch of requests.
     """
 
     def __init__(self, resource: BaseResource, query: BaseResourceRequest):
@@ -56,26 +343,116 @@ class BaseDataCollector(ByteflowCore):
         self.delay: int | float = resource.delay
         self.timeout: int | float = resource.request_timeout
         self.collect_trigger: ActionCondition = query.collect_interval
-        io_context: IOContext = query.io_context
-        storage: BaseBufferableStorage = io_context.storage
         self.eor_status = False
-        self._write_channel: ContentQueue = storage.create_buffer(query)
+        self.branches: list[CollectorBranch] = [
+            CollectorBranch(resource, query, io_context)
+            for io_context in query.io_contexts
+        ]
+        primary: CollectorBranch = self.branches[0]
+        self._write_channel: ContentQueue = primary._write_channel
         self.url_series: Callable[..., AsyncGenerator[str]] = query.gen_url
-        self.pipeline: IOBoundPipeline = io_context.pipeline
-        self.input_format: str = io_context.in_format
-        self.output_format: str = io_context.out_format
-        if io_context.path_temp:
-            self.path_producer: PathTemplate = io_context.path_temp
-        else:
-            self.path_producer = io_context.attache_pathgenerator()
-            self.path_producer.add_segment("", 1, [urlparse(resource.url)[1]])
-            self.path_producer.add_segment("", 2, [query.name])
-            self.path_producer.add_segment(
-                "_", 3, [date.today, query.name, time]
+        self.pipeline: IOBoundPipeline = primary.pipeline
+        self.input_format: str = primary.input_format
+        self.output_format: str = primary.output_format
+        self.path_producer: PathTemplate = primary.path_producer
+        self.memory_monitor: MemoryMonitor | None = None
+        self.shutdown: Event | None = None
+        self.in_flight: bool = False
+
+    @property
+    def stopping(self) -> bool:
+        """
+        The property indicates that the application is shutting down and new
+        batches should not be started.
+        """
+        return self.shutdown is not None and self.shutdown.is_set()
+
+    @property
+    def storages(self) -> list[BaseBufferableStorage]:
+        """
+        The property returns the storages of all branches without repetitions.
+        """
+        storages: list[BaseBufferableStorage] = []
+        for branch in self.branches:
+            if branch.storage not in storages:
+                storages.append(branch.storage)
+        return storages
+
+    async def launch_sessions(self) -> None:
+        """
+        The method opens sessions of the storages of all branches.
+        """
+        await gather(*[storage.launch_session() for storage in self.storages])
+
+    async def dispatch(self, raw_content: Sequence[bytes]) -> None:
+        """
+        The method passes the received content to all branches. Payloads
+        already received by a branch are dropped for it if raw deduplication is
+        enabled. Each payload is decoded once for every input format used by
+        the branches (in one call per batch if the format has a batch input
+        function; branches with a schema learner decode it with their own
+        schema), and the branches process the decoded objects concurrently. An
+        error in one branch does not interrupt the others, it is raised after
+        all branches have finished.
+
+        Args:
+            raw_content (Sequence[bytes]): batch of content in byte
+                representation.
+        """
+        seen: list[tuple[list[bool], list[str]]] = list(
+            await gather(
+                *[
+                    branch.seen_mask(raw_content, "raw")
+                    for branch in self.branches
+                ]
             )
-            rpp(
-                f"Пример сформированного дефолтного пути: {self.path_producer.render_path(self.output_format)}"
+        )
+        masks: list[list[bool]] = [mask for mask, _ in seen]
+        needed: list[bool] = [any(flags) for flags in zip(*masks)]
+        decoders: dict[tuple[str, Any], CollectorBranch] = {}
+        for branch in self.branches:
+            decoders.setdefault((branch.input_format, branch.schema), branch)
+        decoded: dict[tuple[str, Any], list[Any]] = {}
+        try:
+            for key, branch in decoders.items():
+                dataobjs: Iterator[Any] = iter(
+                    branch.decode_many(list(compress(raw_content, needed)))
+                )
+                decoded[key] = [
+                    next(dataobjs) if need else None for need in needed
+                ]
+        except BaseException:
+            await gather(
+                *[
+                    branch.rollback_digests(digests)
+                    for branch, (_, digests) in zip(self.branches, seen)
+                ]
             )
+            raise
+        results: list[Any] = await gather(
+            *[
+                branch.process(
+                    list(
+                        compress(
+                            decoded[(branch.input_format, branch.schema)], mask
+                        )
+                    ),
+                    digests,
+                )
+                for branch, (mask, digests) in zip(self.branches, seen)
+            ],
+            return_exceptions=True,
+        )
+        for exc in results:
+            if isinstance(exc, BaseException):
+                raise exc
+
+    async def finish_changes(self) -> None:
+        """
+        The method completes a run of the request for change data capture in
+        all branches. See CollectorBranch.finish_changes for details.
+        """
+        await gather(*[branch.finish_changes() for branch in self.branches])
 
     @abstractmethod
     async def start(self) -> Task:
@@ -85,7 +462,7 @@ class BaseDataCollector(ByteflowCore):
         The method must return itself, wrapped in an asyncio task.
         """
         await self.collect_trigger.pending()
-        await self._write_channel.storage.launch_session()
+        await self.launch_sessions()
         ...
 
     @abstractmethod
@@ -1,22 +1,41 @@
 from __future__ import annotations
 
 import asyncio
-from asyncio import FIRST_COMPLETED, create_task, wait
+import signal
+from asyncio import (
+    FIRST_COMPLETED,
+    AbstractEventLoop,
+    Event,
+    all_tasks,
+    create_task,
+    gather,
+    get_running_loop,
+    sleep,
+    wait,
+)
 from dataclasses import dataclass, field
 from importlib import import_module
 from threading import Thread
-from typing import TYPE_CHECKING, Literal, TypeVar
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
+
+from rich.pretty import pprint as rpp
 
 from byteflows.data_collectors import ApiDataCollector, BaseDataCollector
 from byteflows.resources import ApiResource
 from byteflows.resources.base import BaseResource
+from byteflows.scheduling import MemoryMonitor
 from byteflows.storages.base import BaseBufferableStorage
+from byteflows.storages.compaction import BlobCompactor
 
 if TYPE_CHECKING:
     from asyncio import Task
+    from collections.abc import Callable
     from types import ModuleType
 
+    from byteflows.scheduling import ActionCondition
     from byteflows.storages import FsBlobStorage
+    from byteflows.storages.base import Mb
 
 __all__ = ["EntryPoint"]
 
@@ -27,8 +46,16 @@ _AS = TypeVar("_AS", bound="BaseBufferableStorage", covariant=True)
 @dataclass
 class EntryPoint:
     lookup_interval: int = field(default=600)
+    drain_timeout: int | float = field(default=30)
     registred_resources: list = field(default_factory=list, init=False)
+    registred_jobs: list = field(default_factory=list, init=False)
+    registred_storages: list = field(default_factory=list, init=False)
+    memory_monitor: MemoryMonitor | None = field(default=None, init=False)
     debug_mode: bool = field(init=False, default=False)
+    drain_stats: dict = field(default_factory=dict, init=False)
+    _loop: AbstractEventLoop | None = field(default=None, init=False)
+    _shutdown: Event | None = field(default=None, init=False)
+    _shutdown_requested: bool = field(default=False, init=False)
 
     """
     The main class responsible for configuring, running and controlling 
@@ -36,9 +63,18 @@ class EntryPoint:
 
     Args:
         lookup_interval (int): the interval in seconds at which task completion is checked.
+        drain_timeout (int | float): time in seconds given to data collectors
+            on shutdown to finish the batches being processed. Default is 30.
         registred_resources (list): list of registered resources. Resources store data about requests, for each of which a
                                     data collector is created.
+        registred_jobs (list): list of registered background jobs (for example,
+            compaction of objects in storage).
+        registred_storages (list): list of created storages.
+        memory_monitor (MemoryMonitor | None): memory monitor of the
+            application, if defined.
         debug_mode (bool): debug mode indicator. Default is False.
+        drain_stats (dict): statistics of the last shutdown (duration of the
+            stages in seconds and the number of uploaded buffers).
     """
 
     def define_resource(
@@ -77,26 +113,139 @@ class EntryPoint:
             storage_type
         ]
         instance: FsBlobStorage = impl()
+        self.registred_storages.append(instance)
         return instance
 
+    def define_compaction(
+        self,
+        *,
+        storage: FsBlobStorage,
+        prefix: str,
+        content_format: str,
+        condition: ActionCondition,
+        target_size: Mb = 64,
+        max_objects: int = 1000,
+    ) -> BlobCompactor:
+        """
+        The method creates and registers a background job that compacts small
+        objects in the storage. The job runs alongside data collectors whenever
+        the specified condition occurs. See BlobCompactor for details.
+
+        Args:
+            storage (FsBlobStorage): the storage whose objects are compacted.
+            prefix (str): the path prefix under which the objects are searched
+                for.
+            content_format (str): format of compacted objects.
+            condition (ActionCondition): the event upon which compaction
+                starts, for example, a TimeCondition. Each job needs its own
+                instance of the condition.
+            target_size (Mb, optional): the desired size of the compacted
+                object in megabytes. Defaults to 64.
+            max_objects (int, optional): maximum number of source objects
+                merged into one. Defaults to 1000.
+
+        Returns:
+            BlobCompactor: compaction job instance.
+        """
+        job = BlobCompactor(
+            storage,
+            prefix,
+            content_format=content_format,
+            condition=condition,
+            target_size=target_size,
+            max_objects=max_objects,
+        )
+        self.registred_jobs.append(job)
+        return job
+
+    def define_memory_monitor(
+        self,
+        *,
+        soft_limit: float = 0.75,
+        hard_limit: float = 0.9,
+        resume_limit: float | None = None,
+        max_pause: float | None = 60,
+        min_flush_size: Mb = 1,
+        memory_limit: Mb | None = None,
+        interval: float = 1,
+        alert: Callable[[dict[str, Any]], Any] | None = None,
+    ) -> MemoryMonitor:
+        """
+        The method creates the memory monitor of the application. Under memory
+        pressure the monitor flushes the buffers of all created storages early,
+        reduces the number of simultaneous requests of data collectors and,
+        above the hard threshold, pauses fetching. See MemoryMonitor for
+        details.
+
+        Args:
+            soft_limit (float, optional): share of the memory limit above which
+                buffers are flushed early. Defaults to 0.75.
+            hard_limit (float, optional): share of the memory limit above which
+                fetching is paused. Defaults to 0.9.
+            resume_limit (float | None, optional): share of the memory limit
+                below which the collectors return to normal work. If None, it
+                is 0.05 below the soft threshold. Defaults to None.
+            max_pause (float | None, optional): maximum duration of the pause
+                of fetching in seconds. Defaults to 60.
+            min_flush_size (Mb, optional): memory in megabytes that a buffer
+                must occupy to be flushed above the soft threshold. Defaults to
+                1.
+            memory_limit (Mb | None, optional): memory limit in megabytes. If
+                None, the limit of the container is used. Defaults to None.
+            interval (float, optional): sampling interval in seconds. Defaults
+                to 1.
+            alert (Callable[[dict[str, Any]], Any] | None, optional): function
+                called when the hard threshold is passed. Defaults to None.
+
+        Returns:
+            MemoryMonitor: memory monitor instance.
+        """
+        monitor = MemoryMonitor(
+            soft_limit,
+            hard_limit,
+            resume_limit=resume_limit,
+            max_pause=max_pause,
+            min_flush_size=min_flush_size,
+            memory_limit=memory_limit,
+            interval=interval,
+            alert=alert,
+        )
+        self.memory_monitor = monitor
+        self.registred_jobs.append(monitor)
+        return monitor
+
     async def _collect_data(self) -> None:
         # Мы запускаем все триггеры на ожидание в конкрутентом исполнении и рекурсивно их перезапускаем
         """
         The method starts the work of data collectors and periodically checks their readiness.
         In the same method, errors are intercepted if the asyncio task fails with an error.
         """
-        awaiting_tasks: list[Task] | set[Task] = [
+        self._loop = get_running_loop()
+        self._shutdown = Event()
+        if self._shutdown_requested:
+            self._shutdown.set()
+        collectors: list[BaseDataCollector] = self._prepare_collectors()
+        if self.memory_monitor is not None:
+            self.memory_monitor.watch(*self.registred_storages)
+        for dc in collectors:
+            dc.memory_monitor = self.memory_monitor
+            dc.shutdown = self._shutdown
+        awaiting_tasks: set[Task] = {
             create_task(dc.start(), name=dc._name)
-            for dc in self._prepare_collectors()
-        ]
+            for dc in [*collectors, *self.registred_jobs]
+        }
+        shutdown_waiter: Task = create_task(self._shutdown.wait())
         while awaiting_tasks:
             done, pending = await wait(
-                awaiting_tasks,
+                awaiting_tasks | {shutdown_waiter},
                 timeout=self.lookup_interval,
                 return_when=FIRST_COMPLETED,
             )
             print(f"Done is {done}, pending is {pending}")
-            awaiting_tasks = pending
+            if shutdown_waiter in done:
+                await self._drain(collectors)
+                return
+            awaiting_tasks = pending - {shutdown_waiter}
             for task in done:
                 if task.exception() is None:
                     awaiting_tasks.add(task.result())
@@ -105,19 +254,104 @@ class EntryPoint:
                         f"Condition {task.get_coro()} finished execution with an error {task.exception()}"
                     )
                     task.cancel()
+        shutdown_waiter.cancel()
+
+    async def _drain(self, collectors: list[BaseDataCollector]) -> None:
+        """
+        The method shuts the application down gracefully. Data collectors stop
+        starting new batches, batches being processed are given drain_timeout
+        seconds to finish, after which collectors and background jobs are
+        cancelled. Then all buffers of all storages are uploaded to the backend
+        concurrently and storage sessions are closed. The duration of each
+        stage is written to drain_stats.
+
+        Args:
+            collectors (list[BaseDataCollector]): data collectors of the
+                application.
+        """
+        start: float = monotonic()
+        rpp("Получен сигнал остановки, новые запросы не отправляются.")
+        deadline: float = start + self.drain_timeout
+        while (
+            any(dc.in_flight for dc in collectors) and monotonic() < deadline
+        ):
+            await sleep(0.1)
+        waited: float = monotonic() - start
+        # задачи пересоздаются рекурсивно, поэтому отменяются по имени, а не по
+        # исходным объектам
+        names: set[str] = {
+            x._name for x in [*collectors, *self.registred_jobs]
+        }
+        tasks: list[Task] = [t for t in all_tasks() if t.get_name() in names]
+        for task in tasks:
+            task.cancel()
+        await gather(*tasks, return_exceptions=True)
+        storages: list[BaseBufferableStorage] = list(self.registred_storages)
+        for dc in collectors:
+            storages.extend(s for s in dc.storages if s not in storages)
+        flushes: list = [
+            storage.merge_to_backend(buf)
+            for storage in storages
+            for buf in storage.mem_buffer.get_buffers()
+            if buf.size or buf.has_pending
+        ]
+        flush_start: float = monotonic()
+        results: list = await gather(*flushes, return_exceptions=True)
+        for exc in filter(lambda x: isinstance(x, BaseException), results):
+            print(f"Buffer upload finished with an error {exc!r}")
+        flushed: float = monotonic() - flush_start
+        await gather(
+            *[storage.close_session() for storage in storages],
+            return_exceptions=True,
+        )
+        self.drain_stats = {
+            "in_flight_wait": waited,
+            "flush": flushed,
+            "buffers": len(flushes),
+            "total": monotonic() - start,
+        }
+        rpp(f"Приложение остановлено: {self.drain_stats}")
+
+    def request_shutdown(self, *_: Any) -> None:
+        """
+        The method asks the application to shut down gracefully (see _drain).
+        It can be called from any thread, and is also installed as the SIGTERM
+        and SIGINT handler when the application is launched from the main
+        thread.
+        """
+        self._shutdown_requested = True
+        if self._loop is not None and self._shutdown is not None:
+            self._loop.call_soon_threadsafe(self._shutdown.set)
 
     def run(self, *, debug: bool = False) -> None:
         """
         Method for launching the application. After calling it, data collectors are created and launched.
+        SIGTERM and SIGINT cause a graceful shutdown: fetching stops and all
+        buffers are uploaded to the backend.
 
         Args:
             debug (bool, optional): if True, then the application will start in debug mode and write a detailed log.
                                     Important! At the moment, logging is not implemented. Defaults to False.
         """
         self.debug_mode = debug
+        previous_handlers: dict[int, Any] = dict()
+        try:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(
+                    signum, self.request_shutdown
+                )
+        except ValueError:
+            # обработчики сигналов можно установить только из главного потока
+            pass
         threaded_loop = Thread(target=self._run_async)
         threaded_loop.start()
-        threaded_loop.join()
+        try:
+            while threaded_loop.is_alive():
+                threaded_loop.join(0.5)
+        finally:
+            for signum, handler in previous_handlers.items():
+                if handler is not None:
+                    signal.signal(signum, handler)
 
     def _run_async(self) -> None:
         """
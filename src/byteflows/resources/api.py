@@ -10,6 +10,7 @@ from collections.abc import (
     Iterator,
     MutableMapping,
     MutableSequence,
+    Sequence,
 )
 from functools import cached_property
 from itertools import count, product, zip_longest
@@ -23,6 +24,7 @@ from byteflows.resources.base import (
     BaseResource,
     BaseResourceRequest,
 )
+from byteflows.scheduling import AlwaysRun
 
 __all__ = [
     "ApiRequest",
@@ -41,7 +43,7 @@ if TYPE_CHECKING:
     from aiohttp import ClientResponse
 
     from byteflows.contentio import IOContext
-    from byteflows.scheduling import ActionCondition, AlwaysRun
+    from byteflows.scheduling import ActionCondition
 
 
 class FixEndpointSection:
@@ -211,7 +213,13 @@ class ApiRequest(BaseResourceRequest):
         endpoint (EndpointPath): the API endpoint that will be processed by this request.
         fix_params (MutableMapping[str, str]): HTTP request parameters that do not change from request to request. Defaults to SfnUndefined.
         mutable_params (MutableMapping[str, MutableSequence]): HTTP request parameters that change from request to request. Defaults to SfnUndefined.
-        io_context (IOContext): I/O context instance. Specifies the actions that need to be performed with the data obtained as a result of the request execution (in what format to deserialize, where to save, whether the information needs to be further processed, and so on).
+        io_context (IOContext): the primary I/O context instance. Specifies the
+            actions that need to be performed with the data obtained as a
+            result of the request execution (in what format to deserialize,
+            where to save, whether the information needs to be further
+            processed, and so on).
+        io_contexts (list[IOContext]): all I/O contexts of the request. The
+            content is fetched once and processed in each of them.
         collect_interval (ActionCondition, optional): request activity interval. See ActionCondition for details. Defaults to AlwaysRun().
         has_pages (bool, optional): if True, then the class will try to crawl the resource with the request parameters specified in the next generated url, page by page. Defaults to True.
     """
@@ -220,7 +228,7 @@ class ApiRequest(BaseResourceRequest):
         self,
         name: str,
         endpoint: EndpointPath,
-        io_context: IOContext,
+        io_context: IOContext | Sequence[IOContext],
         collect_interval: ActionCondition = AlwaysRun(),
         fix_params: MutableMapping[str, str] | Undefined = SfnUndefined,
         mutable_params: MutableMapping[str, MutableSequence]
@@ -231,7 +239,7 @@ class ApiRequest(BaseResourceRequest):
         Args:
             name (str): request ID.
             endpoint (EndpointPath): the API endpoint that will be processed by this request.
-            io_context (IOContext): I/O context instance. Specifies the actions that need to be performed with the data obtained as a
+            io_context (IOContext | Sequence[IOContext]): I/O context instance or several of them. Specifies the actions that need to be performed with the data obtained as a
                                     result of the request execution (in what format to deserialize, where to save, whether the information needs to be further processed, and so on).
             collect_interval (ActionCondition, optional): request activity interval. See ActionCondition for details. Defaults to AlwaysRun().
             fix_params (MutableMapping[str, str]): HTTP request parameters that do not change from request to request. Defaults to SfnUndefined.
@@ -688,7 +696,7 @@ class ApiResource(BaseResource):
         self,
         name: str,
         endpoint: EndpointPath | str,
-        io_context: IOContext,
+        io_context: IOContext | Sequence[IOContext],
         collect_interval: ActionCondition = AlwaysRun(),
         has_pages: bool = True,
         replace: bool = False,
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Sequence
 from typing import TYPE_CHECKING, Literal, Self, overload
 
 from byteflows.core import ByteflowCore
@@ -25,23 +25,39 @@ class BaseResourceRequest(ByteflowCore):
     Each resource can have an unlimited number of requests - it all depends
     on how the resource is logically divided and which parts of it are required by the user.
 
+    A request can have several I/O contexts. In this case, the content is
+    fetched from the resource once and each context processes and stores it in
+    its own way (for example, raw json in one storage and a cleaned table in
+    another). The first context is the primary one.
+
     Args:
         name (str): request name. Must be unique within a single resource.
-        io_context (IOContext): I/O context instance. Specifies the actions that need to be performed with the data obtained as a
+        io_context (IOContext | Sequence[IOContext]): I/O context instance or several of them. Specifies the actions that need to be performed with the data obtained as a
                                 result of the request execution (in what format to deserialize, where to save, whether the information needs to be further processed, and so on).
         collect_interval (ActionCondition, optional): request activity interval. See ActionCondition for details. Defaults to AlwaysRun().
         has_pages (bool, optional): if True, then links to crawl the resource will be generated taking into account the paginator. Defaults to True.
+
+    Raises:
+        ValueError: thrown if an empty sequence of I/O contexts is passed.
     """
 
     def __init__(
         self,
         name: str,
-        io_context: IOContext,
+        io_context: IOContext | Sequence[IOContext],
         collect_interval: ActionCondition = AlwaysRun(),
         has_pages: bool = True,
     ):
         self.name: str = name
-        self.io_context: IOContext = io_context
+        self.io_contexts: list[IOContext] = (
+            list(io_context)
+            if isinstance(io_context, Sequence)
+            else [io_context]
+        )
+        if not self.io_contexts:
+            msg = "Запросу необходим хотя бы один контекст ввода-вывода."
+            raise ValueError(msg)
+        self.io_context: IOContext = self.io_contexts[0]
         self.collect_interval: ActionCondition = collect_interval
         self.has_pages: bool = has_pages
         self.enable = True
@@ -60,13 +76,43 @@ class BaseResourceRequest(ByteflowCore):
 
     def get_io_context(self) -> IOContext:
         """
-        The method returns the I/O context object assigned to the request instance.
+        The method returns the primary I/O context object assigned to the
+        request instance.
 
         Returns:
             IOContext: instance of I/O context.
         """
         return self.io_context
 
+    def add_io_context(self, io_context: IOContext) -> None:
+        """
+        The method adds one more I/O context to the request. The content
+        received for the request will also be processed and stored according to
+        it.
+
+        Args:
+            io_context (IOContext): instance of I/O context.
+        """
+        if io_context not in self.io_contexts:
+            self.io_contexts.append(io_context)
+
+    def branch_name(self, io_context: IOContext) -> str:
+        """
+        The method returns the name under which the content of the request is
+        processed in the given I/O context. For the primary context it is the
+        name of the request, for the rest the name of the request with the
+        number of the context. This name identifies the buffer of the context,
+        its deduplication and change data capture state.
+
+        Args:
+            io_context (IOContext): one of the I/O contexts of the request.
+
+        Returns:
+            str: name of the branch.
+        """
+        idx: int = self.io_contexts.index(io_context)
+        return self.name if idx == 0 else f"{self.name}.{idx}"
+
 
 class BaseResource(ByteflowCore):
     """
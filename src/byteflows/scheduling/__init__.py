@@ -1,4 +1,5 @@
 from .base import *
 from .limits import *
+from .memory import *
 from .timeinterval import *
 from .triggers import *
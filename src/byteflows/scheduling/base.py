@@ -1,7 +1,14 @@
+from __future__ import annotations
+
 from abc import abstractmethod
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
 
 from byteflows.core import ByteflowCore
 
+if TYPE_CHECKING:
+    from byteflows.storages import ContentQueue
+
 __all__ = ["ActionCondition", "BaseLimit"]
 
 
@@ -37,8 +44,12 @@ class BaseLimit(ByteflowCore):
     Limits analyze the specified storage indicators and signal when a specified threshold is exceeded
     (for example, the amount of memory occupied, the number of elements, etc.).
     In storage they are used to dump data from the buffer to the backend.
+    In addition to the storage-wide threshold, a limit can have a threshold for
+    each individual buffer (buffer_capacity).
     """
 
+    buffer_capacity: Any = None
+
     @abstractmethod
     def is_overflowed(self) -> bool:
         """
@@ -48,3 +59,74 @@ class BaseLimit(ByteflowCore):
             bool: returns True if the threshold has been passed.
         """
         ...
+
+    def is_buffer_overflowed(self, buffer: ContentQueue) -> bool:
+        """
+        The method checks the threshold of an individual buffer. By default,
+        buffers have no threshold of their own.
+
+        Args:
+            buffer (ContentQueue): checked buffer.
+
+        Returns:
+            bool: returns True if the buffer threshold has been passed.
+        """
+        return False
+
+    def select_buffers(
+        self, buffers: Iterable[ContentQueue]
+    ) -> list[ContentQueue]:
+        """
+        The method selects the buffers that should be flushed when the
+        storage-wide threshold has been passed. By default, all non-empty
+        buffers are selected.
+
+        Args:
+            buffers (Iterable[ContentQueue]): all buffers of the storage.
+
+        Returns:
+            list[ContentQueue]: buffers to flush.
+        """
+        return [buf for buf in buffers if buf.size]
+
+    def flush_delay(self, buffer: ContentQueue) -> float | None:
+        """
+        The method returns the time after which the buffer must be flushed even
+        if it receives no more content (for example, because of the age of its
+        data). The buffer schedules a check for this time when it receives its
+        first object. By default, limits have no such deadline.
+
+        Args:
+            buffer (ContentQueue): checked buffer.
+
+        Returns:
+            float | None: time in seconds or None if there is no deadline.
+        """
+        return None
+
+    def on_ingest(self, buffer: ContentQueue, nbytes: int, count: int) -> None:
+        """
+        The hook is called after new content has been placed in the buffer.
+        Limits that learn from the behavior of buffers can override it. By
+        default, does nothing.
+
+        Args:
+            buffer (ContentQueue): the buffer that received the content.
+            nbytes (int): estimated size of the received objects in bytes.
+            count (int): number of received objects.
+        """
+
+    def on_flush(
+        self, buffer: ContentQueue, nbytes: int, written: int, elapsed: float
+    ) -> None:
+        """
+        The hook is called after the buffer has been uploaded to the backend.
+        By default, does nothing.
+
+        Args:
+            buffer (ContentQueue): the uploaded buffer.
+            nbytes (int): estimated size of the uploaded objects in memory in
+                bytes.
+            written (int): size of the objects written to the backend in bytes.
+            elapsed (float): duration of the upload in seconds.
+        """
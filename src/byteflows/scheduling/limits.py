@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
+from time import time
 from typing import TYPE_CHECKING, Any, Literal
 
 from rich.pretty import pprint
@@ -9,10 +12,11 @@ from rich.pretty import pprint
 from byteflows.scheduling import BaseLimit
 
 if TYPE_CHECKING:
-    from byteflows.storages import BaseBufferableStorage
+    from byteflows.storages import BaseBufferableStorage, ContentQueue
 
 
 __all__ = [
+    "AdaptiveLimit",
     "CountLimit",
     "MemoryLimit",
     "TimeLimit",
@@ -25,7 +29,7 @@ __all__ = [
 
 _LIMIT_MAP = dict()
 
-_LIMIT_TYPE = Literal["unable", "memory", "count", "time"]
+_LIMIT_TYPE = Literal["unable", "memory", "count", "time", "adaptive"]
 
 
 def limit(limit_type: str) -> Callable[[type[BaseLimit]], type[BaseLimit]]:
@@ -48,7 +52,10 @@ def limit(limit_type: str) -> Callable[[type[BaseLimit]], type[BaseLimit]]:
 
 
 def setup_limit(
-    limit_type: str, capacity: Any, storage: BaseBufferableStorage
+    limit_type: str,
+    capacity: Any,
+    storage: BaseBufferableStorage,
+    **limit_kwargs: Any,
 ) -> BaseLimit:
     """
     Factory function that returns an instance of the limits class.
@@ -57,11 +64,15 @@ def setup_limit(
         limit_type (str): limit type.
         capacity (Any): volume limit.
         storage (BaseBufferableStorage): the storage to which the limit will be associated.
+        limit_kwargs (Any): additional parameters of the limit class (for
+            example, buffer_capacity).
 
     Returns:
         BaseLimit: instance of the limit class of the selected type.
     """
-    limit_instance: BaseLimit = _LIMIT_MAP[limit_type](storage, capacity)
+    limit_instance: BaseLimit = _LIMIT_MAP[limit_type](
+        storage, capacity, **limit_kwargs
+    )
     return limit_instance
 
 
@@ -75,6 +86,39 @@ def get_allowed_limits() -> list[tuple[str, BaseLimit]]:
     return list((k, v) for k, v in _LIMIT_MAP.items())
 
 
+def _largest_first(
+    buffers: Iterable[ContentQueue],
+    measure: Callable[[ContentQueue], int | float],
+    capacity: int | float,
+) -> list[ContentQueue]:
+    """
+    Selects buffers in descending order of the measured value until the total
+    value of the remaining buffers falls within the capacity.
+
+    Args:
+        buffers (Iterable[ContentQueue]): all buffers of the storage.
+        measure (Callable[[ContentQueue], int | float]): function that returns
+            the contribution of the buffer to the limited value.
+        capacity (int | float): storage-wide threshold.
+
+    Returns:
+        list[ContentQueue]: buffers to flush.
+    """
+    measured: list[tuple[int | float, ContentQueue]] = sorted(
+        ((measure(buf), buf) for buf in buffers if buf.size),
+        key=lambda x: x[0],
+        reverse=True,
+    )
+    total: int | float = sum(value for value, _ in measured)
+    selected: list[ContentQueue] = []
+    for value, buf in measured:
+        if total <= capacity:
+            break
+        selected.append(buf)
+        total -= value
+    return selected
+
+
 @limit("time")
 class TimeLimit(BaseLimit):
     """
@@ -83,21 +127,42 @@ class TimeLimit(BaseLimit):
     Attributes:
         storage (BaseBufferableStorage): a storage facility whose status is monitored.
         capacity (int): time in seconds.
+        buffer_capacity (int | float | None): maximum age in seconds of the
+            oldest object in an individual buffer.
     """
 
-    def __init__(self, storage: BaseBufferableStorage, capacity: int):
+    def __init__(
+        self,
+        storage: BaseBufferableStorage,
+        capacity: int,
+        buffer_capacity: int | float | None = None,
+    ):
         """
         Args:
             storage (BaseBufferableStorage): a storage facility whose status is monitored.
             capacity (int): time in seconds.
+            buffer_capacity (int | float | None, optional): maximum age in
+                seconds of the oldest object in an individual buffer. Defaults
+                to None.
         """
         self.storage: BaseBufferableStorage = storage
         self.capacity = timedelta(seconds=capacity)
+        self.buffer_capacity: int | float | None = buffer_capacity
 
     def is_overflowed(self) -> bool:
         current_timestamp: datetime = datetime.now()
         return self.capacity < (current_timestamp - self.storage.last_commit)
 
+    def is_buffer_overflowed(self, buffer: ContentQueue) -> bool:
+        return self.buffer_capacity is not None and (
+            buffer.age > self.buffer_capacity
+        )
+
+    def flush_delay(self, buffer: ContentQueue) -> float | None:
+        if self.buffer_capacity is None:
+            return None
+        return max(self.buffer_capacity - buffer.age, 0)
+
 
 @limit("memory")
 class MemoryLimit(BaseLimit):
@@ -109,14 +174,22 @@ class MemoryLimit(BaseLimit):
         capacity (int): time in seconds.
     """
 
-    def __init__(self, storage: BaseBufferableStorage, capacity: int | float):
+    def __init__(
+        self,
+        storage: BaseBufferableStorage,
+        capacity: int | float,
+        buffer_capacity: int | float | None = None,
+    ):
         """
         Args:
             storage (BaseBufferableStorage): a storage facility whose status is monitored.
             capacity (int): time in seconds.
+            buffer_capacity (int | float | None, optional): memory limit of an
+                individual buffer in megabytes. Defaults to None.
         """
         self.storage: BaseBufferableStorage = storage
         self.capacity: int | float = capacity
+        self.buffer_capacity: int | float | None = buffer_capacity
 
     def is_overflowed(self) -> bool:
         pprint(
@@ -124,6 +197,18 @@ class MemoryLimit(BaseLimit):
         )
         return self.capacity < self.storage.mem_alloc
 
+    def is_buffer_overflowed(self, buffer: ContentQueue) -> bool:
+        return self.buffer_capacity is not None and (
+            buffer.memory_size > self.buffer_capacity
+        )
+
+    def select_buffers(
+        self, buffers: Iterable[ContentQueue]
+    ) -> list[ContentQueue]:
+        return _largest_first(
+            buffers, lambda buf: buf.memory_size, self.capacity
+        )
+
 
 @limit("count")
 class CountLimit(BaseLimit):
@@ -135,19 +220,214 @@ class CountLimit(BaseLimit):
         capacity (int): time in seconds.
     """
 
-    def __init__(self, storage: BaseBufferableStorage, capacity: int):
+    def __init__(
+        self,
+        storage: BaseBufferableStorage,
+        capacity: int,
+        buffer_capacity: int | None = None,
+    ):
         """
         Args:
             storage (BaseBufferableStorage): a storage facility whose status is monitored.
             capacity (int): the limit on the number of objects in the buffer.
+            buffer_capacity (int | None, optional): the limit on the number of
+                objects in an individual buffer. Defaults to None.
         """
         self.storage: BaseBufferableStorage = storage
         self.capacity: int = capacity
-        # TODO: нужно реализовать служебный метод для подсчета количества элементов в сторадже
+        self.buffer_capacity: int | None = buffer_capacity
 
     def is_overflowed(self) -> bool:
         return self.capacity < self.storage.total_objects
 
+    def is_buffer_overflowed(self, buffer: ContentQueue) -> bool:
+        return self.buffer_capacity is not None and (
+            buffer.size > self.buffer_capacity
+        )
+
+    def select_buffers(
+        self, buffers: Iterable[ContentQueue]
+    ) -> list[ContentQueue]:
+        return _largest_first(buffers, lambda buf: buf.size, self.capacity)
+
+
+@dataclass
+class _BufferProfile:
+    """
+    What the adaptive limit has learned about one buffer. Rates and latencies
+    are exponentially weighted moving averages.
+    """
+
+    rate: float = 0
+    latency: float = 0
+    ratio: float = 1
+    threshold: float = 0
+    last_ingest: float = 0
+    flushes: int = 0
+
+
+@limit("adaptive")
+class AdaptiveLimit(BaseLimit):
+    """
+    A limit class that selects the flush threshold of each buffer on its own.
+    The limit learns the rate at which each buffer receives data, the duration
+    of its uploads and the ratio between the size of the data in memory and the
+    size of the written objects. Based on this, the threshold is chosen so that
+    the written objects are close to target_size, but the data does not wait in
+    the buffer (including the time of the upload itself) longer than
+    max_staleness. Every threshold change is published to the log and kept in
+    the decisions attribute. The storage-wide capacity limits the memory
+    occupied by all buffers, as in the memory limit.
+
+    Attributes:
+        storage (BaseBufferableStorage): a storage facility whose status is
+            monitored.
+        capacity (int | float): memory limit of all buffers in megabytes.
+        target_size (Mb): the desired size of a written object in megabytes.
+        max_staleness (float): maximum time in seconds from the arrival of data
+            in the buffer to the end of its upload.
+        min_size (Mb): lower bound of the buffer threshold in megabytes.
+        smoothing (float): weight of a new observation in moving averages, from
+            0 to 1.
+        decisions (deque[dict[str, Any]]): the last threshold changes.
+    """
+
+    def __init__(
+        self,
+        storage: BaseBufferableStorage,
+        capacity: int | float,
+        buffer_capacity: int | float | None = None,
+        *,
+        target_size: int | float = 64,
+        max_staleness: float = 300,
+        min_size: int | float = 1,
+        smoothing: float = 0.3,
+        history: int = 100,
+    ):
+        """
+        Args:
+            storage (BaseBufferableStorage): a storage facility whose status is
+                monitored.
+            capacity (int | float): memory limit of all buffers in megabytes.
+            buffer_capacity (int | float | None, optional): upper bound of the
+                buffer threshold in megabytes. Defaults to None.
+            target_size (int | float, optional): the desired size of a written
+                object in megabytes. Defaults to 64.
+            max_staleness (float, optional): maximum time in seconds from the
+                arrival of data in the buffer to the end of its upload.
+                Defaults to 300.
+            min_size (int | float, optional): lower bound of the buffer
+                threshold in megabytes. Defaults to 1.
+            smoothing (float, optional): weight of a new observation in moving
+                averages. Defaults to 0.3.
+            history (int, optional): number of stored decisions. Defaults to
+                100.
+        """
+        self.storage: BaseBufferableStorage = storage
+        self.capacity: int | float = capacity
+        self.buffer_capacity: int | float | None = buffer_capacity
+        self.target_size: int | float = target_size
+        self.max_staleness: float = max_staleness
+        self.min_size: int | float = min_size
+        self.smoothing: float = smoothing
+        self.decisions: deque[dict[str, Any]] = deque(maxlen=history)
+        self._profiles: dict[int, _BufferProfile] = dict()
+
+    def _profile(self, buffer: ContentQueue) -> _BufferProfile:
+        return self._profiles.setdefault(id(buffer), _BufferProfile())
+
+    def _average(self, old: float, new: float) -> float:
+        return new if not old else old + self.smoothing * (new - old)
+
+    def is_overflowed(self) -> bool:
+        return self.capacity < self.storage.mem_alloc
+
+    def is_buffer_overflowed(self, buffer: ContentQueue) -> bool:
+        profile: _BufferProfile = self._profile(buffer)
+        if buffer.age + profile.latency >= self.max_staleness:
+            return True
+        return bool(profile.threshold) and (
+            buffer.memory_size >= profile.threshold
+        )
+
+    def flush_delay(self, buffer: ContentQueue) -> float | None:
+        profile: _BufferProfile = self._profile(buffer)
+        return max(self.max_staleness - profile.latency - buffer.age, 0)
+
+    def select_buffers(
+        self, buffers: Iterable[ContentQueue]
+    ) -> list[ContentQueue]:
+        return _largest_first(
+            buffers, lambda buf: buf.memory_size, self.capacity
+        )
+
+    def on_ingest(self, buffer: ContentQueue, nbytes: int, count: int) -> None:
+        profile: _BufferProfile = self._profile(buffer)
+        now: float = time()
+        if profile.last_ingest:
+            interval: float = max(now - profile.last_ingest, 1e-3)
+            profile.rate = self._average(profile.rate, nbytes / interval)
+        profile.last_ingest = now
+        self._retune(buffer, profile)
+
+    def on_flush(
+        self, buffer: ContentQueue, nbytes: int, written: int, elapsed: float
+    ) -> None:
+        profile: _BufferProfile = self._profile(buffer)
+        profile.latency = self._average(profile.latency, elapsed)
+        if nbytes and written:
+            profile.ratio = self._average(profile.ratio, written / nbytes)
+        profile.flushes += 1
+        self._retune(buffer, profile)
+
+    def _retune(self, buffer: ContentQueue, profile: _BufferProfile) -> None:
+        """
+        Recalculates the threshold of the buffer in megabytes of memory. The
+        threshold by size is the target size of the written object converted to
+        the size in memory; the threshold by time is the amount of data that
+        the buffer accumulates during the time allowed by max_staleness minus
+        the upload duration.
+        """
+        by_size: float = self.target_size / (profile.ratio or 1)
+        threshold: float = by_size
+        if profile.rate:
+            window: float = max(self.max_staleness - profile.latency, 0)
+            threshold = min(threshold, profile.rate * window / 1024**2)
+        threshold = max(threshold, self.min_size)
+        if self.buffer_capacity is not None:
+            threshold = min(threshold, self.buffer_capacity)
+        previous: float = profile.threshold
+        profile.threshold = threshold
+        if previous and abs(threshold - previous) <= 0.1 * previous:
+            return
+        decision: dict[str, Any] = {
+            "time": datetime.now(),
+            "buffer": buffer.name,
+            "threshold": threshold,
+            "reason": "size" if threshold == by_size else "staleness",
+            **asdict(profile),
+        }
+        self.decisions.append(decision)
+        pprint(
+            f"Порог выгрузки буфера {buffer.name} установлен в "
+            f"{threshold:.2f} MB: {decision}"
+        )
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns what the limit has learned about each buffer of the storage.
+
+        Returns:
+            dict[str, dict[str, Any]]: buffer name - profile pairs (ingest rate
+                in bytes per second, upload duration in seconds, ratio of
+                written size to size in memory, threshold in megabytes, number
+                of uploads).
+        """
+        return {
+            buf.name: asdict(self._profile(buf))
+            for buf in self.storage.mem_buffer.get_buffers()
+        }
+
 
 @limit("unable")
 class UnableBufferize(BaseLimit):
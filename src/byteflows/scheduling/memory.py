@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import os
+import sys
+from asyncio import Event, Task, create_task, sleep
+from collections.abc import Callable
+from datetime import datetime
+from importlib import import_module
+from pathlib import Path
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Literal
+
+from rich.pretty import pprint as rpp
+
+if sys.platform != "win32":
+    import resource
+
+if TYPE_CHECKING:
+    from byteflows.storages import BaseBufferableStorage, ContentQueue
+
+__all__ = ["MemoryMonitor", "cgroup_memory_limit", "process_rss"]
+
+_CGROUP_LIMITS: tuple[Path, ...] = (
+    Path("/sys/fs/cgroup/memory.max"),
+    Path("/sys/fs/cgroup/memory/memory.limit_in_bytes"),
+)
+
+_PressureState = Literal["normal", "soft", "hard"]
+
+
+def process_rss() -> int:
+    """
+    Returns the resident set size of the current process in bytes. On Linux the
+    current value is read from procfs, on other POSIX systems the peak value
+    reported by the resource module is used. On Windows the value is taken from
+    the psutil package if it is installed, otherwise 0 is returned.
+
+    Returns:
+        int: resident set size in bytes.
+    """
+    if sys.platform == "win32":
+        try:
+            psutil = import_module("psutil")
+        except ImportError:
+            return 0
+        return psutil.Process().memory_info().rss
+    try:
+        resident: str = Path("/proc/self/statm").read_text().split()[1]
+        return int(resident) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def cgroup_memory_limit() -> int | None:
+    """
+    Returns the memory limit of the container (cgroup v2 or v1). If the process
+    is not limited by a cgroup, the amount of physical memory is returned.
+
+    Returns:
+        int | None: memory limit in bytes or None if it could not be
+            determined.
+    """
+    for path in _CGROUP_LIMITS:
+        try:
+            value: str = path.read_text().strip()
+        except OSError:
+            continue
+        # cgroup v1 сообщает об отсутствии лимита огромным числом, v2 - строкой
+        # "max"
+        if value != "max" and int(value) < 2**60:
+            return int(value)
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class MemoryMonitor:
+    """
+    A background job that watches the memory of the process and reacts to its
+    growth. The monitor periodically samples the resident set size and compares
+    it with the soft and hard thresholds, which are set as shares of the memory
+    limit (by default, the limit of the container). Above the soft threshold
+    the monitor flushes the largest buffer of each storage, if it occupies at
+    least the minimum flush size, and halves the
+    number of simultaneous requests of data collectors. Above the hard
+    threshold it pauses fetching, flushes all buffers and calls the alert
+    function. The pressure states are left only when memory falls below the
+    resume threshold, which is lower than the soft one, so that the monitor
+    does not switch back and forth around a threshold. If fetching stays
+    paused longer than the maximum pause (for example, because the allocator
+    does not return freed memory to the system), it is resumed with the
+    minimum number of requests. The job is launched in the same way as data
+    collectors.
+
+    Attributes:
+        soft_limit (float): share of the memory limit above which buffers are
+            flushed early.
+        hard_limit (float): share of the memory limit above which fetching is
+            paused.
+        resume_limit (float): share of the memory limit below which the
+            collectors return to normal work.
+        max_pause (float | None): maximum duration of the pause of fetching in
+            seconds. None means the pause is not limited.
+        min_flush_size (int | float): memory in megabytes that a buffer must
+            occupy to be flushed above the soft threshold.
+        memory_limit (int | None): memory limit in bytes.
+        interval (float): sampling interval in seconds.
+        alert (Callable[[dict[str, Any]], Any]): function called with the
+            monitor report when the hard threshold is passed.
+        storages (list[BaseBufferableStorage]): storages whose buffers are
+            flushed under memory pressure.
+        fetch_allowed (Event): event that is set while data collectors are
+            allowed to send requests.
+        state (Literal["normal", "soft", "hard"]): current memory pressure
+            state.
+        rss (int): the last sampled resident set size in bytes.
+    """
+
+    def __init__(
+        self,
+        soft_limit: float = 0.75,
+        hard_limit: float = 0.9,
+        *,
+        resume_limit: float | None = None,
+        max_pause: float | None = 60,
+        min_flush_size: int | float = 1,
+        memory_limit: int | float | None = None,
+        interval: float = 1,
+        alert: Callable[[dict[str, Any]], Any] | None = None,
+    ):
+        """
+        Args:
+            soft_limit (float, optional): share of the memory limit above which
+                buffers are flushed early. Defaults to 0.75.
+            hard_limit (float, optional): share of the memory limit above which
+                fetching is paused. Defaults to 0.9.
+            resume_limit (float | None, optional): share of the memory limit
+                below which the collectors return to normal work. It cannot
+                exceed the soft threshold. If None, it is 0.05 below the soft
+                threshold. Defaults to None.
+            max_pause (float | None, optional): maximum duration of the pause
+                of fetching in seconds. None means the pause is not limited.
+                Defaults to 60.
+            min_flush_size (int | float, optional): memory in megabytes that a
+                buffer must occupy to be flushed above the soft threshold, so
+                that small buffers are not uploaded as tiny objects on every
+                sample. Defaults to 1.
+            memory_limit (int | float | None, optional): memory limit in
+                megabytes. If None, the limit of the container is used.
+                Defaults to None.
+            interval (float, optional): sampling interval in seconds. Defaults
+                to 1.
+            alert (Callable[[dict[str, Any]], Any] | None, optional): function
+                called with the monitor report when the hard threshold is
+                passed. By default, the report is written to the log.
+        """
+        self._name: str = "memory_monitor"
+        self.soft_limit: float = soft_limit
+        self.hard_limit: float = hard_limit
+        self.resume_limit: float = min(
+            soft_limit - 0.05 if resume_limit is None else resume_limit,
+            soft_limit,
+        )
+        self.max_pause: float | None = max_pause
+        self.min_flush_size: int | float = min_flush_size
+        self.memory_limit: int | None = (
+            int(memory_limit * 1024**2)
+            if memory_limit is not None
+            else cgroup_memory_limit()
+        )
+        self.interval: float = interval
+        self.alert: Callable[[dict[str, Any]], Any] = alert or rpp
+        self.storages: list[BaseBufferableStorage] = list()
+        self.fetch_allowed: Event = Event()
+        self.fetch_allowed.set()
+        self.state: _PressureState = "normal"
+        self.rss: int = 0
+        self._paused_at: float | None = None
+        self._flushes: set[Task] = set()
+
+    def watch(self, *storages: BaseBufferableStorage) -> None:
+        """
+        Adds storages whose buffers are flushed under memory pressure.
+        """
+        self.storages.extend(s for s in storages if s not in self.storages)
+
+    @property
+    def usage(self) -> float:
+        """
+        The property returns the share of the memory limit occupied by the
+        process.
+
+        Returns:
+            float: occupied share of the limit or 0 if the limit is unknown.
+        """
+        return self.rss / self.memory_limit if self.memory_limit else 0
+
+    def scale_batch(self, batch_size: int, min_batch: int = 1) -> int:
+        """
+        Returns the number of simultaneous requests allowed under the current
+        memory pressure.
+
+        Args:
+            batch_size (int): the number of requests allowed by the resource.
+            min_batch (int, optional): the number of requests below which the
+                batch is not reduced. Defaults to 1.
+
+        Returns:
+            int: allowed number of requests.
+        """
+        if self.state == "normal":
+            return batch_size
+        if self.state == "soft":
+            return max(batch_size // 2, min_batch)
+        return min_batch
+
+    async def start(self) -> Task:
+        """
+        Entry point for running the monitor. The method samples memory once per
+        interval and returns itself, wrapped in an asyncio task.
+
+        Returns:
+            Task: task created for the start method.
+        """
+        await sleep(self.interval)
+        self.check()
+        coro = self.start()
+        return create_task(coro, name=self._name)
+
+    def check(self) -> _PressureState:
+        """
+        Samples the memory of the process, updates the state and performs the
+        actions corresponding to it.
+
+        Returns:
+            Literal["normal", "soft", "hard"]: new memory pressure state.
+        """
+        self.rss = process_rss()
+        previous: _PressureState = self.state
+        if self.usage >= self.hard_limit:
+            self.state = "hard"
+        elif previous != "normal" and self.usage >= self.resume_limit:
+            self.state = previous
+        elif self.usage >= self.soft_limit:
+            self.state = "soft"
+        else:
+            self.state = "normal"
+        if self.state == "hard":
+            self._pause(first=previous != "hard")
+            self._flush(all_buffers=True)
+        else:
+            self._paused_at = None
+            self.fetch_allowed.set()
+            if self.state == "soft":
+                self._flush(all_buffers=False)
+        if self.state != previous:
+            rpp(
+                f"Состояние памяти изменилось с {previous} на {self.state}: "
+                f"{self.report()}"
+            )
+        return self.state
+
+    def _pause(self, *, first: bool) -> None:
+        """
+        Pauses fetching when the hard threshold is passed and resumes it if
+        the pause has lasted longer than max_pause.
+
+        Args:
+            first (bool): the hard threshold has just been passed.
+        """
+        now: float = monotonic()
+        if first:
+            self._paused_at = now
+            self.fetch_allowed.clear()
+            self.alert(self.report())
+            return
+        if (
+            self.max_pause is not None
+            and self._paused_at is not None
+            and now - self._paused_at >= self.max_pause
+        ):
+            self._paused_at = None
+            self.fetch_allowed.set()
+            rpp(
+                f"Сбор данных приостановлен дольше {self.max_pause} с, "
+                "возобновляю его с минимальным числом запросов: "
+                f"{self.report()}"
+            )
+
+    def _flush(self, *, all_buffers: bool) -> None:
+        """
+        Starts uploading buffers to the backend. Buffers that are already being
+        uploaded are skipped. The upload tasks are kept until they are done.
+
+        Args:
+            all_buffers (bool): if True, all non-empty buffers are uploaded,
+                otherwise only the largest buffer of each storage, if it
+                occupies at least min_flush_size.
+        """
+        for storage in self.storages:
+            buffers: list[ContentQueue] = sorted(
+                (
+                    buf
+                    for buf in storage.mem_buffer.get_buffers()
+                    if buf.size and not buf.flushing
+                ),
+                key=lambda buf: buf.memory_size,
+                reverse=True,
+            )
+            if not all_buffers:
+                buffers = [
+                    buf
+                    for buf in buffers[:1]
+                    if buf.memory_size >= self.min_flush_size
+                ]
+            for buf in buffers:
+                task: Task = buf.schedule_flush()
+                self._flushes.add(task)
+                task.add_done_callback(self._on_flush_done)
+
+    def _on_flush_done(self, task: Task) -> None:
+        """
+        Releases a finished upload task and reports its error, if any.
+        """
+        self._flushes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            rpp(
+                "Не удалось выгрузить буфер при нехватке памяти: "
+                f"{task.exception()!r}"
+            )
+
+    def report(self) -> dict[str, Any]:
+        """
+        Returns the current state of the monitor.
+
+        Returns:
+            dict[str, Any]: time of the sample, state, resident set size and
+                limit in megabytes, occupied share of the limit and the memory
+                occupied by buffers of the storages in megabytes.
+        """
+        return {
+            "time": datetime.now(),
+            "state": self.state,
+            "rss": self.rss / 1024**2,
+            "limit": (self.memory_limit or 0) / 1024**2,
+            "usage": self.usage,
+            "buffers": sum(s.mem_alloc for s in self.storages),
+        }
@@ -1,2 +1,4 @@
 from .base import *
 from .blob import *
+from .compaction import *
+from .manifest import *
@@ -1,7 +1,16 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from asyncio import Lock, create_task
+from asyncio import (
+    Lock,
+    Queue,
+    Task,
+    TimerHandle,
+    create_task,
+    gather,
+    get_running_loop,
+    to_thread,
+)
 from collections.abc import (
     AsyncGenerator,
     Awaitable,
@@ -9,32 +18,41 @@ from collections.abc import (
     Generator,
     Iterable,
 )
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime
+from functools import partial
 from itertools import chain
 from threading import Lock as ThreadLock
+from time import monotonic, time
 from typing import TYPE_CHECKING, Any, Literal, Protocol, Self
 from weakref import WeakValueDictionary
 
 from rich.pretty import pprint as rpp
 
-from byteflows.contentio import serialize
+from byteflows.contentio import (
+    CHANGE_HOOKS_MAP,
+    CompressedPayload,
+    compress_object,
+    dedup_records,
+    type_key,
+)
 from byteflows.core import ByteflowCore, SfnUndefined, Undefined
 from byteflows.scheduling import UnableBufferize, setup_limit
-from byteflows.utils import scale_bytes
+from byteflows.utils import count_rows, estimate_size, scale_bytes
 
 __all__ = [
     "AnyDataobj",
     "BaseBufferableStorage",
     "BufferDispatcher",
     "ContentQueue",
+    "EnginePool",
     "Mb",
     "engine_factory",
     "supported_engine_factories",
 ]
 
 if TYPE_CHECKING:
-    from byteflows.contentio import IOContext
+    from byteflows.contentio import IOContext, PendingChanges
     from byteflows.resources.base import BaseResourceRequest
     from byteflows.scheduling import BaseLimit
 
@@ -47,12 +65,25 @@ _ENGINE_FACTORIES: dict[tuple[type, ...], Callable[..., _SupportAsync]] = (
 )
 
 Mb = int | float
+_ChannelKey = tuple["BaseResourceRequest", "IOContext"]
+# задержка повторной проверки буфера, который выгружается в момент проверки
+_FLUSH_RETRY_DELAY: float = 1
 AnyDataobj = Any
 """
 Alias for Any. Indicates that the object accepts any valid data object.
 """
 
 
+def _decoded(dataobj: AnyDataobj) -> AnyDataobj:
+    """
+    Returns the data object, decoding it if the buffer stores it in compressed
+    form.
+    """
+    if isinstance(dataobj, CompressedPayload):
+        return dataobj.decode()
+    return dataobj
+
+
 def engine_factory(*_cls: type):
     """
     The function registers factories for backend engines. The backend can be file storage,
@@ -93,12 +124,160 @@ def supported_engine_factories():
     return _ENGINE_FACTORIES
 
 
+class EnginePool:
+    """
+    A pool of backend engine instances. A single engine (for example, one s3fs
+    client) has a bounded connection pool, so flushes of several busy buffers
+    through it are serialized. The pool allows each flush to check out its own
+    engine. An engine whose operation failed with a connection error is
+    considered unhealthy and is replaced with a new one. The pool also measures
+    its utilization.
+
+    Attributes:
+        engines (list[Any]): engine instances of the pool.
+        checkouts (int): total number of checkouts.
+        peak_in_use (int): maximum number of engines checked out at the same
+            time.
+        total_wait (float): total time in seconds spent waiting for a free
+            engine.
+        replaced (int): number of engines replaced after failures.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int,
+        *,
+        engines: Iterable[Any] = (),
+        prepare: Callable[[Any], Awaitable[None]] | None = None,
+        unhealthy: tuple[type[BaseException], ...] = (
+            ConnectionError,
+            TimeoutError,
+        ),
+    ):
+        """
+        Args:
+            factory (Callable[[], Any]): function that creates a new engine
+                instance.
+            size (int): number of engines in the pool.
+            engines (Iterable[Any], optional): already created engines included
+                in the pool. Defaults to ().
+            prepare (Callable[[Any], Awaitable[None]] | None, optional):
+                coroutine function that prepares a new engine for work (for
+                example, opens a session). Defaults to None.
+            unhealthy (tuple[type[BaseException], ...], optional): errors after
+                which the engine is replaced. Defaults to (ConnectionError,
+                TimeoutError).
+        """
+        self.factory: Callable[[], Any] = factory
+        self.prepare: Callable[[Any], Awaitable[None]] | None = prepare
+        self.unhealthy: tuple[type[BaseException], ...] = unhealthy
+        self.engines: list[Any] = list(engines)[:size]
+        while len(self.engines) < size:
+            self.engines.append(factory())
+        self.checkouts: int = 0
+        self.peak_in_use: int = 0
+        self.total_wait: float = 0
+        self.replaced: int = 0
+        self._busy_time: float = 0
+        self._created: float = monotonic()
+        self._idle: Queue[Any] = Queue()
+        for engine in self.engines:
+            self._idle.put_nowait(engine)
+
+    @property
+    def size(self) -> int:
+        return len(self.engines)
+
+    @property
+    def in_use(self) -> int:
+        return self.size - self._idle.qsize()
+
+    async def prepare_all(self) -> None:
+        """
+        Prepares all engines of the pool for work.
+        """
+        if self.prepare is not None:
+            for engine in self.engines:
+                await self.prepare(engine)
+
+    @asynccontextmanager
+    async def checkout(self) -> AsyncGenerator[Any, None]:
+        """
+        Checks out a free engine for the duration of the block. If all engines
+        are busy, waits for one of them to be released.
+
+        Yields:
+            Any: engine instance.
+        """
+        start: float = monotonic()
+        engine: Any = await self._idle.get()
+        acquired: float = monotonic()
+        self.total_wait += acquired - start
+        self.checkouts += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        try:
+            yield engine
+        except self.unhealthy:
+            engine = await self._replace(engine)
+            raise
+        finally:
+            self._busy_time += monotonic() - acquired
+            self._idle.put_nowait(engine)
+
+    async def _replace(self, engine: Any) -> Any:
+        """
+        Replaces an unhealthy engine with a new one.
+
+        Args:
+            engine (Any): unhealthy engine.
+
+        Returns:
+            Any: new engine.
+        """
+        new_engine: Any = self.factory()
+        if self.prepare is not None:
+            await self.prepare(new_engine)
+        self.engines[self.engines.index(engine)] = new_engine
+        self.replaced += 1
+        rpp(f"Движок {engine} заменен после сбоя.")
+        return new_engine
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Returns pool usage statistics. Utilization is the share of time during
+        which the engines of the pool were checked out, relative to the
+        lifetime of the pool.
+
+        Returns:
+            dict[str, int | float]: pool usage statistics.
+        """
+        lifetime: float = (monotonic() - self._created) * self.size
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "checkouts": self.checkouts,
+            "total_wait": self.total_wait,
+            "avg_wait": self.total_wait / self.checkouts
+            if self.checkouts
+            else 0,
+            "replaced": self.replaced,
+            "utilization": self._busy_time / lifetime if lifetime else 0,
+        }
+
+
 class ContentQueue:
     """
     This class buffers content in memory, namely by placing it in a dictionary.
     Its main purpose is to avoid repeated I/O, which can significantly affect performance.
     The class also provides additional information about the stored content
-    (size of memory allocated by objects, their number).
+    (size of memory allocated by objects, their number, the age of the oldest
+    object). The size of each object is estimated once when it is placed in the
+    queue. If compression is enabled for the storage (buffer_compression),
+    objects are serialized into the output format and compressed in worker
+    threads before being placed in the queue, and are decoded only when
+    requested.
     The class also allows you to check whether a data object is in a queue
     and to loop through the path-data object pairs stored in the queue.
     In-memory buffers are used by data collectors to temporarily store downloaded content.
@@ -107,16 +286,57 @@ class ContentQueue:
         storage (BaseBufferableStorage): backend for which the queue is created.
         in_format (str): input data format.
         out_format (str): data upload format.
+        name (str): name of the request to which the buffer is bound. Defaults
+            to "".
+        io_context (IOContext | None): I/O context of the request. Defines the
+            key columns by which records are deduplicated before upload.
+            Defaults to None.
+
+    Raises:
+        ValueError: thrown if compression is enabled for the storage and key
+            columns are specified in the I/O context.
     """
 
     def __init__(
-        self, storage: BaseBufferableStorage, in_format: str, out_format: str
+        self,
+        storage: BaseBufferableStorage,
+        in_format: str,
+        out_format: str,
+        name: str = "",
+        io_context: IOContext | None = None,
     ):
         self.queue: dict[str, AnyDataobj] = dict()
+        self.timestamps: dict[str, float] = dict()
+        self.sizes: dict[str, int] = dict()
+        self._total_bytes: int = 0
         self.storage: BaseBufferableStorage = storage
         self.in_format: str = in_format
         self.out_format: str = out_format
+        self.name: str = name
+        self.io_context: IOContext | None = io_context
+        self.change_paths: set[str] = set()
+        self.pending_changes: list[PendingChanges] = []
+        self.pending_digests: list[str] = []
+        self._flush_timer: TimerHandle | None = None
+        self._flushing: bool = False
         self.internal_lock = Lock()
+        self._check_compression()
+
+    def _check_compression(self) -> None:
+        """
+        Checks that compression is not combined with key columns: compressed
+        objects are already serialized, so their records can be neither
+        deduplicated nor compared with the change data capture index.
+        """
+        if self.storage.buffer_compression is None:
+            return
+        if self.io_context is not None and self.io_context.key_columns:
+            msg = (
+                f"Сжатие буфера {self.name} несовместимо с ключевыми "
+                "столбцами контекста ввода-вывода: дедупликация записей и "
+                "отслеживание изменений не работают со сжатыми объектами."
+            )
+            raise ValueError(msg)
 
     @asynccontextmanager
     async def block_state(self) -> AsyncGenerator[Self, Any]:
@@ -142,15 +362,92 @@ class ContentQueue:
         Args:
             content (Iterable): a container with a path string where the content should be stored in the future, and data.
         """
+        received: int = 0
+        count: int = 0
+        if (codec := self.storage.buffer_compression) is not None:
+            self._check_compression()
+            content = list(content)
+            payloads: list[CompressedPayload] = await gather(
+                *[
+                    to_thread(compress_object, dataobj, self.out_format, codec)
+                    for _, dataobj in content
+                ]
+            )
+            content = [
+                (path, payload)
+                for (path, _), payload in zip(content, payloads)
+            ]
         for path, dataobj in content:
+            self._total_bytes -= self.sizes.get(path, 0)
             self.queue[path] = dataobj
+            self.timestamps[path] = time()
+            self.sizes[path] = estimate_size(dataobj)
+            self._total_bytes += self.sizes[path]
+            self.storage.mem_buffer.index(path, self)
+            received += self.sizes[path]
+            count += 1
+        self.storage.limit.on_ingest(self, received, count)
+        self._arm_flush_timer()
         rpp(f"Количество объектов в буфере {len(self.queue)}")
         await self.storage._recalc_counters()
         async with self.storage._timemark_lock:
             self.storage.last_commit = datetime.now()
             rpp(f"Последний коммит совершен в {self.storage.last_commit}")
-        if self.storage.check_limit():
-            create_task(self.storage.merge_to_backend(self))
+        for buf in self.storage.buffers_to_flush(self):
+            buf.schedule_flush()
+
+    def _arm_flush_timer(self) -> None:
+        """
+        Schedules a check of the buffer for the time after which the limit
+        requires it to be flushed even without new content (see
+        BaseLimit.flush_delay), so that, for example, stale data is uploaded
+        when the request stops receiving data. The check is scheduled once per
+        filling of the buffer, when it receives its first objects.
+        """
+        if self._flush_timer is not None or not self.size:
+            return
+        delay: float | None = self.storage.limit.flush_delay(self)
+        if delay is not None:
+            self._flush_timer = get_running_loop().call_later(
+                delay, self._on_flush_timer
+            )
+
+    def _on_flush_timer(self) -> None:
+        """
+        Starts uploading the buffer if its deadline has come, otherwise
+        schedules the check again. A buffer that is already being uploaded is
+        checked again shortly: the check is cancelled if the upload clears the
+        buffer, and kept if the upload fails.
+        """
+        self._flush_timer = None
+        if not self.size:
+            return
+        if self.flushing:
+            self._flush_timer = get_running_loop().call_later(
+                _FLUSH_RETRY_DELAY, self._on_flush_timer
+            )
+            return
+        delay: float | None = self.storage.limit.flush_delay(self)
+        if delay is None:
+            return
+        if delay > 0:
+            self._arm_flush_timer()
+            return
+        rpp(f"Срок хранения данных в буфере {self.name} истек.")
+        self.schedule_flush()
+
+    def schedule_flush(self) -> Task[None]:
+        """
+        Starts uploading the buffer to the backend in a separate task. The
+        buffer is marked as being uploaded right away, so that the writes
+        made before the task acquires the state of the buffer do not
+        schedule it again.
+
+        Returns:
+            Task: the task that uploads the buffer.
+        """
+        self._flushing = True
+        return create_task(self.storage.merge_to_backend(self))
 
     def get_content(self, path: str) -> AnyDataobj | None:
         """
@@ -162,18 +459,131 @@ class ContentQueue:
         Returns:
             AnyDataobj (optional): any data object that is captured in a buffer. If the object is not stored
                                 in the given path (for example, the queue was cleared after uploading to the
-                                backend), then None is returned.
+                backend), then None is returned. Compressed objects are
+                decoded.
+        """
+        dataobj: AnyDataobj | None = self.queue.get(path, None)
+        return None if dataobj is None else _decoded(dataobj)
+
+    def deduplicate_records(self) -> int:
+        """
+        The method removes records with repeated keys across all objects of the
+        buffer, if key columns are specified in the I/O context. Objects are
+        processed in groups by type using the functions registered via
+        reg_record_dedup; objects of other types and compressed objects are
+        left unchanged. Objects left without records are removed from the
+        buffer. The method is blocking, it is intended to be called in a worker
+        thread while the state of the buffer is locked.
+
+        Returns:
+            int: number of removed records.
+        """
+        ctx: IOContext | None = self.io_context
+        if ctx is None or not ctx.key_columns:
+            return 0
+        groups: dict[str, list[str]] = dict()
+        for path, dataobj in self.queue.items():
+            if not isinstance(dataobj, CompressedPayload):
+                groups.setdefault(type_key(dataobj), []).append(path)
+        removed: int = 0
+        for paths in groups.values():
+            dataobjs: list[AnyDataobj] = [self.queue[path] for path in paths]
+            result: list[AnyDataobj] | None = dedup_records(
+                dataobjs, ctx.key_columns, ctx.keep
+            )
+            if result is None:
+                continue
+            for path, old, new in zip(paths, dataobjs, result):
+                removed += (count_rows(old) or 0) - (count_rows(new) or 0)
+                self._total_bytes -= self.sizes[path]
+                if count_rows(new) == 0:
+                    del (
+                        self.queue[path],
+                        self.timestamps[path],
+                        self.sizes[path],
+                    )
+                    self.storage.mem_buffer.unindex([path], self)
+                    continue
+                self.queue[path] = new
+                self.sizes[path] = estimate_size(new)
+                self._total_bytes += self.sizes[path]
+        if removed:
+            rpp(
+                f"Из буфера {self.name} удалено повторяющихся записей: "
+                f"{removed}."
+            )
+        return removed
+
+    def capture_changes(self) -> None:
+        """
+        The method replaces each object of the buffer with its changes since
+        the previous run of the request, if a change data capture index is
+        attached to the I/O context (see ChangeCapture). Objects that are
+        already change sets and objects of types without registered functions
+        are left unchanged. Objects without changes are removed from the
+        buffer. The index entries of the changes are kept in the buffer until
+        they are committed after the upload (see commit_pending). The method is
+        blocking, it is intended to be called in a worker thread while the
+        state of the buffer is locked.
+        """
+        ctx: IOContext | None = self.io_context
+        if ctx is None or ctx.cdc is SfnUndefined or not ctx.key_columns:
+            return
+        for path in [p for p in self.queue if p not in self.change_paths]:
+            dataobj: AnyDataobj = self.queue[path]
+            if type_key(dataobj) not in CHANGE_HOOKS_MAP:
+                continue
+            changes, pending = ctx.cdc.diff(
+                self.name, dataobj, ctx.key_columns
+            )
+            self.pending_changes.append(pending)
+            self._total_bytes -= self.sizes[path]
+            if count_rows(changes) == 0:
+                del self.queue[path], self.timestamps[path], self.sizes[path]
+                self.storage.mem_buffer.unindex([path], self)
+                continue
+            self.queue[path] = changes
+            self.sizes[path] = estimate_size(changes)
+            self._total_bytes += self.sizes[path]
+            self.change_paths.add(path)
+
+    def commit_pending(self) -> None:
+        """
+        The method writes the index entries of the changes uploaded from the
+        buffer to the change data capture index and the hashes of the payloads
+        whose data has been placed in the buffer to the content deduplicator.
+        It is called after a successful upload; if the upload fails, both are
+        kept and committed with the next successful one. The method is
+        blocking, it is intended to be called in a worker thread while the
+        state of the buffer is locked.
+        """
+        ctx: IOContext | None = self.io_context
+        if ctx is None:
+            return
+        if self.pending_changes and ctx.cdc is not SfnUndefined:
+            ctx.cdc.commit(self.pending_changes)
+            self.pending_changes = []
+        if self.pending_digests and ctx.dedup is not SfnUndefined:
+            ctx.dedup.commit(self.name, self.pending_digests)
+            self.pending_digests = []
+
+    @property
+    def has_pending(self) -> bool:
         """
-        return self.queue.get(path, None)
+        The property indicates that the buffer keeps change index entries or
+        payload hashes that have not been committed yet.
+        """
+        return bool(self.pending_changes or self.pending_digests)
 
     def get_all_content(self) -> chain[AnyDataobj]:
         """
         The method wraps the content queue in a generator that produces values in the order in which the content was committed to the queue.
+        Compressed objects are decoded as the generator is consumed.
 
         Returns:
             chain[AnyDataobj]: all data objects (without paths) currently present in the buffer, wrapped in a generator.
         """
-        return chain(self.queue.values())
+        return chain(map(_decoded, self.queue.values()))
 
     @property
     def size(self) -> int:
@@ -189,22 +599,69 @@ class ContentQueue:
     def memory_size(self) -> int | float:
         """
         The property returns the amount of allocated memory in megabytes.
+        The value is the sum of the sizes estimated when the objects were
+        placed in the queue.
 
         Returns:
             int | float: memory occupied by data in megabytes.
         """
-        bytes_mem: int = sum(
-            len(serialize(data, self.out_format))
-            for data in self.get_all_content()
-        )
-        return scale_bytes(bytes_mem, "mb")
+        return scale_bytes(self._total_bytes, "mb")
+
+    @property
+    def age(self) -> float:
+        """
+        The property returns the time in seconds that the oldest object has
+        spent in the queue.
+
+        Returns:
+            float: age of the oldest object in seconds, or 0 if the queue is
+                empty.
+        """
+        if not self.timestamps:
+            return 0
+        return time() - min(self.timestamps.values())
+
+    @property
+    def flushing(self) -> bool:
+        """
+        The property indicates that the buffer is currently being uploaded to
+        the backend.
+
+        Returns:
+            bool: returns True while the storage uploads the buffer (see
+                uploading). Writes that hold the state of the buffer do not
+                count as an upload.
+        """
+        return self._flushing
+
+    @contextmanager
+    def uploading(self) -> Generator[Self, Any, None]:
+        """
+        Marks the buffer as being uploaded to the backend for the duration of
+        the block. Storages wrap merge_to_backend in it, so that the limits,
+        the flush timer and the memory monitor do not schedule the buffer
+        again while it waits for its state or is being uploaded.
+        """
+        self._flushing = True
+        try:
+            yield self
+        finally:
+            self._flushing = False
 
     def reset(self) -> None:
         """
         The method clears the queue of all objects. As a rule,
         it is used at the end of the process of uploading data to the backend.
         """
+        self.storage.mem_buffer.unindex(self.queue, self)
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
         self.queue.clear()
+        self.timestamps.clear()
+        self.sizes.clear()
+        self.change_paths.clear()
+        self._total_bytes = 0
 
     def __contains__(self, item: AnyDataobj) -> bool:
         return item in self.queue
@@ -224,43 +681,100 @@ class BufferDispatcher:
         """
         This class accumulates information about the in-memory buffers used by the backend, and also provides a method for creating such buffers.
         """
-        self.queue_sequence: dict[BaseResourceRequest, ContentQueue] = dict()
+        self.queue_sequence: dict[_ChannelKey, ContentQueue] = dict()
+        self._paths: dict[str, ContentQueue] = dict()
         self._lock: ThreadLock = ThreadLock()
-        self._cache: WeakValueDictionary[BaseResourceRequest, ContentQueue] = (
+        self._cache: WeakValueDictionary[_ChannelKey, ContentQueue] = (
             WeakValueDictionary()
         )
 
     def make_channel(
-        self, storage: BaseBufferableStorage, id: BaseResourceRequest
+        self,
+        storage: BaseBufferableStorage,
+        id: BaseResourceRequest,
+        io_context: IOContext | None = None,
     ) -> ContentQueue:
         """
-        The method creates a buffer in memory and binds it to the specified request.
+        The method creates a buffer in memory and binds it to the specified
+        request and its I/O context. A request with several I/O contexts gets a
+        separate buffer for each of them.
 
         Args:
             storage (BaseBufferableStorage): an instance of the backend class to which the buffer is bound.
             id (BaseResourceRequest): an instance of the resource request class. Used to identify the format of input and output data
                                     and assigning a buffer to a specific request.
+            io_context (IOContext | None, optional): one of the I/O contexts of
+                the request. Defaults to the primary context of the request.
 
         Returns:
             ContentQueue: in-memory buffer instance.
         """
-        if id not in self._cache:
-            io_ctx: IOContext = id.io_context
-            queue = ContentQueue(storage, io_ctx.in_format, io_ctx.out_format)
+        io_ctx: IOContext = io_context or id.io_context
+        key: _ChannelKey = (id, io_ctx)
+        if key not in self._cache:
+            queue = ContentQueue(
+                storage,
+                io_ctx.in_format,
+                io_ctx.out_format,
+                id.branch_name(io_ctx),
+                io_ctx,
+            )
             with self._lock:
-                self._cache[id] = queue
-                self.queue_sequence[id] = queue
+                self._cache[key] = queue
+                self.queue_sequence[key] = queue
         else:
-            queue: ContentQueue = self._cache[id]
+            queue: ContentQueue = self._cache[key]
         print(
             f"Созданные в памяти буферы: {self.queue_sequence.keys(), self.queue_sequence.values()}"
         )
         return queue
 
+    def index(self, path: str, buffer: ContentQueue) -> None:
+        """
+        The method records that the object at the given path is stored in the
+        buffer. Buffers call it when content is placed in them.
+
+        Args:
+            path (str): the path string where the content is stored.
+            buffer (ContentQueue): the buffer in which the content is stored.
+        """
+        self._paths[path] = buffer
+
+    def unindex(self, paths: Iterable[str], buffer: ContentQueue) -> None:
+        """
+        The method removes the paths of the buffer from the index. Buffers call
+        it when they are cleared. Paths that have since been placed in another
+        buffer remain in the index.
+
+        Args:
+            paths (Iterable[str]): paths of the objects removed from the
+                buffer.
+            buffer (ContentQueue): the buffer from which the objects are
+                removed.
+        """
+        for path in paths:
+            if self._paths.get(path) is buffer:
+                del self._paths[path]
+
+    def locate(self, path: str) -> ContentQueue | None:
+        """
+        Returns the buffer in which the object at the given path is stored.
+
+        Args:
+            path (str): the path string where the content is stored.
+
+        Returns:
+            ContentQueue | None: the buffer or None if no buffer stores the
+                object.
+        """
+        return self._paths.get(path)
+
     def get_content(self, path: str) -> AnyDataobj | None:
         """
         Returns the content that is stored at the given path.
-        The search is carried out among all buffers registered in the dispatcher.
+        The buffer storing the path is found by the index kept by the
+        dispatcher, so the search does not depend on the number of registered
+        buffers.
 
         Args:
             path (str): the path string where the content is stored.
@@ -270,10 +784,8 @@ class BufferDispatcher:
                                 in the given path (for example, the queue was cleared after uploading to the
                                 backend), then None is returned.
         """
-        for dataobj in filter(
-            lambda x: x.get_content(path), self.queue_sequence.values()
-        ):
-            return dataobj
+        buffer: ContentQueue | None = self._paths.get(path)
+        return None if buffer is None else buffer.get_content(path)
 
     def get_buffers(self) -> list[ContentQueue]:
         """
@@ -285,14 +797,13 @@ class BufferDispatcher:
         return list(self.queue_sequence.values())
 
     # TODO: переименовать метод, сделать возврат кортежа кортежей
-    def get_items(
-        self,
-    ) -> tuple[tuple[BaseResourceRequest, ContentQueue], ...]:
+    def get_items(self) -> tuple[tuple[_ChannelKey, ContentQueue], ...]:
         """
         The method returns a dictionary view of the current set of registered buffers.
 
         Returns:
-            dict_items[BaseResourceRequest, ContentQueue]: I view in the form of “request - buffer” pairs.
+            tuple[tuple[_ChannelKey, ContentQueue], ...]: I view in the form of
+                “(request, I/O context) - buffer” pairs.
         """
         return tuple(self.queue_sequence.items())
 
@@ -318,15 +829,23 @@ class BaseBufferableStorage(ByteflowCore):
         *,
         handshake_timeout: int = 10,
         bufferize: bool = False,
-        limit_type: Literal["none", "memory", "count", "time"] = "none",
+        limit_type: Literal[
+            "none", "memory", "count", "time", "adaptive"
+        ] = "none",
         limit_capacity: int | float = 10,
+        buffer_capacity: int | float | None = None,
+        limit_params: dict | None = None,
     ):
         self.engine: Any = engine
         self.connect_timeout: int = handshake_timeout
         self.last_commit: datetime = datetime.now()
         if bufferize and limit_type != "none":
             self.limit: BaseLimit = setup_limit(
-                limit_type, limit_capacity, self
+                limit_type,
+                limit_capacity,
+                self,
+                buffer_capacity=buffer_capacity,
+                **(limit_params or {}),
             )
         else:
             self.limit: BaseLimit = UnableBufferize()
@@ -336,6 +855,8 @@ class BaseBufferableStorage(ByteflowCore):
         self._queue_lock: Lock = Lock()
         self._timemark_lock: Lock = Lock()
         self.active_session: bool = False
+        self.engine_pool: EnginePool | None = None
+        self.buffer_compression: str | None = None
 
     @abstractmethod
     async def launch_session(self) -> None:
@@ -345,6 +866,24 @@ class BaseBufferableStorage(ByteflowCore):
 
         """
 
+    async def close_session(self) -> None:
+        """
+        The method closes the session with the destination store. It is called
+        when the application shuts down, after all buffers have been uploaded.
+        Implementation details depend on the type of backend used.
+        """
+        self.active_session = False
+
+    def _release_engines(self) -> None:
+        """
+        The method forgets the engine and the engine pool of the previous
+        configuration when the storage is reconfigured. The new engines are
+        prepared by the next call of launch_session. Implementations that keep
+        sessions of the engines close them here.
+        """
+        self.engine_pool = None
+        self.active_session = False
+
     @property
     @abstractmethod
     def registred_types(self) -> Iterable[str]:
@@ -371,12 +910,23 @@ class BaseBufferableStorage(ByteflowCore):
         engine_params: dict | None = None,
         handshake_timeout: int | None = None,
         bufferize: bool | None = None,
-        limit_type: Literal["none", "memory", "count", "time"] | None = None,
+        limit_type: Literal["none", "memory", "count", "time", "adaptive"]
+        | None = None,
         limit_capacity: int | float | None = None,
+        buffer_capacity: int | float | None = None,
+        limit_params: dict | None = None,
+        engine_pool_size: int | None = None,
+        buffer_compression: str | None = None,
     ) -> Self:
         """
         The method allows you to reconfigure all or individual backend parameters after creating an instance of the class.
         Accepts the same parameters as the class itself upon initialization.
+        Additionally, engine_pool_size sets the number of engine instances used
+        for parallel I/O (see EnginePool); the engines and the pool of the
+        previous configuration are released, and the new ones are prepared by
+        the next launch_session. buffer_compression sets the
+        codec with which buffered objects are compressed in memory (see
+        available_codecs).
         """
         new_params = {
             key: value
@@ -384,9 +934,32 @@ class BaseBufferableStorage(ByteflowCore):
             if key != "self" and value is not None
         }
         engine_maker = _get_engine_factory(self.__class__)
+        self._release_engines()
         self.engine = engine_maker(engine_proto, engine_kwargs=engine_params)
+        if engine_pool_size and engine_pool_size > 1:
+            self.engine_pool = EnginePool(
+                partial(
+                    engine_maker,
+                    engine_proto,
+                    engine_kwargs=self._pooled_engine_params(engine_params),
+                ),
+                engine_pool_size,
+                engines=[self.engine],
+                prepare=self._prepare_engine,
+            )
+        new_params.pop("engine_pool_size", None)
+        new_params.pop("buffer_capacity", None)
+        new_params.pop("limit_params", None)
         if bufferize and (limit_type and limit_type != "none"):
-            self.limit = setup_limit(limit_type, limit_capacity, self)
+            self.limit = setup_limit(
+                limit_type,
+                limit_capacity,
+                self,
+                buffer_capacity=buffer_capacity,
+                **(limit_params or {}),
+            )
+        elif buffer_capacity is not None:
+            self.limit.buffer_capacity = buffer_capacity
         default_params = vars(self)
         default_params.update(new_params)
         for param, value in filter(
@@ -395,6 +968,44 @@ class BaseBufferableStorage(ByteflowCore):
             setattr(self, param, value)
         return self
 
+    def _pooled_engine_params(self, engine_params: dict | None) -> dict:
+        """
+        Returns the parameters with which the engines of the pool are created.
+        Implementations can override the method if the engine factory reuses
+        instances with the same parameters.
+
+        Args:
+            engine_params (dict | None): engine parameters passed to configure.
+
+        Returns:
+            dict: engine parameters for the pool.
+        """
+        return dict(engine_params or {})
+
+    async def _prepare_engine(self, engine: Any) -> None:
+        """
+        Prepares a new engine of the pool for work. By default, does nothing.
+
+        Args:
+            engine (Any): engine instance.
+        """
+
+    @asynccontextmanager
+    async def checkout_engine(self) -> AsyncGenerator[Any, None]:
+        """
+        Provides an engine for the duration of the block. If a pool of engines
+        is configured, a free engine is checked out from it, otherwise the only
+        engine of the storage is used.
+
+        Yields:
+            Any: engine instance.
+        """
+        if self.engine_pool is None:
+            yield self.engine
+        else:
+            async with self.engine_pool.checkout() as engine:
+                yield engine
+
     async def _recalc_counters(self) -> None:
         """
         A utility method that is used to update information about the amount of
@@ -421,8 +1032,7 @@ class BaseBufferableStorage(ByteflowCore):
                                 in the given path (for example, the queue was cleared after uploading to the
                                 backend), then None is returned.
         """
-        async with self._queue_lock:
-            return self.mem_buffer.get_content(path)
+        return self.mem_buffer.get_content(path)
 
     async def get_all_content(self) -> list[AnyDataobj]:
         """
@@ -440,17 +1050,22 @@ class BaseBufferableStorage(ByteflowCore):
                 )
             )
 
-    def create_buffer(self, anchor: BaseResourceRequest) -> ContentQueue:
+    def create_buffer(
+        self, anchor: BaseResourceRequest, io_context: IOContext | None = None
+    ) -> ContentQueue:
         """
         The method registers a new in-memory buffer in the manager.
 
         Args:
             anchor (BaseResourceRequest): the object with which the buffer will be associated.
+            io_context (IOContext | None, optional): the I/O context of the
+                request served by the buffer. Defaults to the primary context
+                of the request.
 
         Returns:
             ContentQueue: an instance of the in-memory buffer class.
         """
-        return self.mem_buffer.make_channel(self, anchor)
+        return self.mem_buffer.make_channel(self, anchor, io_context)
 
     async def write(self, queue_id: Any, content: Iterable) -> None:
         """
@@ -462,16 +1077,51 @@ class BaseBufferableStorage(ByteflowCore):
         buffer: ContentQueue = self.create_buffer(queue_id)
         await buffer.parse_content(content)
 
-    def check_limit(self) -> bool:
+    def check_limit(self, buffer: ContentQueue | None = None) -> bool:
         """
         The method checks compliance with the limits set for data storage.
         More detailed information about limits can be found in the limits.py file.
 
+        Args:
+            buffer (ContentQueue | None, optional): if specified, the limit of
+                this buffer is also checked. Defaults to None.
+
         Returns:
             bool: returns True if data storage limits have reached or exceeded the control parameter limit.
         """
+        if buffer is not None and self.limit.is_buffer_overflowed(buffer):
+            return True
         return self.limit.is_overflowed()
 
+    def buffers_to_flush(self, buffer: ContentQueue) -> list[ContentQueue]:
+        """
+        The method selects the buffers to upload to the backend after new
+        content has been placed in the buffer. The buffer is selected if its
+        own limit has been passed. If the storage-wide limit has been passed,
+        the buffers selected by the limit are added (for size limits - the
+        largest buffers until the total falls within the limit). Buffers that
+        are already being uploaded are skipped.
+
+        Args:
+            buffer (ContentQueue): the buffer that received new content.
+
+        Returns:
+            list[ContentQueue]: buffers to flush.
+        """
+        selected: list[ContentQueue] = []
+        if self.limit.is_buffer_overflowed(buffer):
+            selected.append(buffer)
+        if self.limit.is_overflowed():
+            buffers: list[ContentQueue] = self.mem_buffer.get_buffers()
+            if buffer not in buffers:
+                buffers.append(buffer)
+            selected.extend(
+                buf
+                for buf in self.limit.select_buffers(buffers)
+                if buf not in selected
+            )
+        return [buf for buf in selected if not buf.flushing]
+
 
 if __name__ == "__main__":
     ...
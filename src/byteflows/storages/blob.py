@@ -1,19 +1,58 @@
 from __future__ import annotations
 
-from asyncio import wait_for
-from collections.abc import Callable, Iterable
+import errno
+import posixpath
+from asyncio import (
+    Semaphore,
+    Task,
+    create_task,
+    gather,
+    get_running_loop,
+    sleep,
+    to_thread,
+    wait_for,
+)
+from collections import defaultdict, deque
+from collections.abc import (
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Sequence,
+)
+from concurrent.futures import Executor
 from copy import copy
+from datetime import datetime
+from hashlib import blake2b
+from inspect import isawaitable
+from itertools import chain, zip_longest
+from mmap import ACCESS_READ, mmap
 from pathlib import Path
-from typing import Any, Literal, ParamSpec, TypeVar, cast
+from random import uniform
+from time import monotonic, time
+from typing import IO, Any, Literal, ParamSpec, Self, TypeVar, cast
 
 from fsspec import available_protocols, get_filesystem_class
 from fsspec.asyn import AsyncFileSystem
+from fsspec.implementations.local import LocalFileSystem
 from rich.pretty import pprint as rpp
 
-from byteflows.contentio import deserialize, serialize
+from byteflows.contentio import (
+    BUFFER_INPUTS,
+    CompressedPayload,
+    deserialize,
+    serialize,
+    serialize_into,
+)
 from byteflows.core import SfnUndefined, Undefined, reg_type
 from byteflows.storages import BaseBufferableStorage, engine_factory
-from byteflows.storages.base import ContentQueue
+from byteflows.storages.base import ContentQueue, Mb
+from byteflows.storages.manifest import (
+    ManifestEntry,
+    SqliteManifest,
+    content_digest,
+)
+from byteflows.utils import LRUCache, count_rows, estimate_size
 
 __all__ = [
     "FsBlobStorage",
@@ -31,8 +70,74 @@ _V = TypeVar("_V", bound=AsyncFileSystem)
 _StorageFabric = Callable[_P, _V]
 _FSSpecEngine = AsyncFileSystem
 
+_THROTTLING_CODES: frozenset[str] = frozenset(
+    {
+        "RequestLimitExceeded",
+        "RequestThrottled",
+        "ServiceUnavailable",
+        "SlowDown",
+        "Throttling",
+        "ThrottlingException",
+        "TooManyRequestsException",
+    }
+)
+"""
+Error codes with which S3-compatible backends ask to reduce the request rate.
+"""
 
-def ls_storage(engine: _FSSpecEngine, anypath: str):
+_THROTTLING_STATUSES: frozenset[int] = frozenset({429, 503})
+"""
+HTTP statuses with which backends ask to reduce the request rate.
+"""
+
+_MIN_PART_SIZE: int = 5 * 1024**2
+"""
+Minimum size of a part of an S3 multipart upload (except the last one) in
+bytes.
+"""
+
+
+def ls_storage(
+    engine: _FSSpecEngine,
+    anypath: str,
+    *,
+    manifest: SqliteManifest | None = None,
+    pattern: str | None = None,
+    query: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[str]:
+    """
+    The function returns the paths to all objects located under the given path.
+    If a manifest is passed, the search is performed in it without listing the
+    backend, and the result can additionally be narrowed by request name and
+    write time.
+
+    Args:
+        engine (_FSSpecEngine): asynchronous storage engine.
+        anypath (str): path prefix.
+        manifest (SqliteManifest | None, optional): catalog of objects written
+            by the storage. Defaults to None.
+        pattern (str | None, optional): glob pattern of the path. Used only
+            with the manifest. Defaults to None.
+        query (str | None, optional): name of the request. Used only with the
+            manifest. Defaults to None.
+        since (datetime | None, optional): lower bound of the write time. Used
+            only with the manifest. Defaults to None.
+        until (datetime | None, optional): upper bound of the write time. Used
+            only with the manifest. Defaults to None.
+
+    Returns:
+        list[str]: paths to the objects.
+    """
+    if manifest is not None:
+        return manifest.find(
+            prefix=anypath,
+            pattern=pattern,
+            query=query,
+            since=since,
+            until=until,
+        )
     return engine.find(anypath)
 
 
@@ -65,25 +170,167 @@ def download(engine: _FSSpecEngine, path: str) -> bytes:
     return content
 
 
-def read(engine: _FSSpecEngine, path: str) -> Any:
+def read(engine: _FSSpecEngine, path: str, *, mmap_threshold: Mb = 64) -> Any:
     """
     A function for reading content from storage.
     Although the function is synchronous, it organizes the execution of the asynchronous storage engine in a separate thread.
+    If the engine works with a local (or mounted network) file system, the
+    object is not smaller than mmap_threshold, and the input function of the
+    format accepts buffers (see reg_input), the file is memory-mapped and
+    passed to the input function without copying it into memory. Otherwise the
+    content is downloaded entirely.
 
     Args:
         engine (_FSSpecEngine): asynchronous storage engine.
         path (str): the path to download the content
+        mmap_threshold (Mb, optional): minimum size of the object in megabytes
+            at which memory mapping is used. Defaults to 64.
 
     Returns:
         Any: an instance of the data object. The type of the returned object depends on the deserialization
         function registered for the corresponding data format.
     """
-    content: bytes = download(engine, path)
     extension: str = Path(path).suffix.lstrip(".")
+    if (
+        isinstance(engine, LocalFileSystem)
+        and extension in BUFFER_INPUTS
+        and engine.size(path) >= mmap_threshold * 1024**2
+    ):
+        return _read_mapped(engine._strip_protocol(path), extension)
+    content: bytes = download(engine, path)
     dataobj = deserialize(content, extension)
     return dataobj
 
 
+def _read_mapped(local_path: str, extension: str) -> Any:
+    """
+    Deserializes a local file by passing a memoryview over its memory mapping
+    to the input function.
+
+    Args:
+        local_path (str): path to the file in the local file system.
+        extension (str): data format.
+
+    Returns:
+        Any: an instance of the data object.
+    """
+    with open(local_path, "rb") as file:
+        mapped = mmap(file.fileno(), 0, access=ACCESS_READ)
+    view = memoryview(mapped)
+    try:
+        return deserialize(view, extension)
+    finally:
+        try:
+            view.release()
+            mapped.close()
+        except BufferError:
+            # объект данных ссылается на отображение без копирования (например,
+            # pyarrow), поэтому отображение будет закрыто сборщиком мусора
+            # вместе с ним
+            pass
+
+
+def _etag(info: dict[str, Any]) -> str:
+    """
+    Returns the version identifier of an object from the information provided
+    by the engine. If the backend does not provide an ETag (for example, a
+    local file system), the modification time and size are used.
+
+    Args:
+        info (dict[str, Any]): object information returned by the engine.
+
+    Returns:
+        str: version identifier of the object.
+    """
+    etag: Any = info.get("ETag") or info.get("etag")
+    if etag is None:
+        mtime: Any = info.get("mtime") or info.get("LastModified")
+        etag = f"{mtime}:{info.get('size')}"
+    return str(etag)
+
+
+def _is_throttled(exc: BaseException) -> bool:
+    """
+    Checks whether the error is a signal from the backend to reduce the request
+    rate (for example, S3 "503 SlowDown"), after which the request can be
+    repeated. The error and the errors it was raised from are checked by the
+    errno set by the engine (s3fs translates throttling to EBUSY), by the error
+    code and the HTTP status of the botocore response and by the status of
+    HTTP client errors.
+
+    Args:
+        exc (BaseException): the error raised by the engine.
+
+    Returns:
+        bool: True if the request can be repeated after a pause.
+    """
+    seen: set[int] = set()
+    error: BaseException | None = exc
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if getattr(error, "errno", None) in (errno.EBUSY, errno.EAGAIN):
+            return True
+        response: Any = getattr(error, "response", None)
+        if isinstance(response, dict):
+            code: Any = response.get("Error", {}).get("Code")
+            status: Any = response.get("ResponseMetadata", {}).get(
+                "HTTPStatusCode"
+            )
+            if code in _THROTTLING_CODES or status in _THROTTLING_STATUSES:
+                return True
+        if getattr(error, "status", None) in _THROTTLING_STATUSES:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class _HashingWriter:
+    """
+    A wrapper over a writable file that counts the number of written bytes and
+    their hash (in the same way as content_digest) while the content is
+    streamed to the backend.
+    """
+
+    def __init__(self, file: IO[bytes]):
+        self.file: IO[bytes] = file
+        self.size: int = 0
+        self._hash = blake2b(digest_size=16)
+
+    def write(self, data: bytes) -> int:
+        self._hash.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.file, name)
+
+
+def _interleave_prefixes(paths: Iterable[str]) -> list[str]:
+    """
+    Orders paths so that neighboring paths belong to different "folders" (and
+    therefore to different shards, if the path template contains a shard
+    segment). Concurrent writes are thus spread across prefixes instead of
+    hitting one prefix at a time.
+
+    Args:
+        paths (Iterable[str]): paths to the objects.
+
+    Returns:
+        list[str]: reordered paths.
+    """
+    groups: defaultdict[str, list[str]] = defaultdict(list)
+    for path in paths:
+        groups[posixpath.dirname(path)].append(path)
+    return [
+        path
+        for path in chain.from_iterable(zip_longest(*groups.values()))
+        if path is not None
+    ]
+
+
 def mk_path(engine: _FSSpecEngine, path: str) -> None:
     """
     A function for creating a folder or file in the storage.
@@ -136,6 +383,37 @@ class FsBlobStorage(BaseBufferableStorage):
         bufferize (bool): data buffering indicator. If False, all data will be constantly merged into the backend without buffering. Defaults to True.
         limit_type (Literal["none", "memory", "count", "time"]): type of data storage limit. Defaults to "none".
         limit_capacity (int | float): limit value of the limiting parameter. For memory limit means the volume in megabytes. Defaults to 10.
+        buffer_capacity (int | float | None): limit value of the limiting
+            parameter for an individual buffer. Defaults to None.
+        limit_params (dict | None): additional parameters of the limit class
+            (for example, target_size of the adaptive limit). Defaults to None.
+        manifest (SqliteManifest | None): catalog of objects written by the
+            storage. Attached via the attache_manifest method. Defaults to
+            None.
+        write_concurrency (int): maximum number of objects uploaded to the
+            backend simultaneously. Defaults to 8.
+        write_retries (int): number of repeated attempts to upload an object if
+            the backend asks to reduce the request rate. Defaults to 5.
+        retry_backoff (int | float): initial pause between attempts in seconds.
+            The pause doubles with each attempt. Defaults to 0.5.
+        executor (Executor | None): executor in which objects are serialized
+            during flush. If None, the default thread pool of the event loop is
+            used. Set via the configure method. Defaults to None.
+        stream_threshold (Mb): estimated size of a data object in megabytes
+            from which it is serialized directly into the writer of the storage
+            (multipart upload for object storages) instead of an in-memory
+            buffer. Set via the configure method. Defaults to 256.
+        part_size (Mb): size of the parts in which streamed and multipart
+            objects are uploaded, in megabytes. Set via the configure method.
+            Defaults to 16.
+        multipart_threshold (Mb): size of a serialized object in megabytes from
+            which it is uploaded in parts instead of one request. Set via the
+            configure method. Defaults to 64.
+        part_concurrency (int): maximum number of parts of one object uploaded
+            simultaneously. Set via the configure method. Defaults to 4.
+        buffer_compression (str | None): codec with which buffered objects are
+            compressed in memory (for example, "zstd"). Set via the configure
+            method. Defaults to None (no compression).
 
     """
 
@@ -145,8 +423,15 @@ class FsBlobStorage(BaseBufferableStorage):
         *,
         handshake_timeout: int = 10,
         bufferize: bool = True,
-        limit_type: Literal["none", "memory", "count", "time"] = "none",
+        limit_type: Literal[
+            "none", "memory", "count", "time", "adaptive"
+        ] = "none",
         limit_capacity: int | float = 10,
+        buffer_capacity: int | float | None = None,
+        limit_params: dict | None = None,
+        write_concurrency: int = 8,
+        write_retries: int = 5,
+        retry_backoff: int | float = 0.5,
     ):
         """
         Args:
@@ -155,6 +440,20 @@ class FsBlobStorage(BaseBufferableStorage):
             bufferize (bool): data buffering indicator. If False, all data will be constantly merged into the backend without buffering. Defaults to True.
             limit_type (Literal["none", "memory", "count", "time"]): type of data storage limit. Defaults to "none".
             limit_capacity (int | float): limit value of the limiting parameter. For memory limit means the volume in megabytes. Defaults to 10.
+            buffer_capacity (int | float | None): limit value of the limiting
+                parameter for an individual buffer. When the storage-wide limit
+                is passed, the largest buffers are uploaded first. Defaults to
+                None.
+            limit_params (dict | None): additional parameters of the limit
+                class (for example, target_size of the adaptive limit).
+                Defaults to None.
+            write_concurrency (int): maximum number of objects uploaded to the
+                backend simultaneously. Defaults to 8.
+            write_retries (int): number of repeated attempts to upload an
+                object if the backend asks to reduce the request rate. Defaults
+                to 5.
+            retry_backoff (int | float): initial pause between attempts in
+                seconds. Defaults to 0.5.
         """
         super().__init__(
             engine,
@@ -162,31 +461,391 @@ class FsBlobStorage(BaseBufferableStorage):
             bufferize=bufferize,
             limit_type=limit_type,
             limit_capacity=limit_capacity,
+            buffer_capacity=buffer_capacity,
+            limit_params=limit_params,
+        )
+        self.manifest: SqliteManifest | None = None
+        self.read_cache: LRUCache | None = None
+        self.write_concurrency: int = write_concurrency
+        self.write_retries: int = write_retries
+        self.retry_backoff: int | float = retry_backoff
+        self.executor: Executor | None = None
+        self.stream_threshold: Mb = 256
+        self.part_size: Mb = 16
+        self.multipart_threshold: Mb = 64
+        self.part_concurrency: int = 4
+        self._sessions: list[Any] = []
+        self._reconnect: bool = False
+        self._sync_engine: _FSSpecEngine | None = None
+
+    def configure(
+        self,
+        *,
+        executor: Executor | None = None,
+        stream_threshold: Mb | None = None,
+        part_size: Mb | None = None,
+        multipart_threshold: Mb | None = None,
+        part_concurrency: int | None = None,
+        **params: Any,
+    ) -> Self:
+        """
+        The method allows you to reconfigure all or individual backend
+        parameters after creating an instance of the class. In addition to the
+        parameters of BaseBufferableStorage.configure, it sets the parameters
+        of uploading large objects. Parameters that are not passed keep their
+        values.
+
+        Args:
+            executor (Executor | None, optional): executor in which objects are
+                serialized during flush. Defaults to None.
+            stream_threshold (Mb | None, optional): estimated size of a data
+                object in megabytes from which it is serialized directly into
+                the writer of the storage. Defaults to None.
+            part_size (Mb | None, optional): size of the parts in which
+                streamed and multipart objects are uploaded, in megabytes. For
+                S3 it cannot be less than 5. Defaults to None.
+            multipart_threshold (Mb | None, optional): size of a serialized
+                object in megabytes from which it is uploaded in parts.
+                Defaults to None.
+            part_concurrency (int | None, optional): maximum number of parts of
+                one object uploaded simultaneously. Defaults to None.
+
+        Raises:
+            ValueError: thrown if part_size is less than the minimum part size
+                of S3 (5 MB) for an S3-compatible engine.
+        """
+        super().configure(**params)
+        if part_size is not None:
+            if hasattr(self.engine, "_call_s3") and (
+                part_size * 1024**2 < _MIN_PART_SIZE
+            ):
+                msg = (
+                    f"Размер части ({part_size} Мб) меньше минимального "
+                    "размера части S3 (5 Мб)."
+                )
+                raise ValueError(msg)
+            self.part_size = part_size
+        if executor is not None:
+            self.executor = executor
+        if stream_threshold is not None:
+            self.stream_threshold = stream_threshold
+        if multipart_threshold is not None:
+            self.multipart_threshold = multipart_threshold
+        if part_concurrency is not None:
+            self.part_concurrency = part_concurrency
+        return self
+
+    def attache_cache(self, max_size: Mb = 256) -> LRUCache:
+        """
+        The method creates and binds a cache of deserialized objects used by
+        the read_many method. The cache is limited by the size of the
+        serialized objects, and the entries are keyed by path and object
+        version (ETag), so a changed object is never returned from the cache.
+
+        Args:
+            max_size (Mb, optional): cache size limit in megabytes. Defaults to
+                256.
+
+        Returns:
+            LRUCache: cache instance.
+        """
+        self.read_cache = LRUCache(int(max_size * 1024**2))
+        return self.read_cache
+
+    def attache_manifest(
+        self, db_path: str | Path = "byteflows_manifest.db"
+    ) -> SqliteManifest:
+        """
+        The method creates and binds a catalog in which every object written to
+        the backend is recorded.
+
+        Args:
+            db_path (str | Path, optional): path to the catalog database file.
+                Defaults to "byteflows_manifest.db".
+
+        Returns:
+            SqliteManifest: catalog instance.
+        """
+        self.manifest = SqliteManifest(db_path)
+        return self.manifest
+
+    async def ls(
+        self,
+        prefix: str = "",
+        *,
+        pattern: str | None = None,
+        query: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[str]:
+        """
+        Returns the paths to objects under the given prefix. If a manifest is
+        attached, the search is performed in it; otherwise the backend is
+        listed and filtering by pattern, request and time is not available.
+
+        Args:
+            prefix (str, optional): path prefix. Defaults to "".
+            pattern (str | None, optional): glob pattern of the path. Allows
+                sharded objects to be found by their logical path. Defaults to
+                None.
+            query (str | None, optional): name of the request. Defaults to
+                None.
+            since (datetime | None, optional): lower bound of the write time.
+                Defaults to None.
+            until (datetime | None, optional): upper bound of the write time.
+                Defaults to None.
+
+        Returns:
+            list[str]: paths to the objects.
+        """
+        if self.manifest is not None:
+            return await to_thread(
+                self.manifest.find,
+                prefix=prefix,
+                pattern=pattern,
+                query=query,
+                since=since,
+                until=until,
+            )
+        return await self.engine._find(prefix)
+
+    async def read_many(
+        self,
+        paths: Sequence[str],
+        *,
+        batch_size: int = 32,
+        executor: Executor | None = None,
+    ) -> dict[str, Any]:
+        """
+        Reads many objects from the backend at once. Objects are downloaded in
+        parallel with the bulk operation of the engine, the number of
+        simultaneous requests is limited by batch_size. Deserialization is
+        performed in the executor (by default in the event loop thread pool) so
+        as not to block the event loop. If a cache is attached (see
+        attache_cache), objects whose version has not changed are taken from
+        it.
+
+        Args:
+            paths (Sequence[str]): paths to the objects. The data format is
+                determined by the extension.
+            batch_size (int, optional): maximum number of simultaneous requests
+                to the backend. Defaults to 32.
+            executor (Executor | None, optional): executor in which objects are
+                deserialized. Defaults to None.
+
+        Returns:
+            dict[str, Any]: path - data object pairs in the order in which the
+                paths were passed.
+        """
+        result: dict[str, Any] = dict.fromkeys(paths)
+        keys: dict[str, tuple[str, str]] = dict()
+        missed: list[str] = list(result)
+        if self.read_cache is not None:
+            keys = await self._version_keys(paths, batch_size)
+            missed = []
+            for path, key in keys.items():
+                # кэш возвращает себя при отсутствии записи, поскольку None
+                # может быть закэшированным объектом данных
+                dataobj: Any = self.read_cache.get(key, self.read_cache)
+                if dataobj is self.read_cache:
+                    missed.append(path)
+                else:
+                    result[path] = dataobj
+        if missed:
+            async with self.checkout_engine() as engine:
+                contents: dict[str, bytes] = await engine._cat(
+                    missed, batch_size=batch_size
+                )
+            loop = get_running_loop()
+            dataobjs: list[Any] = await gather(
+                *[
+                    loop.run_in_executor(
+                        executor,
+                        deserialize,
+                        contents[path],
+                        Path(path).suffix.lstrip("."),
+                    )
+                    for path in missed
+                ]
+            )
+            for path, dataobj in zip(missed, dataobjs):
+                result[path] = dataobj
+                if self.read_cache is not None:
+                    self.read_cache.put(
+                        keys[path], dataobj, len(contents[path])
+                    )
+        return result
+
+    async def iter_objects(
+        self,
+        paths: Sequence[str],
+        *,
+        batch_size: int = 32,
+        prefetch: int = 1,
+        executor: Executor | None = None,
+    ) -> AsyncGenerator[tuple[str, Any], None]:
+        """
+        Iterates over the objects in chunks of batch_size. While the current
+        chunk is being consumed, the next prefetch chunks are already being
+        downloaded and deserialized.
+
+        Args:
+            paths (Sequence[str]): paths to the objects.
+            batch_size (int, optional): chunk size and maximum number of
+                simultaneous requests. Defaults to 32.
+            prefetch (int, optional): number of chunks read ahead. Defaults to
+                1.
+            executor (Executor | None, optional): executor in which objects are
+                deserialized. Defaults to None.
+
+        Yields:
+            AsyncGenerator[tuple[str, Any], None]: path - data object pairs.
+        """
+        chunks = deque(
+            paths[idx : idx + batch_size]
+            for idx in range(0, len(paths), batch_size)
         )
+        pending: deque[Task[dict[str, Any]]] = deque()
+        try:
+            while chunks or pending:
+                while chunks and len(pending) <= prefetch:
+                    coro = self.read_many(
+                        chunks.popleft(),
+                        batch_size=batch_size,
+                        executor=executor,
+                    )
+                    pending.append(create_task(coro))
+                for item in (await pending.popleft()).items():
+                    yield item
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _version_keys(
+        self, paths: Sequence[str], batch_size: int
+    ) -> dict[str, tuple[str, str]]:
+        """
+        Returns cache keys (path and object version) for the given paths.
+
+        Args:
+            paths (Sequence[str]): paths to the objects.
+            batch_size (int): maximum number of simultaneous requests to the
+                backend.
+
+        Returns:
+            dict[str, tuple[str, str]]: path - cache key pairs.
+        """
+        limiter = Semaphore(batch_size)
+
+        async def version(path: str) -> tuple[str, str]:
+            async with limiter, self.checkout_engine() as engine:
+                return path, _etag(await engine._info(path))
+
+        return dict(await gather(*[version(path) for path in paths]))
 
     async def launch_session(self) -> None:
         async with self._queue_lock:
             if not self.active_session:
-                try:
-                    coro = self.engine.set_session()
-                    await wait_for(coro, self.connect_timeout)
-                    self.active_session = True
-                except TimeoutError as err:
-                    msg = f"Не удалось установить соединение в {self.__class__.__name__} в течение заданного таймаута."
-                    raise RuntimeError(msg) from err
+                if self.engine_pool is None:
+                    await self._prepare_engine(self.engine)
+                else:
+                    await self.engine_pool.prepare_all()
+                if self.manifest is not None:
+                    await to_thread(self.manifest.open)
+                self.active_session = True
                 print("Сессия с хранилищем успешно установлена.")
 
+    async def close_session(self) -> None:
+        async with self._queue_lock:
+            if self.active_session:
+                sessions: list[Any] = self._sessions
+                self._sessions = []
+                await self._close_sessions(sessions)
+                if self.manifest is not None:
+                    await to_thread(self.manifest.close)
+                self._reconnect = True
+                self.active_session = False
+                print("Сессия с хранилищем закрыта.")
+
+    def _release_engines(self) -> None:
+        super()._release_engines()
+        self._sync_engine = None
+        sessions: list[Any] = self._sessions
+        self._sessions = []
+        self._reconnect = False
+        if not sessions:
+            return
+        try:
+            get_running_loop().create_task(self._close_sessions(sessions))
+        except RuntimeError:
+            # без запущенного цикла событий сессии закрываются финализаторами
+            # движков
+            pass
+
+    @staticmethod
+    async def _close_sessions(sessions: Sequence[Any]) -> None:
+        """
+        Closes the sessions returned by set_session of the engines (for
+        example, s3fs clients) with their close method.
+
+        Args:
+            sessions (Sequence[Any]): sessions of the engines.
+        """
+        for session in sessions:
+            close: Callable | None = getattr(session, "close", None)
+            if close is not None and isawaitable(result := close()):
+                await result
+
+    async def _prepare_engine(self, engine: _FSSpecEngine) -> None:
+        """
+        Establishes a session of the engine with the backend within the
+        handshake timeout.
+
+        Args:
+            engine (_FSSpecEngine): asynchronous storage engine.
+
+        Raises:
+            RuntimeError: thrown if the session was not established within the
+                timeout.
+        """
+        try:
+            # после close_session движок хранит закрытую сессию, поэтому она
+            # пересоздается
+            coro = (
+                engine.set_session(refresh=True)
+                if self._reconnect
+                else engine.set_session()
+            )
+            self._sessions.append(await wait_for(coro, self.connect_timeout))
+        except TimeoutError as err:
+            msg = (
+                "Не удалось установить соединение в "
+                f"{self.__class__.__name__} в течение заданного таймаута."
+            )
+            raise RuntimeError(msg) from err
+
+    def _pooled_engine_params(self, engine_params: dict | None) -> dict:
+        # fsspec кэширует экземпляры с одинаковыми параметрами, поэтому для
+        # пула кэш отключается
+        return {**(engine_params or {}), "skip_instance_cache": True}
+
     @property
     def registred_types(self) -> Iterable[str]:
         return available_protocols()
 
     async def check_path(self, path: str, *, autocreate: bool = False) -> bool:
-        status: bool = await self.engine._exists(path)
+        async with self.checkout_engine() as engine:
+            return await self._check_path(engine, path, autocreate=autocreate)
+
+    async def _check_path(
+        self, engine: _FSSpecEngine, path: str, *, autocreate: bool = False
+    ) -> bool:
+        status: bool = await engine._exists(path)
         if (res := not status) and autocreate:
             try:
-                await self.engine._mkdir(Path(path).parts[0])
+                await engine._mkdir(Path(path).parts[0])
             except FileExistsError:
-                await self.engine._touch(path)  # type: ignore
+                await engine._touch(path)  # type: ignore
             return res
         else:
             return status
@@ -200,27 +859,327 @@ class FsBlobStorage(BaseBufferableStorage):
         rpp(
             f"Внутренняя блокировка буфера уже захвачена? {buf.internal_lock.locked()}"
         )
-        async with buf.block_state() as buf:
-            rpp(
-                "Захвачена внутренняя блокировка буфера для выгрузки контента."
-            )
-            old_content: dict[str, Any] = copy(buf.queue)
-            print("Old content")
-            print(old_content)
-            content_format: str = buf.out_format
-            rpp(f"Очищаю содержимое буфера {buf} после копирования.")
-            rpp(f"Перехожу к загрузке контента в хранилище.")
-            for path, data in old_content.items():
-                await self.check_path(path, autocreate=True)
-                await self.engine._pipe_file(
-                    path, serialize(data, content_format)
+        with buf.uploading():
+            async with buf.block_state() as buf:
+                rpp(
+                    "Захвачена внутренняя блокировка буфера для выгрузки контента."
                 )
-            rpp(f"Завершил загрузку контекта в хранилище.")
-            buf.reset()
-            await self._recalc_counters()
+                await to_thread(buf.deduplicate_records)
+                await to_thread(buf.capture_changes)
+                old_content: dict[str, Any] = copy(buf.queue)
+                print("Old content")
+                print(old_content)
+                rpp(f"Очищаю содержимое буфера {buf} после копирования.")
+                rpp(f"Перехожу к загрузке контента в хранилище.")
+                limiter = Semaphore(self.write_concurrency)
+                start: float = monotonic()
+                entries: list[ManifestEntry] = await gather(
+                    *[
+                        self._upload(buf, path, old_content[path], limiter)
+                        for path in _interleave_prefixes(old_content)
+                    ]
+                )
+                if self.manifest is not None and entries:
+                    await to_thread(self.manifest.record, entries)
+                await to_thread(buf.commit_pending)
+                rpp(f"Завершил загрузку контекта в хранилище.")
+                self.limit.on_flush(
+                    buf,
+                    int(buf.memory_size * 1024**2),
+                    sum(entry.size for entry in entries),
+                    monotonic() - start,
+                )
+                buf.reset()
+                await self._recalc_counters()
 
         rpp(f"Процесс выгрузки данных в хранилище завершен.")
 
+    async def _upload(
+        self, buf: ContentQueue, path: str, data: Any, limiter: Semaphore
+    ) -> ManifestEntry:
+        """
+        The method serializes and uploads one object from the buffer.
+        Serialization is performed in the executor, so while one object is
+        being serialized, others are being uploaded. Objects whose estimated
+        size exceeds stream_threshold are serialized directly into the writer
+        of the storage. Objects compressed in the buffer are already
+        serialized, so they are only decompressed and uploaded as is.
+
+        Args:
+            buf (ContentQueue): the buffer from which the object is uploaded.
+            path (str): path to the object.
+            data (Any): data object.
+            limiter (Semaphore): limiter of simultaneous uploads.
+
+        Returns:
+            ManifestEntry: record about the written object. The content hash is
+                calculated only if the manifest is attached.
+        """
+        async with limiter:
+            if isinstance(data, CompressedPayload):
+                content: bytes = await get_running_loop().run_in_executor(
+                    self.executor, data.decompress
+                )
+                async with self.checkout_engine() as engine:
+                    await self._check_path(engine, path, autocreate=True)
+                    await self._write_content(engine, path, content)
+                size: int = len(content)
+                digest: str = content_digest(content) if self.manifest else ""
+            elif estimate_size(data) >= self.stream_threshold * 1024**2:
+                async with self.checkout_engine() as engine:
+                    await self._check_path(engine, path, autocreate=True)
+                    size, digest = await to_thread(
+                        self._stream_upload,
+                        self._sync_engine_of(engine),
+                        path,
+                        data,
+                        buf.out_format,
+                    )
+                    engine.invalidate_cache(path)
+            else:
+                content = await get_running_loop().run_in_executor(
+                    self.executor, serialize, data, buf.out_format
+                )
+                async with self.checkout_engine() as engine:
+                    await self._check_path(engine, path, autocreate=True)
+                    await self._write_content(engine, path, content)
+                size = len(content)
+                digest = content_digest(content) if self.manifest else ""
+        return ManifestEntry(
+            path,
+            buf.name,
+            size,
+            data.rows
+            if isinstance(data, CompressedPayload)
+            else count_rows(data),
+            buf.timestamps.get(path, time()),
+            time(),
+            digest,
+        )
+
+    async def _write_content(
+        self, engine: _FSSpecEngine, path: str, content: bytes
+    ) -> None:
+        """
+        Uploads serialized content in one request or, if it reaches
+        multipart_threshold, in parts.
+
+        Args:
+            engine (_FSSpecEngine): asynchronous storage engine.
+            path (str): path to the object.
+            content (bytes): serialized content.
+        """
+        if len(content) >= self.multipart_threshold * 1024**2:
+            await self._multipart_upload(engine, path, content)
+        else:
+            await self._pipe_with_retry(engine, path, content)
+
+    async def _pipe_with_retry(
+        self, engine: _FSSpecEngine, path: str, content: bytes
+    ) -> None:
+        """
+        Uploads the content in one request. If the backend asks to reduce the
+        request rate, the upload is repeated with exponentially growing pauses.
+
+        Args:
+            engine (_FSSpecEngine): asynchronous storage engine.
+            path (str): path to the object.
+            content (bytes): serialized content.
+        """
+        await self._retry(engine._pipe_file, path, content)
+
+    async def _retry(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        retry_any: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Calls the engine operation, repeating it with exponentially growing
+        pauses if the backend asks to reduce the request rate.
+
+        Args:
+            func (Callable[..., Awaitable[Any]]): engine coroutine function.
+            retry_any (bool, optional): repeat the operation after any error,
+                not only after throttling. Defaults to False.
+
+        Returns:
+            Any: result of the operation.
+        """
+        for attempt in range(self.write_retries + 1):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as exc:
+                if attempt == self.write_retries or not (
+                    retry_any or _is_throttled(exc)
+                ):
+                    raise
+                delay: float = self.retry_backoff * 2**attempt
+                rpp(
+                    f"Операция {func.__name__} завершилась ошибкой {exc!r}, "
+                    f"повтор через {delay} сек."
+                )
+                await sleep(uniform(delay / 2, delay))
+
+    async def _multipart_upload(
+        self, engine: _FSSpecEngine, path: str, content: bytes
+    ) -> None:
+        """
+        Uploads large content in parts of part_size. For S3-compatible engines
+        parts are uploaded in parallel (no more than part_concurrency at a
+        time), and a failed part is repeated on its own instead of restarting
+        the whole upload. If a part still fails, the other parts are cancelled
+        and the upload is aborted. Other engines receive the content through a
+        writer opened in "wb" mode with the block size equal to part_size.
+
+        Args:
+            engine (_FSSpecEngine): asynchronous storage engine.
+            path (str): path to the object.
+            content (bytes): serialized content.
+
+        Raises:
+            ValueError: thrown if part_size is less than the minimum part size
+                of S3 (5 MB).
+        """
+        part_size = int(self.part_size * 1024**2)
+        if not hasattr(engine, "_call_s3"):
+            await to_thread(
+                self._write_in_parts,
+                self._sync_engine_of(engine),
+                path,
+                content,
+            )
+            engine.invalidate_cache(path)
+            return
+        if part_size < _MIN_PART_SIZE:
+            msg = (
+                f"Размер части ({self.part_size} Мб) меньше минимального "
+                "размера части S3 (5 Мб)."
+            )
+            raise ValueError(msg)
+        bucket, key, _ = engine.split_path(path)  # type: ignore
+        mpu: dict[str, Any] = await engine._call_s3(  # type: ignore
+            "create_multipart_upload", Bucket=bucket, Key=key
+        )
+        upload_id: str = mpu["UploadId"]
+        view = memoryview(content)
+        limiter = Semaphore(self.part_concurrency)
+
+        async def upload_part(number: int, offset: int) -> dict[str, Any]:
+            async with limiter:
+                part: dict[str, Any] = await self._retry(
+                    engine._call_s3,  # type: ignore
+                    "upload_part",
+                    retry_any=True,
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=number,
+                    Body=bytes(view[offset : offset + part_size]),
+                )
+            return {"PartNumber": number, "ETag": part["ETag"]}
+
+        tasks: list[Task] = [
+            create_task(upload_part(number, offset))
+            for number, offset in enumerate(
+                range(0, len(content), part_size), start=1
+            )
+        ]
+        try:
+            parts: list[dict[str, Any]] = await gather(*tasks)
+            await engine._call_s3(  # type: ignore
+                "complete_multipart_upload",
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+            await engine._call_s3(  # type: ignore
+                "abort_multipart_upload",
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+            )
+            raise
+        finally:
+            view.release()
+        engine.invalidate_cache(path)
+
+    def _sync_engine_of(self, engine: _FSSpecEngine) -> _FSSpecEngine:
+        """
+        Returns a synchronous instance of the engine class with the same
+        parameters. Writers opened by asynchronous engines cannot be used from
+        worker threads, so objects are streamed through this instance. The
+        instance is created on first use and is replaced when the storage is
+        reconfigured.
+
+        Args:
+            engine (_FSSpecEngine): asynchronous storage engine.
+
+        Returns:
+            _FSSpecEngine: synchronous storage engine.
+        """
+        if self._sync_engine is None:
+            self._sync_engine = type(engine)(
+                **{
+                    **engine.storage_options,
+                    "asynchronous": False,
+                    "loop": None,
+                    "skip_instance_cache": True,
+                }
+            )
+        return self._sync_engine
+
+    def _write_in_parts(
+        self, engine: _FSSpecEngine, path: str, content: bytes
+    ) -> None:
+        """
+        Writes the content through the writer of the engine in parts of
+        part_size. The method is blocking and is executed in a separate thread.
+
+        Args:
+            engine (_FSSpecEngine): synchronous storage engine.
+            path (str): path to the object.
+            content (bytes): serialized content.
+        """
+        part_size = int(self.part_size * 1024**2)
+        with (
+            memoryview(content) as view,
+            engine.open(path, "wb", block_size=part_size) as file,
+        ):
+            for offset in range(0, len(view), part_size):
+                file.write(view[offset : offset + part_size])
+
+    def _stream_upload(
+        self, engine: _FSSpecEngine, path: str, data: Any, content_format: str
+    ) -> tuple[int, str]:
+        """
+        Serializes the object directly into the file opened for writing in the
+        storage. The engine sends the content in parts of part_size as they are
+        filled (for object storages - a multipart upload), so the full byte
+        representation of the object is never kept in memory. The method is
+        blocking and is executed in a separate thread.
+
+        Args:
+            engine (_FSSpecEngine): synchronous storage engine.
+            path (str): path to the object.
+            data (Any): data object.
+            content_format (str): data upload format.
+
+        Returns:
+            tuple[int, str]: size of the written object in bytes and its hash.
+        """
+        block_size = int(self.part_size * 1024**2)
+        with engine.open(path, "wb", block_size=block_size) as file:
+            writer = _HashingWriter(file)
+            serialize_into(data, content_format, writer)  # type: ignore
+        return writer.size, writer.hexdigest()
+
 
 @engine_factory(FsBlobStorage)
 def create_fsspec_engine(
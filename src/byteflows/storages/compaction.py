@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import posixpath
+from asyncio import Task, create_task, to_thread
+from collections import defaultdict
+from collections.abc import Callable, Generator
+from time import time, time_ns
+from typing import TYPE_CHECKING, Any
+
+from rich.pretty import pprint as rpp
+
+from byteflows.contentio import deserialize, merge, serialize
+from byteflows.storages.manifest import ManifestEntry, content_digest
+from byteflows.utils import count_rows
+
+if TYPE_CHECKING:
+    from byteflows.scheduling import ActionCondition
+    from byteflows.storages.base import Mb
+    from byteflows.storages.blob import FsBlobStorage
+
+__all__ = ["BlobCompactor"]
+
+
+def _parent_dir(path: str) -> str:
+    """
+    Default grouping key for compaction - the "folder" in which the object is
+    located.
+
+    Args:
+        path (str): path to the object in the storage.
+
+    Returns:
+        str: parent path of the object.
+    """
+    return posixpath.dirname(path)
+
+
+class BlobCompactor:
+    """
+    A background job that combines many small objects written by FsBlobStorage
+    into larger ones. The job lists objects under the prefix, groups them by
+    key, merges each group in chunks using the merging function registered for
+    the data format (see reg_merge), writes the result under a temporary name,
+    renames it to the final one and only then deletes the source objects.
+    Chunks are limited both by the number of objects and by their total size,
+    so the amount of memory used does not depend on the number of objects under
+    the prefix. The job is launched in the same way as data collectors - when
+    the control event occurs. If a manifest is attached to the storage, objects
+    are searched for in it instead of listing the backend, and the manifest is
+    updated after each merge.
+
+    Attributes:
+        storage (FsBlobStorage): the storage whose objects are compacted.
+        prefix (str): the path prefix under which the objects are searched for.
+        content_format (str): format of compacted objects. Objects with other
+            extensions are ignored.
+        condition (ActionCondition): the event upon which compaction starts.
+        target_size (Mb): the desired size of the compacted object in
+            megabytes. Objects of this size or more are not compacted. Defaults
+            to 64.
+        max_objects (int): maximum number of source objects merged into one.
+            Defaults to 1000.
+        read_batch (int): number of objects downloaded from the backend at a
+            time. Defaults to 32.
+        group_key (Callable[[str], str]): function that returns the grouping
+            key by object path. Objects are merged only within a group, and the
+            key is used as the folder of the compacted object. By default,
+            objects are grouped by parent folder.
+        stats (dict[str, int | float]): statistics of the last compaction run.
+    """
+
+    def __init__(
+        self,
+        storage: FsBlobStorage,
+        prefix: str,
+        *,
+        content_format: str,
+        condition: ActionCondition,
+        target_size: Mb = 64,
+        max_objects: int = 1000,
+        read_batch: int = 32,
+        group_key: Callable[[str], str] = _parent_dir,
+    ):
+        """
+        Args:
+            storage (FsBlobStorage): the storage whose objects are compacted.
+            prefix (str): the path prefix under which the objects are searched
+                for.
+            content_format (str): format of compacted objects. Objects with
+                other extensions are ignored.
+            condition (ActionCondition): the event upon which compaction
+                starts, for example, a TimeCondition. Each job needs its own
+                instance of the condition.
+            target_size (Mb, optional): the desired size of the compacted
+                object in megabytes. Defaults to 64.
+            max_objects (int, optional): maximum number of source objects
+                merged into one. Defaults to 1000.
+            read_batch (int, optional): number of objects downloaded from the
+                backend at a time. Defaults to 32.
+            group_key (Callable[[str], str], optional): function that returns
+                the grouping key by object path. Defaults to parent folder.
+        """
+        self._name: str = f"compaction:{prefix}"
+        self.storage: FsBlobStorage = storage
+        self.prefix: str = prefix
+        self.content_format: str = content_format
+        self.condition: ActionCondition = condition
+        self.target_size: Mb = target_size
+        self.max_objects: int = max_objects
+        self.read_batch: int = read_batch
+        self.group_key: Callable[[str], str] = group_key
+        self.stats: dict[str, int | float] = dict()
+        self._entries: dict[str, ManifestEntry] = dict()
+
+    @property
+    def _target_bytes(self) -> int:
+        return int(self.target_size * 1024**2)
+
+    async def start(self) -> Task:
+        """
+        Entry point for running the compaction job. The method waits for the
+        control event, compacts the objects and returns itself, wrapped in an
+        asyncio task.
+
+        Returns:
+            Task: task created for the start method.
+        """
+        await self.condition.pending()
+        await self.storage.launch_session()
+        await self.compact()
+        coro = self.start()
+        return create_task(coro, name=self._name)
+
+    async def compact(self) -> dict[str, int | float]:
+        """
+        Performs one compaction pass over all objects under the prefix.
+
+        Returns:
+            dict[str, int | float]: the number of processed groups, source and
+                written objects, and the duration of the pass in seconds.
+        """
+        start: float = time()
+        self.stats = {"groups": 0, "sources": 0, "written": 0}
+        for key, chunk in self._plan(await self._list_candidates()):
+            await self._compact_chunk(key, chunk)
+            self.stats["sources"] += len(chunk)
+            self.stats["written"] += 1
+        self.stats["elapsed"] = time() - start
+        rpp(f"Уплотнение {self.prefix} завершено: {self.stats}")
+        return self.stats
+
+    async def _list_candidates(self) -> dict[str, int]:
+        """
+        The method lists objects under the prefix and selects those that need
+        to be compacted.
+
+        Returns:
+            dict[str, int]: path - size pairs of the objects to compact.
+        """
+        ext: str = f".{self.content_format}"
+        if (manifest := self.storage.manifest) is not None:
+            self._entries = {
+                entry.path: entry
+                for entry in await to_thread(
+                    manifest.entries, prefix=self.prefix
+                )
+            }
+            sizes: dict[str, int] = {
+                path: entry.size for path, entry in self._entries.items()
+            }
+        else:
+            listing: dict[
+                str, dict[str, Any]
+            ] = await self.storage.engine._find(self.prefix, detail=True)
+            sizes = {path: info["size"] for path, info in listing.items()}
+        return {
+            path: size
+            for path, size in sizes.items()
+            if path.endswith(ext) and size < self._target_bytes
+        }
+
+    def _plan(
+        self, candidates: dict[str, int]
+    ) -> Generator[tuple[str, list[str]], Any, None]:
+        """
+        The method divides the objects into groups and the groups into chunks
+        limited by the number of objects and their total size.
+
+        Args:
+            candidates (dict[str, int]): path - size pairs of the objects to
+                compact.
+
+        Yields:
+            Generator[tuple[str, list[str]], Any, None]: grouping key and the
+                chunk of paths to merge.
+        """
+        groups: defaultdict[str, list[str]] = defaultdict(list)
+        for path in sorted(candidates):
+            groups[self.group_key(path)].append(path)
+        for key, paths in groups.items():
+            if len(paths) < 2:
+                continue
+            self.stats["groups"] += 1
+            chunk: list[str] = []
+            chunk_size: int = 0
+            for path in paths:
+                if chunk and (
+                    len(chunk) >= self.max_objects
+                    or chunk_size + candidates[path] > self._target_bytes
+                ):
+                    if len(chunk) > 1:
+                        yield key, chunk
+                    chunk, chunk_size = [], 0
+                chunk.append(path)
+                chunk_size += candidates[path]
+            if len(chunk) > 1:
+                yield key, chunk
+
+    async def _compact_chunk(self, key: str, chunk: list[str]) -> None:
+        """
+        The method merges a chunk of objects into one, writes it atomically and
+        deletes the source objects.
+
+        Args:
+            key (str): grouping key. Used as the folder of the compacted
+                object.
+            chunk (list[str]): paths of the objects to merge.
+        """
+        engine = self.storage.engine
+        dataobjs: list[Any] = []
+        for idx in range(0, len(chunk), self.read_batch):
+            batch: list[str] = chunk[idx : idx + self.read_batch]
+            contents: dict[str, bytes] = await engine._cat(batch)
+            for path in batch:
+                dataobjs.append(
+                    await to_thread(
+                        deserialize, contents.pop(path), self.content_format
+                    )
+                )
+        merged: Any = await to_thread(merge, dataobjs, self.content_format)
+        dataobjs.clear()
+        content: bytes = await to_thread(
+            serialize, merged, self.content_format
+        )
+        target: str = posixpath.join(
+            key, f"compacted_{time_ns()}.{self.content_format}"
+        )
+        tmp_path: str = f"{target}.part"
+        await engine._pipe_file(tmp_path, content)
+        await engine._mv(tmp_path, target)
+        await engine._rm(chunk)
+        if (manifest := self.storage.manifest) is not None:
+            sources: list[ManifestEntry] = [
+                self._entries[path] for path in chunk
+            ]
+            queries: set[str] = {entry.query for entry in sources}
+            entry = ManifestEntry(
+                target,
+                queries.pop() if len(queries) == 1 else "",
+                len(content),
+                count_rows(merged),
+                min(entry.buffered_at for entry in sources),
+                time(),
+                content_digest(content),
+            )
+            await to_thread(manifest.record, [entry])
+            await to_thread(manifest.remove, chunk)
+        rpp(f"Объекты ({len(chunk)} шт.) объединены в {target}.")
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable
+from dataclasses import astuple, dataclass, fields
+from datetime import datetime
+from hashlib import blake2b
+from pathlib import Path
+from threading import Lock as ThreadLock
+from typing import Any
+
+__all__ = ["ManifestEntry", "SqliteManifest", "content_digest"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    path TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    rows INTEGER,
+    buffered_at REAL NOT NULL,
+    written_at REAL NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_query ON objects (query, written_at);
+CREATE INDEX IF NOT EXISTS objects_written ON objects (written_at);
+"""
+
+
+def content_digest(content: bytes) -> str:
+    """
+    Returns the hash of the serialized content that is stored in the manifest.
+
+    Args:
+        content (bytes): serialized content.
+
+    Returns:
+        str: hexadecimal digest of the content.
+    """
+    return blake2b(content, digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """
+    A record about an object written to the backend.
+
+    Args:
+        path (str): path to the object in the storage.
+        query (str): name of the request whose data is stored in the object.
+        size (int): size of the object in bytes.
+        rows (int | None): number of rows in the data object, if it can be
+            determined.
+        buffered_at (float): timestamp (in seconds since the epoch) when the
+            object entered the buffer.
+        written_at (float): timestamp (in seconds since the epoch) when the
+            object was written to the backend.
+        content_hash (str): hash of the serialized content.
+    """
+
+    path: str
+    query: str
+    size: int
+    rows: int | None
+    buffered_at: float
+    written_at: float
+    content_hash: str
+
+
+class SqliteManifest:
+    """
+    A catalog of all objects that were written to the backend by the storage.
+    The catalog is kept in a local SQLite database with indexes by path,
+    request and write time, so searching for objects by prefix, request or time
+    interval does not require listing the backend. The class is thread-safe:
+    the storage accesses it from worker threads.
+
+    Attributes:
+        db_path (str): path to the database file. The special value ":memory:"
+            creates an in-memory catalog.
+    """
+
+    def __init__(self, db_path: str | Path = "byteflows_manifest.db"):
+        """
+        Args:
+            db_path (str | Path, optional): path to the database file. Defaults
+                to "byteflows_manifest.db".
+        """
+        self.db_path: str = str(db_path)
+        self._lock: ThreadLock = ThreadLock()
+        self._conn: sqlite3.Connection = None  # type: ignore
+        self.open()
+
+    @property
+    def closed(self) -> bool:
+        """
+        The property indicates that the connection to the database is closed.
+        """
+        return self._conn is None
+
+    def open(self) -> None:
+        """
+        Opens the connection to the database if it is closed. An in-memory
+        catalog is empty after it is reopened.
+        """
+        with self._lock:
+            if self._conn is not None:
+                return
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+
+    def record(self, entries: Iterable[ManifestEntry]) -> None:
+        """
+        Adds records about written objects. A record for an existing path is
+        replaced.
+
+        Args:
+            entries (Iterable[ManifestEntry]): records about objects.
+        """
+        placeholders: str = ", ".join("?" * len(fields(ManifestEntry)))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO objects VALUES ({placeholders})",
+                [astuple(entry) for entry in entries],
+            )
+
+    def remove(self, paths: Iterable[str]) -> None:
+        """
+        Removes records about objects that no longer exist in the backend.
+
+        Args:
+            paths (Iterable[str]): paths to the objects.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM objects WHERE path = ?", [(p,) for p in paths]
+            )
+
+    def entries(
+        self,
+        *,
+        prefix: str = "",
+        pattern: str | None = None,
+        query: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[ManifestEntry]:
+        """
+        Returns records about objects that match all the specified conditions.
+
+        Args:
+            prefix (str, optional): path prefix. Defaults to "".
+            pattern (str | None, optional): glob pattern of the path (for
+                example, "*/fmp_api/income_*"). Allows objects to be found
+                regardless of the shard segment in their path. Defaults to
+                None.
+            query (str | None, optional): name of the request. Defaults to
+                None.
+            since (datetime | None, optional): lower bound of the write time
+                (inclusive). Defaults to None.
+            until (datetime | None, optional): upper bound of the write time
+                (exclusive). Defaults to None.
+
+        Returns:
+            list[ManifestEntry]: records sorted by path.
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        if prefix:
+            # диапазон вместо LIKE, чтобы поиск шел по индексу первичного ключа
+            clauses.append("path >= ? AND path < ?")
+            params.extend([prefix, prefix + "\U0010ffff"])
+        if pattern is not None:
+            clauses.append("path GLOB ?")
+            params.append(pattern)
+        if query is not None:
+            clauses.append("query = ?")
+            params.append(query)
+        if since is not None:
+            clauses.append("written_at >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            clauses.append("written_at < ?")
+            params.append(until.timestamp())
+        where: str = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows: list[tuple] = self._conn.execute(
+                f"SELECT * FROM objects {where} ORDER BY path", params
+            ).fetchall()
+        return [ManifestEntry(*row) for row in rows]
+
+    def find(
+        self,
+        *,
+        prefix: str = "",
+        pattern: str | None = None,
+        query: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[str]:
+        """
+        Returns paths to objects that match all the specified conditions.
+        Accepts the same arguments as the entries method.
+
+        Returns:
+            list[str]: paths to the objects sorted in lexicographic order.
+        """
+        return [
+            entry.path
+            for entry in self.entries(
+                prefix=prefix,
+                pattern=pattern,
+                query=query,
+                since=since,
+                until=until,
+            )
+        ]
+
+    def close(self) -> None:
+        """
+        Closes the connection to the database. It can be reopened with the
+        open method.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None  # type: ignore
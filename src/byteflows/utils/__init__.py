@@ -1 +1,2 @@
+from .cache import *
 from .misc import *
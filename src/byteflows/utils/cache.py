@@ -0,0 +1,104 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from threading import Lock
+from typing import Any
+
+__all__ = ["LRUCache"]
+
+
+class LRUCache:
+    """
+    Thread-safe cache with eviction of the least recently used entries. The
+    cache is limited by the total size of the stored entries in bytes, the size
+    of each entry is specified when it is added. Entries larger than the entire
+    cache are not stored.
+
+    Attributes:
+        max_bytes (int): cache size limit in bytes.
+        size (int): current size of the stored entries in bytes.
+        hits (int): number of successful lookups.
+        misses (int): number of unsuccessful lookups.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes (int): cache size limit in bytes.
+        """
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value stored by the key and marks it as recently used.
+
+        Args:
+            key (Hashable): entry key.
+            default (Any, optional): the value returned if there is no entry.
+                Defaults to None.
+
+        Returns:
+            Any: stored value or default.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        """
+        Adds an entry to the cache, evicting the least recently used entries if
+        the limit is exceeded.
+
+        Args:
+            key (Hashable): entry key.
+            value (Any): stored value.
+            size (int): size of the entry in bytes.
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def clear(self) -> None:
+        """
+        Removes all entries from the cache. Statistics are not reset.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns cache usage statistics.
+
+        Returns:
+            dict[str, int]: number of entries, their size, number of hits and
+                misses.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,11 +1,20 @@
 import inspect
+import sys
 from asyncio import to_thread
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Mapping
 from functools import wraps
 from inspect import iscoroutinefunction, isfunction
+from numbers import Number
 from typing import Any, Literal, ParamSpec, TypeVar
 
-__all__ = ["SizeUnit", "make_async", "scale_bytes", "to_async"]
+__all__ = [
+    "SizeUnit",
+    "count_rows",
+    "estimate_size",
+    "make_async",
+    "scale_bytes",
+    "to_async",
+]
 
 _T = TypeVar("_T")
 _P = ParamSpec("_P")
@@ -72,5 +81,80 @@ def scale_bytes(sz: int | float, unit: SizeUnit) -> int | float:
         )
 
 
+def count_rows(dataobj: Any) -> int | None:
+    """
+    Returns the number of rows (records) in a data object if it can be
+    determined. For dataframes this is the height of the frame, for lists and
+    other sequences of records - the number of elements. A mapping (for
+    example, a single JSON record), a string, bytes or a number is one row.
+
+    Args:
+        dataobj (Any): any data object.
+
+    Returns:
+        int | None: number of rows or None if the object has no length.
+    """
+    if isinstance(
+        dataobj, (Mapping, str, bytes, bytearray, memoryview, Number)
+    ):
+        return 1
+    try:
+        return len(dataobj)
+    except TypeError:
+        return None
+
+
+def estimate_size(dataobj: Any) -> int:
+    """
+    Returns an estimate of the amount of memory occupied by a data object in
+    bytes without serializing it. Dataframes (polars, pandas) and arrow tables
+    report their own size; dicts, lists, tuples and sets are measured together
+    with all the objects they contain (each object is counted once); for other
+    objects the size of the object itself is used.
+
+    Args:
+        dataobj (Any): any data object.
+
+    Returns:
+        int: estimated size in bytes.
+    """
+    if isinstance(dataobj, (dict, list, tuple, set, frozenset)):
+        return _container_size(dataobj)
+    if isinstance(dataobj, (bytes, bytearray, memoryview)):
+        return len(dataobj)
+    if hasattr(dataobj, "estimated_size"):
+        return int(dataobj.estimated_size())
+    if hasattr(dataobj, "memory_usage"):
+        return int(dataobj.memory_usage(deep=True).sum())
+    if hasattr(dataobj, "nbytes"):
+        return int(dataobj.nbytes)
+    return sys.getsizeof(dataobj)
+
+
+def _container_size(container: Any) -> int:
+    """
+    Sums the sizes of the container and of all the objects reachable from it
+    without recursion, counting shared objects once.
+    """
+    seen: set[int] = set()
+    stack: list[Any] = [container]
+    total: int = 0
+    while stack:
+        obj: Any = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, dict):
+            total += sys.getsizeof(obj)
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            total += sys.getsizeof(obj)
+            stack.extend(obj)
+        else:
+            total += estimate_size(obj)
+    return total
+
+
 if __name__ == "__name__":
     ...
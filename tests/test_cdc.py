@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from byteflows.contentio import ChangeCapture
+
+pl = pytest.importorskip("polars")
+
+
+@pytest.fixture
+def cdc(tmp_path: Path) -> Iterator[ChangeCapture]:
+    capture = ChangeCapture(db_path=tmp_path / "cdc.db")
+    yield capture
+    capture.close()
+
+
+def test_index_is_updated_only_on_commit(cdc: ChangeCapture) -> None:
+    frame = pl.DataFrame({"id": [1, 2], "value": ["a", "b"]})
+    changes, pending = cdc.diff("q", frame, ["id"])
+    assert changes["op"].to_list() == ["insert", "insert"]
+    changes, pending = cdc.diff("q", frame, ["id"])
+    assert changes["op"].to_list() == ["insert", "insert"]
+    cdc.commit([pending])
+    changes, _ = cdc.diff("q", frame, ["id"])
+    assert changes.height == 0
+
+
+def test_finish_run_reports_deletes(cdc: ChangeCapture) -> None:
+    _, pending = cdc.diff("q", pl.DataFrame({"id": [1, 2]}), ["id"])
+    cdc.commit([pending])
+    assert cdc.finish_run("q", ["id"]) is None
+    _, pending = cdc.diff("q", pl.DataFrame({"id": [1]}), ["id"])
+    cdc.commit([pending])
+    deleted = cdc.finish_run("q", ["id"])
+    assert deleted.to_dicts() == [{"id": 2, "op": "delete"}]
+
+
+def test_finish_run_without_deletes(cdc: ChangeCapture) -> None:
+    _, pending = cdc.diff("q", pl.DataFrame({"id": [1, 2]}), ["id"])
+    cdc.commit([pending])
+    cdc.finish_run("q", ["id"], deletes=False)
+    _, pending = cdc.diff("q", pl.DataFrame({"id": [1]}), ["id"])
+    cdc.commit([pending])
+    assert cdc.finish_run("q", ["id"], deletes=False) is None
+    assert cdc.last_runs["q"]["delete"] == 0
+    changes, _ = cdc.diff("q", pl.DataFrame({"id": [2]}), ["id"])
+    assert changes.height == 0
+
+
+def test_record_hashes_do_not_depend_on_polars() -> None:
+    from byteflows.contentio.cdc import _polars_hashes, _record_hash
+
+    frame = pl.DataFrame({"id": [1, 2], "value": ["a", None]})
+    keys, rows = _polars_hashes(frame, ["id"])
+    assert keys == [_record_hash([1]), _record_hash([2])]
+    assert rows == [_record_hash([1, "a"]), _record_hash([2, None])]
+    assert _record_hash([1]) == -8507376505167739687
+    assert len(set(keys + rows)) == 4
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+from io import BytesIO
+
+import pytest
+
+from byteflows.contentio import IOContext, create_datatype
+from byteflows.data_collectors import ApiDataCollector
+from byteflows.resources import ApiRequest, ApiResource, EndpointPath
+from byteflows.storages.blob import FsBlobStorage
+
+pytest.importorskip("morefs.asyn_local")
+
+_decoded: list[bytes] = []
+
+
+def _read_repr(content: bytes) -> dict:
+    _decoded.append(content)
+    return eval(content)
+
+
+def _write_repr(data: dict, file: BytesIO) -> None:
+    file.write(repr(data).encode())
+
+
+def mark_clean(data: dict) -> dict:
+    return {**data, "clean": True}
+
+
+def _storage() -> FsBlobStorage:
+    return FsBlobStorage().configure(
+        engine_proto="asynclocal",
+        engine_params={},
+        bufferize=True,
+        limit_type="count",
+        limit_capacity=100,
+    )
+
+
+def test_one_response_fans_out_to_io_contexts() -> None:
+    create_datatype(
+        format_name="test_fanout",
+        input_func=_read_repr,
+        output_func=_write_repr,
+        replace=True,
+    )
+    raw = IOContext(
+        in_format="test_fanout", out_format="test_fanout", storage=_storage()
+    )
+    clean = IOContext(
+        in_format="test_fanout", out_format="test_fanout", storage=_storage()
+    )
+    clean.attache_pipeline().step(1)(mark_clean)
+    resource = ApiResource("https://example.com", eor_triggers=[])
+    query = ApiRequest("q", EndpointPath("q", resource.url), [raw, clean])
+    collector = ApiDataCollector(query, resource)
+    assert [branch.name for branch in collector.branches] == ["q", "q.1"]
+    _decoded.clear()
+    asyncio.run(collector.dispatch([b"{'a': 1}", b"{'a': 2}"]))
+    assert _decoded == [b"{'a': 1}", b"{'a': 2}"]
+    raw_buf, clean_buf = (
+        branch._write_channel for branch in collector.branches
+    )
+    assert raw_buf is not clean_buf
+    assert sorted(raw_buf.queue.values(), key=str) == [{"a": 1}, {"a": 2}]
+    assert sorted(clean_buf.queue.values(), key=str) == [
+        {"a": 1, "clean": True},
+        {"a": 2, "clean": True},
+    ]
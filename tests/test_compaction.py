@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from byteflows.contentio import create_datatype
+from byteflows.scheduling.timeinterval import AlwaysRun
+from byteflows.storages.blob import FsBlobStorage
+from byteflows.storages.compaction import BlobCompactor
+from byteflows.storages.manifest import ManifestEntry
+
+pytest.importorskip("morefs.asyn_local")
+
+
+def _write_rows(data: list, file: BytesIO) -> None:
+    file.write(repr(data).encode())
+
+
+def _read_rows(content: bytes) -> list:
+    return eval(content)
+
+
+def _merge_rows(dataobjs: list[list]) -> list:
+    return [row for rows in dataobjs for row in rows]
+
+
+@pytest.fixture
+def storage() -> FsBlobStorage:
+    create_datatype(
+        format_name="test_rows",
+        input_func=_read_rows,
+        output_func=_write_rows,
+        merge_func=_merge_rows,
+        replace=True,
+    )
+    return FsBlobStorage().configure(
+        engine_proto="asynclocal", engine_params={}
+    )
+
+
+def _compactor(
+    storage: FsBlobStorage, prefix: str, **params: int
+) -> BlobCompactor:
+    return BlobCompactor(
+        storage,
+        prefix,
+        content_format="test_rows",
+        condition=AlwaysRun(),
+        **params,
+    )
+
+
+def test_plan_splits_groups_into_chunks(storage: FsBlobStorage) -> None:
+    compactor = _compactor(storage, "p", target_size=1, max_objects=3)
+    compactor.stats = {"groups": 0}
+    candidates: dict[str, int] = {f"a/{idx}.test_rows": 10 for idx in range(7)}
+    candidates.update({"b/0.test_rows": 10, "c/0.test_rows": 700_000})
+    candidates.update({"c/1.test_rows": 700_000, "c/2.test_rows": 10})
+    plan = list(compactor._plan(candidates))
+    assert plan == [
+        ("a", ["a/0.test_rows", "a/1.test_rows", "a/2.test_rows"]),
+        ("a", ["a/3.test_rows", "a/4.test_rows", "a/5.test_rows"]),
+        ("c", ["c/1.test_rows", "c/2.test_rows"]),
+    ]
+    assert compactor.stats["groups"] == 2
+
+
+def test_compact_chunk_updates_manifest(
+    storage: FsBlobStorage, tmp_path: Path
+) -> None:
+    manifest = storage.attache_manifest(":memory:")
+    sources: list[str] = []
+    for idx in range(3):
+        path: Path = tmp_path / f"{idx}.test_rows"
+        path.write_bytes(repr([idx]).encode())
+        sources.append(str(path))
+    manifest.record(
+        ManifestEntry(path, "q", 3, 1, 10.0 + idx, 20.0, "")
+        for idx, path in enumerate(sources)
+    )
+    compactor = _compactor(storage, str(tmp_path))
+    stats = asyncio.run(compactor.compact())
+    assert stats["sources"] == 3
+    assert stats["written"] == 1
+    (target,) = tmp_path.iterdir()
+    assert eval(target.read_bytes()) == [0, 1, 2]
+    (entry,) = manifest.entries(prefix=str(tmp_path))
+    assert entry.path == str(target)
+    assert (entry.query, entry.rows, entry.buffered_at) == ("q", 3, 10.0)
+    assert entry.size == target.stat().st_size
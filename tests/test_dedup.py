@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from byteflows.contentio import ContentDeduplicator
+
+
+def test_digests_are_staged_until_commit(tmp_path: Path) -> None:
+    db_path: Path = tmp_path / "seen.sqlite"
+    dedup = ContentDeduplicator(db_path=db_path)
+    mask, digests = dedup.filter_new("q", [b"a", b"b", b"a"])
+    assert mask == [True, True, False]
+    assert len(digests) == 2
+    assert dedup.filter_new("q", [b"a"]) == ([False], [])
+    dedup.close()
+    restarted = ContentDeduplicator(db_path=db_path)
+    assert restarted.filter_new("q", [b"a"])[0] == [True]
+    restarted.close()
+
+
+def test_rollback_and_commit(tmp_path: Path) -> None:
+    dedup = ContentDeduplicator(db_path=tmp_path / "seen.sqlite")
+    _, digests = dedup.filter_new("q", [b"a", b"b"])
+    dedup.rollback("q", digests)
+    mask, digests = dedup.filter_new("q", [b"a", b"b"])
+    assert mask == [True, True]
+    dedup.commit("q", digests)
+    assert dedup.filter_new("q", [b"a", b"b"]) == ([False, False], [])
+    assert dedup.filter_new("other", [b"a"])[0] == [True]
+    dedup.close()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from byteflows.storages.manifest import ManifestEntry, SqliteManifest
+
+
+def _entry(path: str, query: str, written_at: datetime) -> ManifestEntry:
+    stamp: float = written_at.timestamp()
+    return ManifestEntry(path, query, 1, None, stamp, stamp, "")
+
+
+def test_find_by_prefix_pattern_and_time() -> None:
+    manifest = SqliteManifest(":memory:")
+    manifest.record(
+        [
+            _entry("b/01/api/income_1.json", "income", datetime(2024, 1, 1)),
+            _entry("b/02/api/income_2.json", "income", datetime(2024, 1, 2)),
+            _entry("b/02/api/prices_1.json", "prices", datetime(2024, 1, 3)),
+            _entry("c/01/api/income_3.json", "income", datetime(2024, 1, 4)),
+        ]
+    )
+    assert manifest.find(prefix="b/02/") == [
+        "b/02/api/income_2.json",
+        "b/02/api/prices_1.json",
+    ]
+    assert manifest.find(prefix="b/", pattern="*/api/income_*") == [
+        "b/01/api/income_1.json",
+        "b/02/api/income_2.json",
+    ]
+    assert manifest.find(
+        since=datetime(2024, 1, 2), until=datetime(2024, 1, 4)
+    ) == ["b/02/api/income_2.json", "b/02/api/prices_1.json"]
+    assert manifest.find(query="income", since=datetime(2024, 1, 2)) == [
+        "b/02/api/income_2.json",
+        "c/01/api/income_3.json",
+    ]
+    manifest.remove(["b/01/api/income_1.json"])
+    assert manifest.find(pattern="*income_1*") == []
+    manifest.close()
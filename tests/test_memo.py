@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import pytest
+
+from byteflows.contentio import object_digest
+
+pl = pytest.importorskip("polars")
+
+
+def test_polars_digest_depends_on_content() -> None:
+    frame = pl.DataFrame({"id": [1, 2], "value": ["a", None]})
+    assert object_digest(frame) == object_digest(frame.clone())
+    assert object_digest(frame) != object_digest(frame.reverse())
+    assert object_digest(frame) != object_digest(
+        frame.rename({"value": "other"})
+    )
+    assert object_digest(frame.head(0)) != object_digest(frame)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from byteflows.scheduling import memory
+from byteflows.scheduling.memory import MemoryMonitor
+
+MB: int = 1024**2
+
+
+@pytest.fixture
+def rss(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    value: list[int] = [0]
+    monkeypatch.setattr(memory, "process_rss", lambda: value[0])
+    return value
+
+
+def test_states_are_left_below_resume_limit(rss: list[int]) -> None:
+    monitor = MemoryMonitor(0.75, 0.9, memory_limit=100, alert=lambda x: None)
+    rss[0] = 95 * MB
+    assert monitor.check() == "hard"
+    assert not monitor.fetch_allowed.is_set()
+    rss[0] = 80 * MB
+    assert monitor.check() == "hard"
+    rss[0] = 72 * MB
+    assert monitor.check() == "hard"
+    rss[0] = 69 * MB
+    assert monitor.check() == "normal"
+    assert monitor.fetch_allowed.is_set()
+    rss[0] = 72 * MB
+    assert monitor.check() == "normal"
+    rss[0] = 76 * MB
+    assert monitor.check() == "soft"
+    rss[0] = 72 * MB
+    assert monitor.check() == "soft"
+
+
+def test_pause_is_limited(rss: list[int]) -> None:
+    monitor = MemoryMonitor(
+        memory_limit=100, max_pause=0, alert=lambda x: None
+    )
+    rss[0] = 95 * MB
+    assert monitor.check() == "hard"
+    assert not monitor.fetch_allowed.is_set()
+    assert monitor.check() == "hard"
+    assert monitor.fetch_allowed.is_set()
+    assert monitor.scale_batch(10, 2) == 2
+
+
+class _Buffer:
+    def __init__(self, memory_size: float, *, fail: bool = False) -> None:
+        self.size: int = 1
+        self.memory_size: float = memory_size
+        self.flushing: bool = False
+        self.fail: bool = fail
+        self.flushes: int = 0
+
+    def schedule_flush(self) -> asyncio.Task:
+        self.flushing = True
+        self.flushes += 1
+        return asyncio.create_task(self._merge())
+
+    async def _merge(self) -> None:
+        self.flushing = False
+        if self.fail:
+            raise OSError("upload failed")
+        self.size = 0
+
+
+class _Dispatcher:
+    def __init__(self, buffers: list[_Buffer]) -> None:
+        self.buffers: list[_Buffer] = buffers
+
+    def get_buffers(self) -> list[_Buffer]:
+        return list(self.buffers)
+
+
+class _Storage:
+    def __init__(self, *buffers: _Buffer) -> None:
+        self.mem_buffer = _Dispatcher(list(buffers))
+        self.mem_alloc: float = sum(buf.memory_size for buf in buffers)
+
+
+def test_soft_flush_skips_small_buffers(rss: list[int]) -> None:
+    monitor = MemoryMonitor(memory_limit=100, min_flush_size=1)
+    small, tiny = _Buffer(0.5), _Buffer(0.2)
+    large, failing = _Buffer(2), _Buffer(3, fail=True)
+    monitor.watch(_Storage(small, tiny), _Storage(large), _Storage(failing))
+    rss[0] = 80 * MB
+
+    async def check() -> None:
+        assert monitor.check() == "soft"
+        assert len(monitor._flushes) == 2
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    asyncio.run(check())
+    assert (small.flushes, tiny.flushes) == (0, 0)
+    assert (large.flushes, failing.flushes) == (1, 1)
+    assert large.size == 0
+    assert not monitor._flushes
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import pytest
+
+from byteflows.contentio import (
+    IOBoundPipeline,
+    IOContext,
+    StepProfiler,
+    StepSample,
+    create_datatype,
+)
+from byteflows.storages.blob import FsBlobStorage
+
+pl = pytest.importorskip("polars")
+DataFrame = pl.DataFrame
+
+
+def read_ipc(content: bytes) -> DataFrame:
+    return pl.read_ipc(content)
+
+
+def write_ipc(data: DataFrame, file: BytesIO) -> None:
+    data.write_ipc(file)
+
+
+def add_one(frame: DataFrame) -> DataFrame:
+    return frame.with_columns(pl.col("id") + 1)
+
+
+def drop_empty(frames: list[DataFrame]) -> list[DataFrame]:
+    return [frame for frame in frames if frame.height]
+
+
+def double(frame: DataFrame) -> DataFrame:
+    return frame.with_columns(pl.col("id") * 2)
+
+
+def scale(frame: DataFrame, factor: int = 1) -> DataFrame:
+    return frame.with_columns(pl.col("id") * factor)
+
+
+def explode(frame: DataFrame) -> Iterator[DataFrame]:
+    for idx in range(frame.height):
+        if frame["id"][idx] % 2:
+            yield frame.slice(idx, 1)
+
+
+async def enrich(frame: DataFrame) -> DataFrame:
+    await asyncio.sleep(0.01 * frame["id"][0])
+    return frame.with_columns(pl.lit("x").alias("tag"))
+
+
+def check_not_empty(frame: DataFrame) -> DataFrame:
+    if frame.is_empty():
+        raise ValueError("empty frame")
+    return frame
+
+
+def _pipeline(mode: str = "per_object") -> IOBoundPipeline:
+    create_datatype(
+        format_name="test_ipc",
+        input_func=read_ipc,
+        output_func=write_ipc,
+        merge_func=pl.concat,
+        replace=True,
+    )
+    io_context = IOContext(
+        in_format="test_ipc", out_format="test_ipc", storage=FsBlobStorage()
+    )
+    return io_context.attache_pipeline(mode)
+
+
+def _transform(pipeline: IOBoundPipeline, batch: list) -> list:
+    async def run() -> list:
+        async with pipeline.run_transform(batch) as future:
+            return await future
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("mode", ["per_object", "fused"])
+def test_batch_steps_in_both_modes(mode: str) -> None:
+    pipeline = _pipeline(mode)
+    pipeline.step(1)(add_one)
+    pipeline.step(2, batch=True)(drop_empty)
+    pipeline.step(3, batch=True, merge=True)(double)
+    batch = [
+        pl.DataFrame({"id": [1, 2]}),
+        pl.DataFrame({"id": []}, schema={"id": pl.Int64}),
+        pl.DataFrame({"id": [3]}),
+    ]
+    (result,) = _transform(pipeline, batch)
+    assert result["id"].to_list() == [4, 6, 8]
+    assert [kind for kind, _ in pipeline._compile()] == (
+        ["batch"] if mode == "fused" else ["object", "batch", "batch"]
+    )
+
+
+def test_process_executor_transfers_frames() -> None:
+    pipeline = _pipeline()
+    pipeline.step(1)(add_one)
+    pipeline.step(2, extra_kwargs={"factor": 3})(scale)
+    pipeline.use_executor("process", 2)
+    assert isinstance(pipeline._pool, ProcessPoolExecutor)
+    try:
+        result = _transform(pipeline, [pl.DataFrame({"id": [1, 2]})])
+    finally:
+        pipeline.shutdown_executor()
+    assert [frame["id"].to_list() for frame in result] == [[6, 9]]
+    assert pipeline.executor == "thread"
+
+
+def test_async_and_generator_steps_are_streamed() -> None:
+    pipeline = _pipeline()
+    pipeline.step(1)(explode)
+    pipeline.step(2)(enrich)
+    batch = [pl.DataFrame({"id": [5, 2, 3]}), pl.DataFrame({"id": [1]})]
+
+    async def stream() -> list[list[int]]:
+        return [
+            [frame["id"][0] for frame in outputs]
+            async for outputs in pipeline.stream_transform(batch)
+        ]
+
+    assert asyncio.run(stream()) == [[1], [5, 3]]
+    (result,) = _transform(pipeline, [pl.DataFrame({"id": [1, 2]})])
+    assert result.to_dicts() == [{"id": 1, "tag": "x"}]
+    with pytest.raises(ValueError):
+        pipeline.step(3, batch=True)(enrich)
+
+
+def test_profiler_totals_include_errors() -> None:
+    profiler = StepProfiler(window=2)
+    profiler.extend(
+        [
+            StepSample("step", 1.0, 0.5, 10, 100, 10, 80),
+            StepSample("step", 3.0, None, 5, 50, 0, 0, "ValueError()"),
+            StepSample("step", 2.0, 1.0, 5, 50, 5, 40),
+        ]
+    )
+    report = profiler.report()["step"]
+    assert report["calls"] == 3
+    assert report["errors"] == 1
+    assert report["last_error"] == "ValueError()"
+    assert report["wall_total"] == 6.0
+    assert report["cpu_total"] == 1.5
+    assert (report["rows_in"], report["rows_out"]) == (20, 15)
+    assert report["rows_per_sec"] == 20 / 6
+    assert report["wall"]["max"] == 3.0
+    assert report["cpu"]["p50"] == 1.0
+
+
+def test_pipeline_profiles_failed_calls() -> None:
+    pipeline = _pipeline()
+    pipeline.step(1)(check_not_empty)
+    profiler = pipeline.enable_profiling()
+    _transform(pipeline, [pl.DataFrame({"id": [1, 2]})])
+    with pytest.raises(ValueError, match="empty frame"):
+        _transform(pipeline, [pl.DataFrame({"id": []})])
+    report = profiler.report()["check_not_empty"]
+    assert (report["calls"], report["errors"]) == (2, 1)
+    assert report["last_error"] == repr(ValueError("empty frame"))
+    assert (report["rows_in"], report["rows_out"]) == (3, 2)
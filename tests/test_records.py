@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from io import BytesIO
+from itertools import chain, repeat
+
+import pytest
+
+from byteflows.contentio import (
+    RESPONSE_COL,
+    create_datatype,
+    dedup_records,
+    deserialize_many,
+    split_tagged,
+)
+
+pl = pytest.importorskip("polars")
+
+
+def read_ndjson(content: bytes) -> pl.DataFrame:
+    return pl.read_ndjson(content)
+
+
+def read_ndjson_many(contents: list[bytes]) -> pl.DataFrame:
+    lines: list[bytes] = [content.rstrip(b"\n") for content in contents]
+    counts: list[int] = [
+        line.count(b"\n") + 1 if line else 0 for line in lines
+    ]
+    frame: pl.DataFrame = pl.read_ndjson(b"\n".join(filter(None, lines)))
+    tags: list[int] = list(
+        chain.from_iterable(
+            repeat(idx, count) for idx, count in enumerate(counts)
+        )
+    )
+    return frame.with_columns(pl.Series(RESPONSE_COL, tags, pl.UInt32))
+
+
+def write_ndjson(data: pl.DataFrame, file: BytesIO) -> None:
+    data.write_ndjson(file)
+
+
+def test_polars_split_tagged() -> None:
+    frame = pl.DataFrame({"a": [1, 2, 3], RESPONSE_COL: [0, 0, 2]})
+    parts = split_tagged(frame, 3)
+    assert parts is not None
+    assert [part.height for part in parts] == [2, 0, 1]
+    assert all(part.columns == ["a"] for part in parts)
+    assert parts[0]["a"].to_list() == [1, 2]
+    assert parts[2]["a"].to_list() == [3]
+
+
+def test_pandas_split_tagged() -> None:
+    pd = pytest.importorskip("pandas")
+    frame = pd.DataFrame({"a": [1, 2, 3], RESPONSE_COL: [0, 0, 2]})
+    parts = split_tagged(frame, 3)
+    assert parts is not None
+    assert [len(part) for part in parts] == [2, 0, 1]
+    assert all(list(part.columns) == ["a"] for part in parts)
+    assert parts[2]["a"].tolist() == [3]
+
+
+def test_deserialize_many_polars() -> None:
+    create_datatype(
+        format_name="test_ndjson_batch",
+        input_func=read_ndjson,
+        output_func=write_ndjson,
+        batch_input_func=read_ndjson_many,
+        replace=True,
+    )
+    contents: list[bytes] = [b'{"id": 1}\n{"id": 2}\n', b"", b'{"id": 3}']
+    frames = deserialize_many(contents, "test_ndjson_batch")
+    assert len(frames) == 3
+    assert frames[0]["id"].to_list() == [1, 2]
+    assert frames[1].height == 0
+    assert frames[2]["id"].to_list() == [3]
+    assert all(RESPONSE_COL not in frame.columns for frame in frames)
+
+
+@pytest.mark.parametrize("keep", ["first", "last"])
+def test_polars_dedup_records_across_frames(keep: str) -> None:
+    frames = [
+        pl.DataFrame({"id": [1, 2], "value": ["a", "b"]}),
+        pl.DataFrame({"id": [2, 3], "value": ["c", "d"]}),
+        pl.DataFrame({"id": [1], "value": ["e"]}),
+    ]
+    result = dedup_records(frames, ["id"], keep)
+    assert result is not None
+    if keep == "first":
+        expected = [["a", "b"], ["d"], []]
+    else:
+        expected = [[], ["c", "d"], ["e"]]
+    assert [frame["value"].to_list() for frame in result] == expected
+    assert dedup_records([{"id": 1}], ["id"]) is None
+
+
+def test_pandas_dedup_records_across_frames() -> None:
+    pd = pytest.importorskip("pandas")
+    frames = [
+        pd.DataFrame({"id": [1, 2], "value": ["a", "b"]}),
+        pd.DataFrame({"id": [2], "value": ["c"]}),
+    ]
+    result = dedup_records(frames, ["id"], "last")
+    assert result is not None
+    assert [frame["value"].tolist() for frame in result] == [["a"], ["c"]]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+from io import BytesIO
+from typing import Any
+
+import pytest
+
+from byteflows.contentio import (
+    SchemaLearner,
+    count_json_fields,
+    create_datatype,
+)
+
+pl = pytest.importorskip("polars")
+
+
+def read_ndjson(
+    content: bytes, schema: dict[str, Any] | None = None
+) -> pl.DataFrame:
+    return pl.read_ndjson(content, schema=schema)
+
+
+def read_envelope(
+    content: bytes, schema: dict[str, Any] | None = None
+) -> pl.DataFrame:
+    return pl.DataFrame(json.loads(content)["data"], schema=schema)
+
+
+def write_ndjson(data: pl.DataFrame, file: BytesIO) -> None:
+    data.write_ndjson(file)
+
+
+def make_response(rows: int, **extra: Any) -> bytes:
+    return "\n".join(
+        json.dumps({"x": row, "y": f"v{row}", **extra}) for row in range(rows)
+    ).encode()
+
+
+@pytest.fixture(scope="module")
+def formats() -> None:
+    create_datatype(
+        format_name="test_schema_ndjson",
+        input_func=read_ndjson,
+        output_func=write_ndjson,
+        replace=True,
+    )
+    create_datatype(
+        format_name="test_schema_envelope",
+        input_func=read_envelope,
+        output_func=write_ndjson,
+        replace=True,
+    )
+
+
+def test_count_json_fields() -> None:
+    assert count_json_fields(b'[{"a": 1, "b": 2}, {"a": 3}]') == 3
+    assert count_json_fields(memoryview(b'{"a": 1}\n{"c": 2}\n')) == 2
+    assert count_json_fields(b"a,b\n1,2\n") == 0
+
+
+@pytest.mark.usefixtures("formats")
+def test_new_column_is_not_dropped() -> None:
+    learner = SchemaLearner(sample=2, verify_every=0)
+    for _ in range(4):
+        frame = learner.decode("q", make_response(3), "test_schema_ndjson")
+    assert learner.schema_for("q") is not None
+    assert learner.stats["q"]["reused"] == 2
+    frame = learner.decode("q", make_response(3, z=1), "test_schema_ndjson")
+    assert frame["z"].to_list() == [1, 1, 1]
+    assert learner.stats["q"]["drifts"] == 1
+    for _ in range(3):
+        frame = learner.decode(
+            "q", make_response(3, z=2), "test_schema_ndjson"
+        )
+        assert frame["z"].to_list() == [2, 2, 2]
+    assert "z" in learner.schema_for("q")
+
+
+@pytest.mark.usefixtures("formats")
+def test_envelope_fields_are_tolerated() -> None:
+    learner = SchemaLearner(sample=1, verify_every=0)
+    content: bytes = json.dumps(
+        {"data": [{"x": 1, "y": "a"}, {"x": 2, "y": "b"}]}
+    ).encode()
+    for _ in range(4):
+        frame = learner.decode("q", content, "test_schema_envelope")
+        assert frame.columns == ["x", "y"]
+    assert learner.stats["q"] == {"inferred": 1, "reused": 3, "drifts": 0}
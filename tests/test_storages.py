@@ -0,0 +1,492 @@
+from __future__ import annotations
+
+import asyncio
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from byteflows.contentio import (
+    CompressedPayload,
+    IOContext,
+    available_codecs,
+    compress_object,
+    create_datatype,
+)
+from byteflows.core import SfnUndefined
+from byteflows.data_collectors.base import CollectorBranch
+from byteflows.entrypoint import EntryPoint
+from byteflows.storages.base import ContentQueue, EnginePool
+from byteflows.storages.blob import FsBlobStorage
+
+pytest.importorskip("morefs.asyn_local")
+
+
+def _write_repr(data: dict, file: BytesIO) -> None:
+    file.write(repr(data).encode())
+
+
+def _read_repr(content: bytes) -> dict:
+    return eval(content)
+
+
+def _register_repr_format() -> None:
+    create_datatype(
+        format_name="test_repr",
+        input_func=_read_repr,
+        output_func=_write_repr,
+        replace=True,
+    )
+
+
+class _Session:
+    closed: bool = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_configure_replaces_engine_pool() -> None:
+    async def reconfigure() -> None:
+        storage = FsBlobStorage()
+        storage.configure(
+            engine_proto="asynclocal", engine_params={}, engine_pool_size=3
+        )
+        assert storage.engine_pool is not None
+        assert storage.engine_pool.size == 3
+        sessions: list[_Session] = [_Session(), _Session()]
+        storage._sessions = list(sessions)
+        storage.active_session = True
+        storage.configure(engine_proto="asynclocal", engine_params={})
+        await asyncio.sleep(0)
+        assert storage.engine_pool is None
+        assert not storage.active_session
+        assert all(session.closed for session in sessions)
+
+    asyncio.run(reconfigure())
+
+
+def test_is_throttled_checks_error_codes() -> None:
+    from byteflows.storages.blob import _is_throttled
+
+    ClientError = pytest.importorskip("botocore.exceptions").ClientError
+
+    def client_error(code: str, status: int) -> Exception:
+        return ClientError(
+            {
+                "Error": {"Code": code, "Message": "503 bytes written"},
+                "ResponseMetadata": {"HTTPStatusCode": status},
+            },
+            "PutObject",
+        )
+
+    assert _is_throttled(client_error("SlowDown", 503))
+    assert _is_throttled(client_error("InternalError", 429))
+    assert not _is_throttled(client_error("AccessDenied", 403))
+    assert not _is_throttled(OSError("object 503.json not found"))
+    wrapped = OSError(5, "SlowDown")
+    wrapped.__cause__ = client_error("SlowDown", 503)
+    assert _is_throttled(wrapped)
+
+
+class _FakeS3:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.cancelled: int = 0
+
+    def split_path(self, path: str) -> tuple[str, str, None]:
+        bucket, _, key = path.partition("/")
+        return bucket, key, None
+
+    async def _call_s3(self, method: str, **kwargs: object) -> dict:
+        self.calls.append(method)
+        if method == "create_multipart_upload":
+            return {"UploadId": "1"}
+        if method == "upload_part":
+            if kwargs["PartNumber"] == 1:
+                raise OSError("part failed")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        return {}
+
+
+def test_multipart_upload_cancels_parts_on_failure() -> None:
+    storage = FsBlobStorage(write_retries=0)
+    storage.part_size = 5
+    engine = _FakeS3()
+    content: bytes = bytes(3 * 5 * 1024**2)
+    with pytest.raises(OSError, match="part failed"):
+        asyncio.run(storage._multipart_upload(engine, "b/key", content))
+    assert engine.cancelled == 2
+    assert engine.calls[-1] == "abort_multipart_upload"
+
+
+def test_multipart_upload_rejects_small_parts() -> None:
+    storage = FsBlobStorage()
+    storage.part_size = 1
+    engine = _FakeS3()
+    with pytest.raises(ValueError):
+        asyncio.run(storage._multipart_upload(engine, "b/key", b"data"))
+    assert engine.calls == []
+
+
+def test_stream_upload_uses_sync_engine(tmp_path: Path) -> None:
+    _register_repr_format()
+    storage = FsBlobStorage().configure(
+        engine_proto="asynclocal",
+        engine_params={},
+        stream_threshold=0,
+        part_size=1,
+        executor=None,
+    )
+    assert storage.stream_threshold == 0
+    buf = ContentQueue(storage, "test_repr", "test_repr", "q")
+    path: str = str(tmp_path / "obj.txt")
+
+    async def upload() -> None:
+        entry = await storage._upload(buf, path, {"a": 1}, asyncio.Semaphore())
+        assert entry.size == len(repr({"a": 1}))
+
+    asyncio.run(upload())
+    assert (tmp_path / "obj.txt").read_bytes() == b"{'a': 1}"
+    assert storage._sync_engine is not None
+    assert not storage._sync_engine.asynchronous
+
+
+def test_configure_rejects_small_s3_parts() -> None:
+    pytest.importorskip("s3fs")
+    with pytest.raises(ValueError):
+        FsBlobStorage().configure(
+            engine_proto="s3", engine_params={"anon": True}, part_size=1
+        )
+
+
+def test_stale_buffer_is_flushed_without_new_content(tmp_path: Path) -> None:
+    _register_repr_format()
+    storage = FsBlobStorage().configure(
+        engine_proto="asynclocal",
+        engine_params={},
+        bufferize=True,
+        limit_type="adaptive",
+        limit_capacity=100,
+        limit_params={"max_staleness": 0.2},
+    )
+    buf = ContentQueue(storage, "test_repr", "test_repr", "q")
+    path: Path = tmp_path / "obj.txt"
+
+    async def ingest() -> None:
+        await buf.parse_content([(str(path), {"a": 1})])
+        assert buf.size == 1
+        await asyncio.sleep(0.5)
+
+    asyncio.run(ingest())
+    assert buf.size == 0
+    assert path.read_bytes() == b"{'a': 1}"
+
+
+def test_read_many_uses_cached_none(tmp_path: Path) -> None:
+    _register_repr_format()
+    storage = FsBlobStorage().configure(
+        engine_proto="asynclocal", engine_params={}
+    )
+    storage.attache_cache()
+    path: Path = tmp_path / "obj.test_repr"
+    path.write_bytes(b"None")
+    reads: list[list[str]] = []
+    cat = storage.engine._cat
+
+    async def counting_cat(paths: list[str], **kwargs: object) -> dict:
+        reads.append(paths)
+        return await cat(paths, **kwargs)
+
+    storage.engine._cat = counting_cat
+
+    async def read_twice() -> None:
+        for _ in range(2):
+            result = await storage.read_many([str(path)])
+            assert result == {str(path): None}
+
+    asyncio.run(read_twice())
+    assert len(reads) == 1
+
+
+class _PathProducer:
+    def __init__(self, root: Path) -> None:
+        self.root: Path = root
+        self.count: int = 0
+
+    def render_path(self, fmt: str) -> str:
+        self.count += 1
+        return str(self.root / f"{self.count}.{fmt}")
+
+
+class _Request:
+    def __init__(self, io_context: IOContext) -> None:
+        self.io_context: IOContext = io_context
+
+    def branch_name(self, io_context: IOContext) -> str:
+        return f"q_{io_context.out_format}"
+
+
+def _registered_buffer(storage: FsBlobStorage) -> ContentQueue:
+    io_context = IOContext(
+        in_format="test_repr", out_format="test_repr", storage=storage
+    )
+    return storage.create_buffer(_Request(io_context), io_context)
+
+
+def _branch(buf: ContentQueue, root: Path) -> CollectorBranch:
+    branch = object.__new__(CollectorBranch)
+    branch.name = buf.name
+    branch._write_channel = buf
+    branch.pipeline = SfnUndefined
+    branch.dedup = SfnUndefined
+    branch.output_format = buf.out_format
+    branch.path_producer = _PathProducer(root)
+    return branch
+
+
+@pytest.mark.parametrize(
+    "limit_capacity, buffer_capacity", [(100, 2), (3, None)]
+)
+def test_collector_write_schedules_flush(
+    tmp_path: Path, limit_capacity: int, buffer_capacity: int | None
+) -> None:
+    _register_repr_format()
+    storage = FsBlobStorage().configure(
+        engine_proto="asynclocal",
+        engine_params={},
+        bufferize=True,
+        limit_type="count",
+        limit_capacity=limit_capacity,
+        buffer_capacity=buffer_capacity,
+    )
+    buf: ContentQueue = _registered_buffer(storage)
+    branch: CollectorBranch = _branch(buf, tmp_path)
+
+    async def write() -> None:
+        for idx in range(4):
+            await branch.write_content([{"a": idx}])
+        await asyncio.sleep(0.2)
+
+    asyncio.run(write())
+    assert not buf.flushing
+    assert buf.size == 0
+    assert len(list(tmp_path.iterdir())) == 4
+
+
+def test_collector_write_flushes_on_adaptive_deadline(tmp_path: Path) -> None:
+    _register_repr_format()
+    storage = FsBlobStorage().configure(
+        engine_proto="asynclocal",
+        engine_params={},
+        bufferize=True,
+        limit_type="adaptive",
+        limit_capacity=100,
+        limit_params={"max_staleness": 0.2},
+    )
+    buf: ContentQueue = _registered_buffer(storage)
+    branch: CollectorBranch = _branch(buf, tmp_path)
+
+    async def write() -> None:
+        await branch.write_content([{"a": 1}, {"a": 2}])
+        assert buf.size == 2
+        await asyncio.sleep(0.5)
+
+    asyncio.run(write())
+    assert buf.size == 0
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_deadline_is_rechecked_during_upload(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("byteflows.storages.base._FLUSH_RETRY_DELAY", 0.1)
+    _register_repr_format()
+    storage = FsBlobStorage().configure(
+        engine_proto="asynclocal",
+        engine_params={},
+        bufferize=True,
+        limit_type="time",
+        limit_capacity=100,
+        buffer_capacity=0.1,
+    )
+    buf: ContentQueue = _registered_buffer(storage)
+    path: Path = tmp_path / "obj.txt"
+
+    async def ingest() -> None:
+        await buf.parse_content([(str(path), {"a": 1})])
+        with buf.uploading():
+            await asyncio.sleep(0.25)
+            assert buf.size == 1
+        await asyncio.sleep(0.25)
+
+    asyncio.run(ingest())
+    assert buf.size == 0
+    assert path.read_bytes() == b"{'a': 1}"
+
+
+def test_engine_pool_reuses_and_replaces_engines() -> None:
+    created: list[object] = []
+
+    def factory() -> object:
+        created.append(object())
+        return created[-1]
+
+    first = object()
+    pool = EnginePool(factory, 2, engines=[first])
+    assert pool.engines == [first, created[0]]
+
+    async def use(seen: list[object]) -> None:
+        async with pool.checkout() as engine:
+            seen.append(engine)
+            await asyncio.sleep(0.01)
+
+    async def run() -> None:
+        seen: list[object] = []
+        await asyncio.gather(*[use(seen) for _ in range(4)])
+        assert set(seen) == {first, created[0]}
+        assert pool.in_use == 0
+        with pytest.raises(ConnectionError):
+            async with pool.checkout() as engine:
+                raise ConnectionError
+        assert engine not in pool.engines
+        assert pool.size == 2
+        assert pool.in_use == 0
+
+    asyncio.run(run())
+    stats = pool.stats()
+    assert stats["checkouts"] == 5
+    assert stats["peak_in_use"] == 2
+    assert stats["replaced"] == 1
+    assert len(created) == 2
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_compressed_payload_round_trip(tmp_path: Path, codec: str) -> None:
+    _register_repr_format()
+    payload: CompressedPayload = compress_object(
+        [{"a": 1}, {"a": 2}], "test_repr", codec
+    )
+    assert payload.decode() == [{"a": 1}, {"a": 2}]
+    assert payload.raw_size == len(repr([{"a": 1}, {"a": 2}]))
+    assert payload.rows == 2
+    storage = FsBlobStorage().configure(
+        engine_proto="asynclocal", engine_params={}, buffer_compression=codec
+    )
+    buf = ContentQueue(storage, "test_repr", "test_repr", "q")
+    path: Path = tmp_path / "obj.txt"
+
+    async def flush() -> None:
+        await buf.parse_content([(str(path), {"a": 1})])
+        assert isinstance(buf.queue[str(path)], CompressedPayload)
+        assert buf.get_content(str(path)) == {"a": 1}
+        await storage.merge_to_backend(buf)
+
+    asyncio.run(flush())
+    assert path.read_bytes() == b"{'a': 1}"
+
+
+class _Collector:
+    def __init__(self, storage: FsBlobStorage) -> None:
+        self._name: str = "collector"
+        self.storages: list[FsBlobStorage] = [storage]
+        self.in_flight: int = 1
+
+    async def start(self) -> None:
+        await asyncio.sleep(0.1)
+        self.in_flight = 0
+        await asyncio.sleep(10)
+
+
+def test_drain_flushes_buffers_after_in_flight_batches(tmp_path: Path) -> None:
+    _register_repr_format()
+    storage = FsBlobStorage().configure(
+        engine_proto="asynclocal",
+        engine_params={},
+        bufferize=True,
+        limit_type="count",
+        limit_capacity=100,
+    )
+    buf: ContentQueue = _registered_buffer(storage)
+    collector = _Collector(storage)
+    app = EntryPoint(drain_timeout=5)
+    path: Path = tmp_path / "obj.txt"
+
+    async def shutdown() -> asyncio.Task:
+        await buf.parse_content([(str(path), {"a": 1})])
+        assert buf.size == 1
+        task = asyncio.create_task(collector.start(), name=collector._name)
+        await app._drain([collector])
+        return task
+
+    task: asyncio.Task = asyncio.run(shutdown())
+    assert task.cancelled()
+    assert buf.size == 0
+    assert path.read_bytes() == b"{'a': 1}"
+    assert app.drain_stats["buffers"] == 1
+    assert 0.05 < app.drain_stats["in_flight_wait"] < 5
+
+
+def test_dispatcher_indexes_buffered_paths() -> None:
+    _register_repr_format()
+    storage = FsBlobStorage().configure(
+        engine_proto="asynclocal",
+        engine_params={},
+        bufferize=True,
+        limit_type="count",
+        limit_capacity=100,
+    )
+    first = ContentQueue(storage, "test_repr", "test_repr", "first")
+    second = ContentQueue(storage, "test_repr", "test_repr", "second")
+    dispatcher = storage.mem_buffer
+
+    async def ingest() -> None:
+        await first.parse_content([("a", {"a": 1}), ("b", {"b": 1})])
+        await second.parse_content([("b", {"b": 2})])
+
+    asyncio.run(ingest())
+    assert dispatcher.locate("a") is first
+    assert dispatcher.locate("b") is second
+    assert dispatcher.get_content("b") == {"b": 2}
+    first.reset()
+    assert dispatcher.locate("a") is None
+    assert dispatcher.locate("b") is second
+    second.reset()
+    assert dispatcher.get_content("b") is None
+
+
+def test_buffer_drops_repeated_records() -> None:
+    pl = pytest.importorskip("polars")
+    _register_repr_format()
+    storage = FsBlobStorage().configure(
+        engine_proto="asynclocal",
+        engine_params={},
+        bufferize=True,
+        limit_type="count",
+        limit_capacity=100,
+    )
+    io_context = IOContext(
+        in_format="test_repr",
+        out_format="test_repr",
+        storage=storage,
+        key_columns=["id"],
+    )
+    buf = ContentQueue(storage, "test_repr", "test_repr", "q", io_context)
+
+    async def ingest() -> None:
+        await buf.parse_content(
+            [
+                ("a", pl.DataFrame({"id": [1, 2], "value": ["a", "b"]})),
+                ("b", pl.DataFrame({"id": [1, 2], "value": ["c", "d"]})),
+            ]
+        )
+
+    asyncio.run(ingest())
+    assert buf.deduplicate_records() == 2
+    assert list(buf.queue) == ["b"]
+    assert storage.mem_buffer.locate("a") is None
+    assert buf.memory_size > 0
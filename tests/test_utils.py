@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import sys
+
+from byteflows.utils import count_rows, estimate_size
+
+
+def test_estimate_size_of_json_data() -> None:
+    records: list[dict[str, str]] = [
+        {"id": str(idx), "payload": f"{idx:>1000}"} for idx in range(100)
+    ]
+    size: int = estimate_size(records)
+    assert size > 100 * 1000
+    assert size > sys.getsizeof(records) + sum(map(sys.getsizeof, records))
+
+
+def test_estimate_size_counts_shared_objects_once() -> None:
+    payload: bytes = b"x" * 10_000
+    assert estimate_size([payload, payload]) < 2 * len(payload)
+    cyclic: list = []
+    cyclic.append(cyclic)
+    assert estimate_size(cyclic) == sys.getsizeof(cyclic)
+
+
+def test_count_rows_of_records() -> None:
+    assert count_rows({"id": 1, "name": "a", "value": 2}) == 1
+    assert count_rows([{"id": 1}, {"id": 2}]) == 2
+    assert count_rows(("a", "b")) == 2
+    assert count_rows("record") == 1
+    assert count_rows(b"payload") == 1
+    assert count_rows(3.5) == 1
+    assert count_rows([]) == 0
+    assert count_rows(object()) is None